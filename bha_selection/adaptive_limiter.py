@@ -0,0 +1,195 @@
+"""Adaptive (AIMD) concurrency limiter shared by the Corva API fetch scripts.
+
+Instead of a guessed constant worker count, every API request takes a slot
+from a limiter whose limit moves with the API's observed behaviour:
+
+  - additive increase: +1 slot per ~limit healthy responses (roughly once per
+    round of requests) while latency stays within LATENCY_TOLERANCE x the
+    best latency seen
+  - multiplicative decrease: limit x BACKOFF on 429 / 5xx / connection
+    errors, at most once per round so a burst of 429s only cuts once
+
+Thread pools are sized to the limiter's max_limit and the limiter gates how
+many requests are actually in flight. status() gives the current limit and
+observed throughput for progress lines.
+
+Usage:
+    limiter = AdaptiveLimiter(initial=8, max_limit=32)
+    with limiter.slot() as slot:
+        r = requests.get(...)
+        slot.observe(r.status_code)
+    print(f"  ... | {limiter.status()}")
+
+AsyncAdaptiveLimiter is the asyncio equivalent (async with limiter.slot()).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+BACKOFF = 0.5                # multiplicative decrease factor
+LATENCY_TOLERANCE = 2.0      # no ramp-up while latency > 2x best observed
+EWMA_ALPHA = 0.2             # smoothing for latency
+THROUGHPUT_WINDOW = 30.0     # seconds of completions used for req/s
+
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SlotOutcome:
+    """Result of one request, reported back to the limiter from inside slot()."""
+
+    def __init__(self):
+        self.status = None
+        self.failed = False
+
+    def observe(self, status_code):
+        """Record the HTTP status (429/5xx back off, anything else counts as healthy)."""
+        self.status = status_code
+        if status_code in THROTTLE_STATUSES:
+            self.failed = True
+
+    def throttle(self):
+        """Mark the request as throttled/failed (e.g. urllib3 retried a 429)."""
+        self.failed = True
+
+
+class _AIMD:
+    """Limit bookkeeping shared by the threaded and asyncio limiters."""
+
+    def __init__(self, initial, min_limit, max_limit):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.value = float(min(max(initial, min_limit), max_limit))
+        self.ewma = None
+        self.best = None
+        self.since_cut = float("inf")
+        self.completed = 0
+        self.throttled = 0
+        self.started = time.monotonic()
+        self.recent = deque()
+
+    @property
+    def limit(self):
+        return int(self.value)
+
+    def record(self, outcome, latency):
+        now = time.monotonic()
+        self.completed += 1
+        self.recent.append(now)
+        while self.recent and now - self.recent[0] > THROUGHPUT_WINDOW:
+            self.recent.popleft()
+        self.since_cut += 1
+
+        if outcome.failed:
+            self.throttled += 1
+            # Cut at most once per round of in-flight requests
+            if self.since_cut >= self.value:
+                self.value = max(self.min_limit, self.value * BACKOFF)
+                self.since_cut = 0
+            return
+
+        self.ewma = latency if self.ewma is None else (
+            EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma)
+        self.best = self.ewma if self.best is None else min(self.best, self.ewma)
+        if self.ewma <= self.best * LATENCY_TOLERANCE:
+            self.value = min(self.max_limit, self.value + 1.0 / self.value)
+
+    def throughput(self):
+        """Completed requests per second over the last THROUGHPUT_WINDOW."""
+        if not self.recent:
+            return 0.0
+        span = min(THROUGHPUT_WINDOW, time.monotonic() - self.started)
+        return len(self.recent) / span if span > 0 else 0.0
+
+
+class AdaptiveLimiter:
+    """Thread-safe AIMD concurrency limiter (see module docstring)."""
+
+    def __init__(self, initial=8, min_limit=1, max_limit=64, name=""):
+        self.name = name
+        self.max_limit = max_limit
+        self._aimd = _AIMD(initial, min_limit, max_limit)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+
+    @property
+    def limit(self):
+        return self._aimd.limit
+
+    @contextmanager
+    def slot(self):
+        """Block until a slot is free; yields a SlotOutcome to report the result."""
+        with self._cond:
+            while self._in_flight >= self._aimd.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        outcome = SlotOutcome()
+        t0 = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome.throttle()
+            raise
+        finally:
+            latency = time.monotonic() - t0
+            with self._cond:
+                self._in_flight -= 1
+                self._aimd.record(outcome, latency)
+                self._cond.notify_all()
+
+    def throughput(self):
+        return self._aimd.throughput()
+
+    def status(self):
+        """One-line progress summary: limit, req/s, throttled."""
+        label = f"{self.name} " if self.name else ""
+        return (f"{label}limit {self._aimd.limit}/{self.max_limit}, "
+                f"{self.throughput():.1f} req/s, {self._aimd.throttled} throttled")
+
+
+class AsyncAdaptiveLimiter:
+    """asyncio version of AdaptiveLimiter (use from a single event loop)."""
+
+    def __init__(self, initial=8, min_limit=1, max_limit=64, name=""):
+        self.name = name
+        self.max_limit = max_limit
+        self._aimd = _AIMD(initial, min_limit, max_limit)
+        self._cond = None
+        self._in_flight = 0
+
+    @property
+    def limit(self):
+        return self._aimd.limit
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for a free slot; yields a SlotOutcome to report the result."""
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self._aimd.limit)
+            self._in_flight += 1
+        outcome = SlotOutcome()
+        t0 = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome.throttle()
+            raise
+        finally:
+            latency = time.monotonic() - t0
+            async with self._cond:
+                self._in_flight -= 1
+                self._aimd.record(outcome, latency)
+                self._cond.notify_all()
+
+    def throughput(self):
+        return self._aimd.throughput()
+
+    def status(self):
+        """One-line progress summary: limit, req/s, throttled."""
+        label = f"{self.name} " if self.name else ""
+        return (f"{label}limit {self._aimd.limit}/{self.max_limit}, "
+                f"{self.throughput():.1f} req/s, {self._aimd.throttled} throttled")
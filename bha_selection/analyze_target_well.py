@@ -7,6 +7,7 @@ the per-section BHA analysis pipeline.
 Usage:
     python analyze_target_well.py --asset 82512872
     python analyze_target_well.py --asset 82512872 --formations formation_tops_canonical.csv
+    python analyze_target_well.py --asset 82512872 --offline   # cached API responses only
 """
 
 import argparse
@@ -14,32 +15,17 @@ import csv
 import json
 import os
 import sys
-import requests
-from dotenv import load_dotenv
 
+import corva_client
 import db
 
-load_dotenv()
-
-API_KEY = os.getenv("CORVA_API_KEY")
-DATA_API = "https://data.corva.ai"
-HEADERS = {"Authorization": f"API {API_KEY}"}
-
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def fetch_well_sections(asset_id):
     """Fetch well sections from Corva."""
-    r = requests.get(
-        f"{DATA_API}/api/v1/data/corva/data.well-sections/",
-        headers=HEADERS,
-        params={
-            "limit": 20,
-            "sort": json.dumps({"data.top_depth": 1}),
-            "query": json.dumps({"asset_id": int(asset_id)}),
-        },
-        timeout=30,
-    )
+    r = corva_client.get_data("data.well-sections", {"asset_id": int(asset_id)},
+                              sort={"data.top_depth": 1}, limit=20, cache=True)
     if r.status_code == 200:
         return r.json()
     print(f"  WARNING: Failed to fetch well-sections (HTTP {r.status_code})")
@@ -53,37 +39,30 @@ def fetch_well_name(asset_id):
     """
     # Try v2 assets API
     try:
-        r = requests.get(
-            f"https://api.corva.ai/v2/assets/{asset_id}",
-            headers=HEADERS,
-            timeout=15,
-        )
+        r = corva_client.get(f"{corva_client.PLATFORM_API}/v2/assets/{asset_id}",
+                             timeout=15, cache=True)
         if r.status_code == 200:
             name = r.json().get("name")
             if name:
                 return name
+    except corva_client.OfflineCacheMiss:
+        raise
     except Exception:
         pass
 
     # Fall back to well_cache (more reliable for well names)
     try:
-        r = requests.get(
-            f"{DATA_API}/api/v1/data/corva/well_cache/",
-            headers=HEADERS,
-            params={
-                "limit": 1,
-                "sort": json.dumps({"timestamp": -1}),
-                "query": json.dumps({"asset_id": int(asset_id)}),
-                "fields": "asset",
-            },
-            timeout=15,
-        )
+        r = corva_client.get_data("well_cache", {"asset_id": int(asset_id)},
+                                  sort={"timestamp": -1}, fields="asset", limit=1,
+                                  timeout=15, cache=True)
         if r.status_code == 200:
             data = r.json()
             if data:
                 name = data[0].get("asset", {}).get("name")
                 if name:
                     return name
+    except corva_client.OfflineCacheMiss:
+        raise
     except Exception:
         pass
 
@@ -168,8 +147,21 @@ def main():
                         help="Output JSON path (default: target_sections.json)")
     parser.add_argument("--export-csv", action="store_true",
                         help="Export sections to CSV via db.export_csv")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use cached API responses only; fail on a cache miss")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Re-download API responses and update the cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the API response cache")
     args = parser.parse_args()
 
+    if args.offline:
+        corva_client.set_cache_mode("offline")
+    elif args.refresh_cache:
+        corva_client.set_cache_mode("refresh")
+    elif args.no_cache:
+        corva_client.set_cache_mode("off")
+
     asset_id = args.asset
     fm_path = args.formations
     if fm_path and not os.path.isabs(fm_path):
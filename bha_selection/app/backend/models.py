@@ -118,6 +118,12 @@ class TTDEntry(BaseModel):
     bit_ttd_by_mfg_model: list[BitTTDEntry] = []
     fastest_bit: Optional[BitTTDEntry] = None
     buckets: list[TTDBucket] = []
+    # Bootstrap over the group's runs (build_rop_curves.py --bootstrap)
+    ttd_p10_hours: Optional[float] = None
+    ttd_p50_hours: Optional[float] = None
+    ttd_p90_hours: Optional[float] = None
+    prob_fastest: Optional[float] = None
+    prob_top3: Optional[float] = None
 
 
 class GroupInfo(BaseModel):
@@ -139,6 +145,23 @@ class SectionResults(BaseModel):
     analyzed_runs: int = 0
 
 
+class TTDWhatIfRequest(BaseModel):
+    section_name: str
+    asset_id: Optional[str] = None
+    mode: Optional[str] = None  # "lateral" / "vertical"; detected from saved curves if omitted
+    target_length: float = Field(10000, gt=0)  # lateral length or section length (ft)
+    slide_pct: Optional[float] = Field(None, ge=0, le=1)  # overrides each non-RSS group's observed slide %
+
+
+class TTDWhatIfResponse(BaseModel):
+    section_name: str
+    mode: str
+    target_length: float
+    slide_pct: Optional[float] = None
+    ttd_ranking: list[TTDEntry] = []
+    compute_ms: float = 0
+
+
 class OffsetFilterOptions(BaseModel):
     basins: list[str] = []
     target_formations: list[str] = []
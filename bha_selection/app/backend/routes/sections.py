@@ -19,8 +19,10 @@ from ..models import (
     MotorSummary,
     BitTTDEntry,
     GroupInfo,
+    TTDWhatIfRequest,
+    TTDWhatIfResponse,
 )
-from ..services import jobs, pipeline
+from ..services import jobs, pipeline, ttd_whatif
 
 # Import db module from bha_selection root
 if pipeline.SCRIPT_DIR not in sys.path:
@@ -65,6 +67,21 @@ def _parse_bit_ttd_entries(raw) -> list[BitTTDEntry]:
     return result
 
 
+_BOOTSTRAP_FIELDS = ("ttd_p10_hours", "ttd_p50_hours", "ttd_p90_hours",
+                     "prob_fastest", "prob_top3")
+
+
+def _bootstrap_fields(row: dict) -> dict:
+    """Bootstrap TTD columns of a ttd_ranking CSV row (absent when not run)."""
+    fields = {}
+    for name in _BOOTSTRAP_FIELDS:
+        try:
+            fields[name] = float(row[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return fields
+
+
 @router.post("/run-section", response_model=RunSectionResponse)
 async def run_section(req: RunSectionRequest, background_tasks: BackgroundTasks):
     """Launch the per-section pipeline as a background task."""
@@ -286,6 +303,7 @@ async def get_results(
                             common_motor=common_motor,
                             bit_ttd_by_mfg_model=bit_ttd_rows,
                             fastest_bit=fastest_bit,
+                            **_bootstrap_fields(row),
                         ))
                     except Exception as row_exc:
                         continue
@@ -442,3 +460,52 @@ async def get_results(
         runs_in_curves=runs_in_curves,
         analyzed_runs=analyzed_runs,
     )
+
+
+@router.post("/ttd/what-if", response_model=TTDWhatIfResponse)
+def ttd_what_if(req: TTDWhatIfRequest):
+    """Re-rank a completed section's groups for a new length / slide %.
+
+    Uses the group curves the last pipeline run saved (cached in-process),
+    so no part of the pipeline is rerun.
+    """
+    safe_name = req.section_name.replace(" ", "_").replace("/", "-")
+    run_id = pipeline.get_analysis_state(req.asset_id).get("run_id")
+    mode = req.mode or ttd_whatif.detect_mode(run_id, safe_name)
+    if mode not in ("lateral", "vertical"):
+        raise HTTPException(status_code=404,
+                            detail=f"No saved curves for section '{req.section_name}'")
+    try:
+        results, motors, elapsed_ms = ttd_whatif.rank(
+            run_id, safe_name, mode, req.target_length, req.slide_pct)
+    except ttd_whatif.CurvesNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    ranking = []
+    for r in results:
+        motor = motors.get(r["group_key"], {})
+        ranking.append(TTDEntry(
+            group_key=r["group_key"],
+            num_runs=int(r.get("num_runs", 0) or 0),
+            num_wells=int(r.get("num_wells", 0) or 0),
+            ttd_hours=float(r["ttd_hours"]),
+            ttd_days=float(r["ttd_days"]),
+            actual_slide_pct=float(r.get("actual_slide_pct", 0) or 0),
+            is_rss=bool(r.get("is_rss", False)),
+            common_motor=MotorSummary(
+                motor_diam=str(motor.get("motor_diam", "N/A")),
+                rotor_lobes=str(motor.get("rotor_lobes", "N/A")),
+                stator_lobes=str(motor.get("stator_lobes", "N/A")),
+                stages=str(motor.get("stages", "N/A")),
+                label=str(motor.get("label", "N/A")),
+            ),
+            buckets=[TTDBucket(**b) for b in r.get("buckets", [])],
+        ))
+    return TTDWhatIfResponse(
+        section_name=req.section_name,
+        mode=mode,
+        target_length=req.target_length,
+        slide_pct=req.slide_pct,
+        ttd_ranking=ranking,
+        compute_ms=round(elapsed_ms, 2),
+    )
@@ -185,24 +185,26 @@ async def get_offset_wells(
     """
     run_id = None
 
-    # Look up the run for the specific asset
-    if asset_id:
-        run = _db.get_current_run(str(asset_id))
-        if run:
-            run_id = run["id"]
-
-    # Fallback to latest run if no asset_id provided
-    if not run_id:
-        state = pipeline.get_analysis_state()
-        run_id = state.get("run_id")
-
-    # 1. Try database (correctly scoped by run_id)
-    if run_id:
-        total, wells_list = _wells_from_db(run_id, section_name, hole_size)
-        if wells_list:
-            return OffsetWellsResponse(
-                total=total, filtered=len(wells_list), wells=wells_list,
-            )
+    # One read transaction for the run lookup and the well queries
+    with _db.transaction():
+        # Look up the run for the specific asset
+        if asset_id:
+            run = _db.get_current_run(str(asset_id))
+            if run:
+                run_id = run["id"]
+
+        # Fallback to latest run if no asset_id provided
+        if not run_id:
+            state = pipeline.get_analysis_state()
+            run_id = state.get("run_id")
+
+        # 1. Try database (correctly scoped by run_id)
+        if run_id:
+            total, wells_list = _wells_from_db(run_id, section_name, hole_size)
+            if wells_list:
+                return OffsetWellsResponse(
+                    total=total, filtered=len(wells_list), wells=wells_list,
+                )
 
     return OffsetWellsResponse(total=0, filtered=0, wells=[])
 
@@ -213,23 +215,24 @@ async def get_offset_filter_options(
 ):
     """Return distinct basins and target formations from offset wells."""
     target_asset_formation = None
-    if asset_id:
-        target_asset_formation = _db.get_target_asset_formation(str(asset_id))
-
     run_id = None
-    if asset_id:
-        run = _db.get_current_run(str(asset_id))
-        if run:
-            run_id = run["id"]
-    if not run_id:
-        state = pipeline.get_analysis_state()
-        run_id = state.get("run_id")
+    opts = {}
+    with _db.transaction():
+        if asset_id:
+            target_asset_formation = _db.get_target_asset_formation(str(asset_id))
+            run = _db.get_current_run(str(asset_id))
+            if run:
+                run_id = run["id"]
+        if not run_id:
+            state = pipeline.get_analysis_state()
+            run_id = state.get("run_id")
+        if run_id:
+            opts = _db.get_offset_filter_options(run_id)
     if not run_id:
         return OffsetFilterOptions(
             target_asset_formation=target_asset_formation,
         )
 
-    opts = _db.get_offset_filter_options(run_id)
     return OffsetFilterOptions(
         basins=opts.get("basins", []),
         target_formations=opts.get("target_formations", []),
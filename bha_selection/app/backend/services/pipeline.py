@@ -27,6 +27,7 @@ import db as _db  # noqa: E402
 from . import jobs  # noqa: E402
 
 PYTHON = sys.executable
+TTD_BOOTSTRAP_ITERATIONS = 1000  # build_rop_curves.py --bootstrap (0 = off)
 
 
 def _run_sync(cmd: list[str], cwd: str | None = None) -> tuple[int, str]:
@@ -71,11 +72,13 @@ async def _find_offset_wells(
     are instant.
     """
     # Check DB first -- reuse if we have data for this asset+radius
-    run = _db.get_current_run(str(asset_id))
-    if run and _db.count_offset_wells(run["id"]) > 0:
+    with _db.transaction():
+        run = _db.get_current_run(str(asset_id))
+        n_wells = _db.count_offset_wells(run["id"]) if run else 0
+    if n_wells > 0:
         if run.get("search_radius") == radius_miles:
             print(f"  Using cached offset wells for {asset_id} "
-                  f"(run {run['id']}, {_db.count_offset_wells(run['id'])} wells)")
+                  f"(run {run['id']}, {n_wells} wells)")
             return None  # Data is in DB, no CSV needed
 
     # No DB data for this asset -- run the script
@@ -357,11 +360,9 @@ def _find_offset_csv(asset_id: str, radius_miles: float) -> str | None:
     asset's offset wells, avoiding cross-well contamination from stale
     CSV files left on disk.
     """
-    run = _db.get_current_run(str(asset_id))
-    if not run:
-        return None
-
-    offset_wells = _db.get_offset_wells(run["id"])
+    with _db.transaction():
+        run = _db.get_current_run(str(asset_id))
+        offset_wells = _db.get_offset_wells(run["id"]) if run else []
     if not offset_wells:
         return None
 
@@ -612,6 +613,8 @@ async def run_section_pipeline(
             "--section-length", str(section_length),
             "--output-dir", sec_out_dir,
         ]
+        if TTD_BOOTSTRAP_ITERATIONS:
+            build_cmd += ["--bootstrap", str(TTD_BOOTSTRAP_ITERATIONS)]
         if mode == "vertical":
             build_cmd += ["--max-missing-formations",
                           str(max_missing_formations)]
@@ -0,0 +1,217 @@
+"""In-process Time-to-TD what-if ranking over persisted group curves.
+
+Changing the lateral/section length or slide % used to mean rerunning
+build_rop_curves.py through run_section_pipeline. This service loads the
+group curves a pipeline run already saved (db.load_rop_curves_by_group,
+plus db.load_rop_curves_per_run for each group's well count and observed
+slide %) once per section into a module-level cache and re-ranks them
+with calculate_ttd / calculate_ttd_vertical on demand. Lateral sections
+keep one LateralTTDModel per group in the cache, so a re-rank only does
+prefix-sum lookups.
+
+Cache entries are keyed by (run_id, section, mode) and are reloaded when
+the underlying Parquet files (or the vertical formation roadmap) change.
+
+Bit manufacturer/model sub-rankings need per-run equipment data that is
+not persisted with the curves, so what-if entries carry none.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+
+from . import pipeline  # also puts bha_selection on sys.path
+
+import db as _db  # noqa: E402
+import build_rop_curves as _curves  # noqa: E402
+
+_cache: dict[tuple, dict] = {}
+_lock = threading.Lock()
+
+
+class CurvesNotFound(LookupError):
+    """No persisted group curves for the requested section / mode."""
+
+
+def _file_signature(paths: list[str | None]) -> tuple:
+    sig = []
+    for path in paths:
+        try:
+            sig.append((path, os.stat(path).st_mtime_ns) if path else None)
+        except OSError:
+            sig.append((path, None))
+    return tuple(sig)
+
+
+def _section_dir(safe_name: str) -> str:
+    return os.path.join(pipeline.SCRIPT_DIR, "sections", safe_name)
+
+
+def _load_roadmap(safe_name: str) -> tuple[list[str], list[str]]:
+    """Formation roadmap saved by build_rop_curves.py (vertical mode)."""
+    path = os.path.join(_section_dir(safe_name), "formation_roadmap.csv")
+    if not os.path.exists(path):
+        return [], []
+    with open(path, encoding="utf-8") as f:
+        rows = sorted(csv.DictReader(f), key=lambda r: int(r.get("order", 0) or 0))
+    roadmap = [r["formation_bin_key"] for r in rows]
+    fm_order = []
+    for key in roadmap:
+        fm_name, _ = _curves.parse_formation_bin_key(key)
+        if fm_name not in fm_order:
+            fm_order.append(fm_name)
+    return roadmap, fm_order
+
+
+def _ranking_path(safe_name: str, mode: str) -> str:
+    """The section's saved TTD ranking CSV for this mode."""
+    name = "ttd_ranking_vertical.csv" if mode == "vertical" else "ttd_ranking.csv"
+    return os.path.join(_section_dir(safe_name), name)
+
+
+def _load_common_motors(safe_name: str, mode: str) -> dict[str, dict]:
+    """common_motor per group from the section's saved TTD ranking CSV for mode."""
+    path = _ranking_path(safe_name, mode)
+    if not os.path.exists(path):
+        return {}
+    motors = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    motor = json.loads(row.get("common_motor") or "{}")
+                except ValueError:
+                    motor = {}
+                if isinstance(motor, dict):
+                    motors[row.get("group_key", "")] = motor
+    except OSError:
+        pass
+    return motors
+
+
+def _rebuild_group_curves(group_df, per_run_df, mode: str) -> dict:
+    """group_curves dict (calculate_ttd input) from the persisted curve tables."""
+    # Observed slide % and well count per group, as _assemble_group_curve computes
+    # them: every rotary / slide foot of a run lands in exactly one curve bin.
+    feet = {}
+    wells = {}
+    if not per_run_df.empty:
+        totals = per_run_df.groupby(["equiv_bha_key", "curve_type"])["foot_count"].sum()
+        for (group_key, curve_type), total in totals.items():
+            feet.setdefault(group_key, {})[curve_type] = int(total)
+        for group_key, assets in per_run_df.groupby("equiv_bha_key")["asset_id"]:
+            wells[group_key] = assets.nunique()
+
+    bin_col = "formation_bin_key" if mode == "vertical" else "bin_start_ft"
+    group_curves = {}
+    for group_key, rows in group_df.groupby("equiv_bha_key", sort=False):
+        is_rss = "RSS" in str(group_key).upper()
+        rotary_ft = feet.get(group_key, {}).get("rotary", 0)
+        slide_ft = feet.get(group_key, {}).get("slide", 0)
+        if is_rss or rotary_ft + slide_ft == 0:
+            group_slide_pct = 0.0
+        else:
+            group_slide_pct = round(slide_ft / (rotary_ft + slide_ft), 4)
+
+        gc = {
+            "num_runs": int(rows["num_runs"].iloc[0]),
+            "num_wells": int(wells.get(group_key, 0)),
+            "group_slide_pct": group_slide_pct,
+            "is_rss": is_rss,
+            "rotary": {},
+            "slide": {},
+        }
+        for r in rows.itertuples(index=False):
+            b = getattr(r, bin_col)
+            if mode != "vertical":
+                b = int(b)
+            gc[r.curve_type][b] = {
+                "p10": float(r.p10),
+                "p50": float(r.p50),
+                "p90": float(r.p90),
+                "num_runs": int(r.contributing_runs),
+                "confident": bool(r.confident),
+            }
+        group_curves[str(group_key)] = gc
+    return group_curves
+
+
+def _get_section(run_id: int | None, safe_name: str, mode: str) -> dict:
+    """Cached curves for a section, (re)loaded when the saved files change."""
+    group_path = _db.find_rop_curves(safe_name, "by_group", mode, run_id)
+    if group_path is None:
+        raise CurvesNotFound(f"No {mode} group curves saved for section '{safe_name}'")
+    per_run_path = _db.find_rop_curves(safe_name, "per_run", mode, run_id)
+    roadmap_path = (os.path.join(_section_dir(safe_name), "formation_roadmap.csv")
+                    if mode == "vertical" else None)
+    signature = _file_signature([group_path, per_run_path, roadmap_path,
+                                 _ranking_path(safe_name, mode)])
+
+    key = (run_id, safe_name, mode)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["signature"] == signature:
+            return entry
+
+        group_df = _db.load_rop_curves_by_group(safe_name, mode, run_id=run_id)
+        per_run_df = _db.load_rop_curves_per_run(
+            safe_name, mode, columns=["equiv_bha_key", "asset_id", "curve_type", "foot_count"],
+            run_id=run_id)
+        entry = {
+            "signature": signature,
+            "group_curves": _rebuild_group_curves(group_df, per_run_df, mode),
+            "common_motors": _load_common_motors(safe_name, mode),
+            "ttd_models": {},
+            "roadmap": [],
+            "fm_order": [],
+        }
+        if mode == "vertical":
+            entry["roadmap"], entry["fm_order"] = _load_roadmap(safe_name)
+            if not entry["roadmap"]:
+                raise CurvesNotFound(f"No formation roadmap saved for section '{safe_name}'")
+        _cache[key] = entry
+        return entry
+
+
+def detect_mode(run_id: int | None, safe_name: str) -> str | None:
+    """'lateral' or 'vertical', whichever has saved group curves."""
+    for mode in ("lateral", "vertical"):
+        if _db.find_rop_curves(safe_name, "by_group", mode, run_id):
+            return mode
+    return None
+
+
+def rank(run_id: int | None, safe_name: str, mode: str, target_length: float,
+         slide_pct: float | None = None) -> tuple[list[dict], dict[str, dict], float]:
+    """Re-rank a section's groups for a new target length / slide %.
+
+    slide_pct, if given, replaces every non-RSS group's observed slide %.
+    Returns (calculate_ttd-style results, common_motor by group, elapsed ms).
+    """
+    t0 = time.perf_counter()
+    entry = _get_section(run_id, safe_name, mode)
+    target_length = int(target_length)
+    # Only used for groups without an observed slide %; every rebuilt group has one
+    expected_slide_pct = slide_pct if slide_pct is not None else 0.0
+    if mode == "vertical":
+        results = _curves.calculate_ttd_vertical(
+            entry["group_curves"], entry["roadmap"], entry["fm_order"],
+            target_length, expected_slide_pct,
+            include_bit_breakdown=False, override_slide_pct=slide_pct,
+        )
+    else:
+        results = _curves.calculate_ttd(
+            entry["group_curves"], target_length, expected_slide_pct,
+            _curves.DEFAULT_ROTARY_BIN, _curves.DEFAULT_SLIDE_BIN,
+            include_bit_breakdown=False, ttd_models=entry["ttd_models"],
+            override_slide_pct=slide_pct,
+        )
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    return results, entry["common_motors"], elapsed_ms
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,182 @@
+"""Benchmark curve_stats kernels against the previous percentile / rolling_median.
+
+Builds synthetic group data shaped like build_group_curves() input -- a
+100 ft-binned lateral of --bins bins, groups of 3..--max-runs runs, each
+run contributing one median ROP per bin -- then times:
+
+  1. P10/P50/P90 per bin: three percentile() calls vs one quantiles()
+  2. Smoothing p10/p50/p90 curves: rolling_median() vs sliding_median(),
+     for the lateral window (5) and a wider window (15)
+
+Both implementations must return identical values; the script exits
+non-zero if they do not.
+
+Usage:
+    python bench_curve_stats.py [--groups 40] [--bins 150] [--max-runs 60] [--repeat 5] [--seed 7]
+"""
+import random
+import statistics
+import sys
+import time
+
+from curve_stats import quantiles, sliding_median
+
+
+# ---------------------------------------------------------------------------
+#  Previous implementations (build_rop_curves.py before curve_stats)
+# ---------------------------------------------------------------------------
+
+def _percentile_legacy(data, pct):
+    if not data:
+        return None
+    s = sorted(data)
+    k = (len(s) - 1) * pct / 100.0
+    f = int(k)
+    c = f + 1
+    if c >= len(s):
+        return s[f]
+    return s[f] + (k - f) * (s[c] - s[f])
+
+
+def _rolling_median_legacy(values, window):
+    n = len(values)
+    if n == 0:
+        return []
+    result = []
+    half = window // 2
+    for i in range(n):
+        lo = max(0, i - half)
+        hi = min(n, i + half + 1)
+        neighborhood = [v for v in values[lo:hi] if v is not None]
+        if neighborhood:
+            result.append(round(statistics.median(neighborhood), 1))
+        else:
+            result.append(values[i])
+    return result
+
+
+# ---------------------------------------------------------------------------
+#  Synthetic data
+# ---------------------------------------------------------------------------
+
+def make_groups(n_groups, n_bins, max_runs, seed):
+    """[{bin: [run median ROPs]}] with realistic group sizes and sparse tails."""
+    rng = random.Random(seed)
+    groups = []
+    for _ in range(n_groups):
+        n_runs = rng.randint(3, max_runs)
+        base = rng.uniform(60, 250)
+        bins = {}
+        for b in range(n_bins):
+            # Fewer runs reach the far end of the lateral
+            reach = max(1, int(n_runs * (1 - 0.6 * b / n_bins)))
+            bins[b * 100] = [round(max(5.0, rng.gauss(base * (1 - 0.002 * b), base * 0.25)), 1)
+                             for _ in range(reach)]
+        groups.append(bins)
+    return groups
+
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+# ---------------------------------------------------------------------------
+#  Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_quantiles(groups, repeat):
+    def legacy():
+        return [[(_percentile_legacy(r, 10), _percentile_legacy(r, 50), _percentile_legacy(r, 90))
+                 for _, r in sorted(g.items())] for g in groups]
+
+    def fast():
+        return [[tuple(quantiles(r, (10, 50, 90))) for _, r in sorted(g.items())] for g in groups]
+
+    t_old, out_old = _time(legacy, repeat)
+    t_new, out_new = _time(fast, repeat)
+    return t_old, t_new, out_old == out_new, out_new
+
+
+def bench_smoothing(curves, window, repeat):
+    def legacy():
+        return [_rolling_median_legacy(c, window) for c in curves]
+
+    def fast():
+        return [sliding_median(c, window) for c in curves]
+
+    t_old, out_old = _time(legacy, repeat)
+    t_new, out_new = _time(fast, repeat)
+    return t_old, t_new, out_old == out_new
+
+
+def main():
+    n_groups = 40
+    n_bins = 150
+    max_runs = 60
+    repeat = 5
+    seed = 7
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] == "--groups" and i + 1 < len(args):
+            n_groups = int(args[i + 1])
+            i += 2
+        elif args[i] == "--bins" and i + 1 < len(args):
+            n_bins = int(args[i + 1])
+            i += 2
+        elif args[i] == "--max-runs" and i + 1 < len(args):
+            max_runs = int(args[i + 1])
+            i += 2
+        elif args[i] == "--repeat" and i + 1 < len(args):
+            repeat = int(args[i + 1])
+            i += 2
+        elif args[i] == "--seed" and i + 1 < len(args):
+            seed = int(args[i + 1])
+            i += 2
+        else:
+            i += 1
+
+    print(f"\n{'=' * 70}")
+    print(f"  CURVE STATS BENCHMARK")
+    print(f"  {n_groups} groups x {n_bins} bins, 3-{max_runs} runs/group, best of {repeat}")
+    print(f"{'=' * 70}\n")
+
+    groups = make_groups(n_groups, n_bins, max_runs, seed)
+    t_old, t_new, same, bands = bench_quantiles(groups, repeat)
+
+    # Smooth the P10/P50/P90 curves just computed, with a few gaps (None)
+    curves = []
+    for group_bands in bands:
+        for col in range(3):
+            curve = [band[col] for band in group_bands]
+            for j in range(7, len(curve), 23):
+                curve[j] = None
+            curves.append(curve)
+
+    results = [("P10/P50/P90 per bin", t_old, t_new, same)]
+    for window in (5, 15):
+        s_old, s_new, s_same = bench_smoothing(curves, window, repeat)
+        results.append((f"Rolling median (w={window})", s_old, s_new, s_same))
+
+    print(f"  {'Kernel':<26} {'Before (ms)':>12} {'After (ms)':>12} {'Speedup':>9}  Identical")
+    print(f"  {'-' * 68}")
+    ok = True
+    for name, before, after, identical in results:
+        ok &= identical
+        print(f"  {name:<26} {before * 1000:>12.2f} {after * 1000:>12.2f} "
+              f"{before / after:>8.1f}x  {identical}")
+
+    if not ok:
+        print("\n  ERROR: outputs differ from the previous implementation")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""Benchmark build_rop_curves.py stages on synthetic 1ft data.
+
+Generates wits.summary-1ft style CSVs (same columns as pull_1ft_for_runs.py
+writes) for a configurable number of wells, runs per well, feet per run,
+slide ratio and formations, then runs the lateral and vertical pipelines
+stage by stage, as main_lateral / main_vertical do (without the curve cache
+and the db):
+
+  lateral:  load, per-run curves, group curves, smoothing, TTD, save
+  vertical: load, roadmap, per-run curves, group curves, smoothing, TTD, save
+
+Group curve timings include their smoothing; the smoothing stage re-smooths
+the raw group curves on its own to show its share. Save writes the CSVs and
+Parquet files to a temp dir.
+
+Each stage reports the best of --repeat wall times and, from one extra pass
+under tracemalloc, its peak traced memory. Results are appended to
+bench_results.jsonl (one JSON record per run with the git commit) and
+compared against the latest earlier record with the same parameters, or
+the one given with --compare <commit>.
+
+Usage:
+    python bench_rop_curves.py [--wells 20] [--runs-per-well 2] [--feet-per-run 5000]
+                               [--slide-ratio 0.15] [--formations 6] [--groups 6]
+                               [--engine auto] [--mode both] [--repeat 3] [--seed 7]
+                               [--compare abc1234] [--threshold 0.10] [--no-save]
+                               [--fail-on-regression]
+"""
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import build_rop_curves as brc
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = os.path.join(SCRIPT_DIR, "bench_results.jsonl")
+KOP_DEPTH_FT = 10000          # hole depth where the synthetic wells start
+MIN_REGRESSION_MS = 5.0       # ignore slowdowns smaller than this
+
+
+# ---------------------------------------------------------------------------
+#  Synthetic 1ft data
+# ---------------------------------------------------------------------------
+
+def _state_blocks(rng, n_feet, slide_ratio):
+    """Per-foot drilling states as random rotary / slide stretches."""
+    # Slide stretches average 60 ft, rotary 230 ft: pick stretches so that
+    # about slide_ratio of the feet slide
+    p_slide = slide_ratio * 230 / (slide_ratio * 230 + (1 - slide_ratio) * 60)
+    states = np.empty(n_feet, dtype=object)
+    pos = 0
+    while pos < n_feet:
+        if rng.random() < p_slide:
+            length, state = int(rng.integers(30, 90)), "Slide Drilling"
+        else:
+            length, state = int(rng.integers(60, 400)), "Rotary Drilling"
+        states[pos:pos + length] = state
+        pos += length
+    # A few off-bottom feet, which every curve builder skips
+    states[rng.random(n_feet) < 0.005] = "In Slips"
+    return states
+
+
+def make_1ft_data(n_wells=20, runs_per_well=2, feet_per_run=5000, slide_ratio=0.15,
+                  n_formations=6, n_groups=6, seed=7):
+    """(lateral DataFrame, vertical DataFrame) of synthetic 1ft rows.
+
+    Each well drills runs_per_well consecutive runs of feet_per_run feet,
+    each run with a BHA from one of n_groups equivalent groups (every
+    fourth group is RSS). Slide stretches make up about slide_ratio of the
+    feet; ROP depends on the group, wear along the run, the formation and
+    noise. The vertical frame splits the same footage into n_formations
+    formations per well (with a little thickness jitter).
+    """
+    rng = np.random.default_rng(seed)
+    group_keys = [f"6.75 {'RSS' if g % 4 == 0 else 'MTR'} G{g}" for g in range(n_groups)]
+    group_rop = rng.uniform(80, 200, n_groups)
+    fm_names = [f"FM{k:02d}" for k in range(n_formations)]
+    fm_factor = rng.uniform(0.6, 1.4, n_formations)
+
+    lateral, vertical = [], []
+    run_feet = np.arange(feet_per_run, dtype=float)
+    for w in range(n_wells):
+        well_feet = runs_per_well * feet_per_run
+        bounds = np.cumsum(rng.uniform(0.8, 1.2, n_formations))
+        bounds = np.concatenate(([0.0], bounds / bounds[-1] * well_feet))
+        for r in range(runs_per_well):
+            g = int(rng.integers(n_groups))
+            lateral_ft = r * feet_per_run + run_feet + rng.uniform(0, 0.9)
+            fm_idx = np.clip(np.searchsorted(bounds, lateral_ft, side="right") - 1,
+                             0, n_formations - 1)
+            states = _state_blocks(rng, feet_per_run, slide_ratio)
+            wear = 1 - 0.25 * run_feet / max(feet_per_run, 1)
+            rop = group_rop[g] * fm_factor[fm_idx] * wear * rng.lognormal(0, 0.25, feet_per_run)
+            rop = np.where(states == "Slide Drilling", rop * 0.45, rop)
+            fm_pct = (lateral_ft - bounds[fm_idx]) / (bounds[fm_idx + 1] - bounds[fm_idx]) * 100
+
+            common = {
+                "asset_id": str(1000 + w),
+                "well_name": f"Synthetic {w:03d}H",
+                "operator": "Synthetic Op",
+                "bha_number": str(r + 1),
+                "equiv_bha_key": group_keys[g],
+                "has_agitator": str(bool(rng.random() < 0.4) and g % 4 != 0),
+                "bit_manufacturer": ["Ulterra", "Smith", "Halliburton"][g % 3],
+                "bit_model": f"U{613 + g}",
+                "motor_od": "6.75",
+                "motor_model": "" if g % 4 == 0 else f"MotorX {5 + g % 3}/{6 + g % 3} {4 + g % 4}.0",
+                "motor_lobe_config": "" if g % 4 == 0 else f"{5 + g % 3}/{6 + g % 3}",
+                "motor_stages": "",
+                "state": states,
+                "rop_ft_hr": np.round(rop, 1),
+                "distance_from_run_start": np.round(run_feet + 0.5, 1),
+            }
+            depth = {
+                "hole_depth": np.round(KOP_DEPTH_FT + lateral_ft, 1),
+                "tvd": "",
+                "drillstring_id": f"ds{w}-{r}",
+            }
+            lateral.append(pd.DataFrame({
+                **common, "distance_from_lateral_start": np.round(lateral_ft, 1), **depth}))
+            vertical.append(pd.DataFrame({
+                **common, **depth,
+                "formation_name": np.array(fm_names, dtype=object)[fm_idx],
+                "formation_pct": np.round(fm_pct, 1),
+                "formation_segment": (np.minimum(fm_pct, 99.9) // 10 * 10).astype(int),
+            }))
+    return pd.concat(lateral, ignore_index=True), pd.concat(vertical, ignore_index=True)
+
+
+# ---------------------------------------------------------------------------
+#  Pipelines
+# ---------------------------------------------------------------------------
+
+def lateral_stages(csv_path, out_dir, engine, target_lateral):
+    """(stage name, fn(state)) steps of the lateral pipeline."""
+    rot, sli = brc.DEFAULT_ROTARY_BIN, brc.DEFAULT_SLIDE_BIN
+
+    def load(s):
+        s["frame"] = brc.load_1ft_frame(csv_path)
+        s["engine"] = engine
+        if engine == "auto":
+            s["engine"] = "dict" if len(s["frame"]) < brc.VECTORIZED_MIN_ROWS else "vectorized"
+        if s["engine"] == "dict":
+            s["rows"] = s.pop("frame").to_dict("records")
+        s["n_rows"] = len(s.get("frame", s.get("rows")))
+
+    def per_run(s):
+        if s["engine"] == "dict":
+            s["per_run"] = brc.build_per_run_curves(s["rows"], rot, sli)
+        else:
+            s["per_run"] = brc.build_per_run_curves_vectorized(s["frame"], rot, sli)
+
+    def group(s):
+        if s["engine"] == "dict":
+            s["groups"] = brc.build_group_curves(s["per_run"], rot, sli)
+        else:
+            s["groups"] = brc.build_group_curves_vectorized(s["per_run"], rot, sli)
+
+    def smoothing(s):
+        for gc in s["groups"].values():
+            brc.smooth_group_curve(gc["rotary_raw"], brc.ROLLING_WINDOW)
+            brc.smooth_group_curve(gc["slide_raw"], brc.ROLLING_WINDOW)
+
+    def ttd(s):
+        s["ttd"] = brc.calculate_ttd(s["groups"], target_lateral, 0.12, rot, sli)
+
+    def save(s):
+        per_run_df = brc.save_per_run_csv(s["per_run"], rot, os.path.join(out_dir, "rop_curves_per_run.csv"))
+        group_rows = brc.save_group_csv(s["groups"], rot, os.path.join(out_dir, "rop_curves_by_group.csv"))
+        per_run_df.to_parquet(os.path.join(out_dir, "per_run.parquet"), index=False, compression="snappy")
+        pd.DataFrame(group_rows).to_parquet(os.path.join(out_dir, "by_group.parquet"),
+                                            index=False, compression="snappy")
+        brc.save_ttd_csv(s["ttd"], os.path.join(out_dir, "ttd_ranking.csv"))
+        brc.save_ttd_breakdown_csv(s["ttd"], os.path.join(out_dir, "ttd_breakdown.csv"))
+
+    return [("load", load), ("per_run", per_run), ("group", group),
+            ("smoothing", smoothing), ("ttd", ttd), ("save", save)]
+
+
+def vertical_stages(csv_path, out_dir, section_length):
+    """(stage name, fn(state)) steps of the vertical pipeline."""
+
+    def load(s):
+        s["rows"] = brc.load_1ft_data_vertical(csv_path)
+        s["n_rows"] = len(s["rows"])
+
+    def roadmap(s):
+        s["roadmap"], s["fm_order"] = brc.build_formation_roadmap(s["rows"])
+
+    def per_run(s):
+        s["per_run"] = brc.build_per_run_curves_vertical(s["rows"])
+
+    def group(s):
+        s["groups"] = brc.build_group_curves_vertical(s["per_run"], s["roadmap"])
+
+    def smoothing(s):
+        for gc in s["groups"].values():
+            brc.smooth_formation_curves(gc["rotary_raw"], s["roadmap"], brc.ROLLING_WINDOW_VERT)
+            brc.smooth_formation_curves(gc["slide_raw"], s["roadmap"], brc.ROLLING_WINDOW_VERT)
+
+    def ttd(s):
+        groups, _ = brc.filter_groups_by_formation_coverage(s["groups"], s["roadmap"], s["fm_order"])
+        s["ttd"] = brc.calculate_ttd_vertical(groups, s["roadmap"], s["fm_order"], section_length, 0.2)
+
+    def save(s):
+        per_run_rows = brc.save_per_run_csv_vertical(
+            s["per_run"], os.path.join(out_dir, "rop_curves_per_run_vertical.csv"))
+        group_rows = brc.save_group_csv_vertical(
+            s["groups"], os.path.join(out_dir, "rop_curves_by_group_vertical.csv"))
+        pd.DataFrame(per_run_rows).to_parquet(os.path.join(out_dir, "per_run_vertical.parquet"),
+                                              index=False, compression="snappy")
+        pd.DataFrame(group_rows).to_parquet(os.path.join(out_dir, "by_group_vertical.parquet"),
+                                            index=False, compression="snappy")
+        brc.save_ttd_csv(s["ttd"], os.path.join(out_dir, "ttd_ranking_vertical.csv"))
+        brc.save_ttd_breakdown_csv(s["ttd"], os.path.join(out_dir, "ttd_breakdown_vertical.csv"))
+
+    return [("load", load), ("roadmap", roadmap), ("per_run", per_run), ("group", group),
+            ("smoothing", smoothing), ("ttd", ttd), ("save", save)]
+
+
+def run_stages(stages, repeat):
+    """Best-of-repeat seconds and tracemalloc peak MB per stage, plus row count."""
+    best = {}
+    n_rows = 0
+    for _ in range(repeat):
+        state = {}
+        for name, fn in stages:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn(state)
+            elapsed = time.perf_counter() - t0
+            best[name] = min(best.get(name, elapsed), elapsed)
+        n_rows = state["n_rows"]
+
+    peaks = {}
+    state = {}
+    tracemalloc.start()
+    try:
+        for name, fn in stages:
+            tracemalloc.reset_peak()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn(state)
+            peaks[name] = tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+    return best, peaks, n_rows
+
+
+# ---------------------------------------------------------------------------
+#  Result history
+# ---------------------------------------------------------------------------
+
+def _git(*args):
+    try:
+        out = subprocess.run(["git", *args], cwd=SCRIPT_DIR, capture_output=True,
+                             text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def load_results(path=RESULTS_FILE):
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def find_baseline(records, params, commit=None):
+    """Latest record with the same params (and commit prefix, if given)."""
+    for rec in reversed(records):
+        if rec.get("params") != params:
+            continue
+        if commit and not str(rec.get("commit") or "").startswith(commit):
+            continue
+        return rec
+    return None
+
+
+def print_comparison(record, baseline, threshold):
+    """Print stage deltas against baseline; returns the regressed stages."""
+    print(f"\n  Compared with {baseline.get('commit') or 'unknown'}"
+          f"{' (dirty)' if baseline.get('dirty') else ''} from {baseline.get('timestamp', '?')}")
+    print(f"  {'Stage':<22} {'Before (ms)':>12} {'After (ms)':>12} {'Change':>9}  "
+          f"{'Peak MB':>8} {'Before':>8}")
+    print(f"  {'-' * 78}")
+    regressions = []
+    for mode, stages in record["seconds"].items():
+        old_stages = baseline.get("seconds", {}).get(mode, {})
+        for stage, sec in stages.items():
+            old = old_stages.get(stage)
+            peak = record["peak_mb"][mode][stage]
+            old_peak = baseline.get("peak_mb", {}).get(mode, {}).get(stage)
+            label = f"{mode}.{stage}"
+            if old is None:
+                print(f"  {label:<22} {'-':>12} {sec * 1000:>12.1f} {'new':>9}  {peak:>8.1f}")
+                continue
+            change = (sec - old) / old if old > 0 else 0.0
+            flag = ""
+            if change > threshold and (sec - old) * 1000 > MIN_REGRESSION_MS:
+                flag = "  REGRESSION"
+                regressions.append(label)
+            old_peak_s = f"{old_peak:>8.1f}" if old_peak is not None else f"{'-':>8}"
+            print(f"  {label:<22} {old * 1000:>12.1f} {sec * 1000:>12.1f} {change:>+8.1%}  "
+                  f"{peak:>8.1f} {old_peak_s}{flag}")
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+#  Main
+# ---------------------------------------------------------------------------
+
+def main():
+    params = {
+        "wells": 20,
+        "runs_per_well": 2,
+        "feet_per_run": 5000,
+        "slide_ratio": 0.15,
+        "formations": 6,
+        "groups": 6,
+        "engine": "auto",
+        "mode": "both",
+        "seed": 7,
+    }
+    int_flags = {"--wells": "wells", "--runs-per-well": "runs_per_well",
+                 "--feet-per-run": "feet_per_run", "--formations": "formations",
+                 "--groups": "groups", "--seed": "seed"}
+    repeat = 3
+    compare = None
+    threshold = 0.10
+    save = True
+    fail_on_regression = False
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] in int_flags and i + 1 < len(args):
+            params[int_flags[args[i]]] = int(args[i + 1])
+            i += 2
+        elif args[i] == "--slide-ratio" and i + 1 < len(args):
+            params["slide_ratio"] = float(args[i + 1])
+            i += 2
+        elif args[i] in ("--engine", "--mode") and i + 1 < len(args):
+            params[args[i][2:]] = args[i + 1]
+            i += 2
+        elif args[i] == "--repeat" and i + 1 < len(args):
+            repeat = max(1, int(args[i + 1]))
+            i += 2
+        elif args[i] == "--compare" and i + 1 < len(args):
+            compare = args[i + 1]
+            i += 2
+        elif args[i] == "--threshold" and i + 1 < len(args):
+            threshold = float(args[i + 1])
+            i += 2
+        elif args[i] == "--no-save":
+            save = False
+            i += 1
+        elif args[i] == "--fail-on-regression":
+            fail_on_regression = True
+            i += 1
+        else:
+            i += 1
+
+    modes = ["lateral", "vertical"] if params["mode"] == "both" else [params["mode"]]
+    # Rotary curves only reach one run's length from the run start
+    target_lateral = params["feet_per_run"]
+    section_length = params["runs_per_well"] * params["feet_per_run"]
+
+    print(f"\n{'=' * 70}")
+    print(f"  ROP CURVE BUILD BENCHMARK")
+    print(f"  {params['wells']} wells x {params['runs_per_well']} runs x "
+          f"{params['feet_per_run']:,} ft, slide {params['slide_ratio']:.0%}, "
+          f"{params['formations']} formations, {params['groups']} groups")
+    print(f"  Modes: {', '.join(modes)} | Engine: {params['engine']} | best of {repeat}")
+    print(f"{'=' * 70}\n")
+
+    work_dir = tempfile.mkdtemp(prefix="bench_rop_curves_")
+    seconds, peak_mb, rows = {}, {}, {}
+    try:
+        t0 = time.perf_counter()
+        lateral_df, vertical_df = make_1ft_data(
+            params["wells"], params["runs_per_well"], params["feet_per_run"],
+            params["slide_ratio"], params["formations"], params["groups"], params["seed"])
+        paths = {"lateral": os.path.join(work_dir, "rop_1ft_data.csv"),
+                 "vertical": os.path.join(work_dir, "rop_1ft_data_vertical.csv")}
+        for mode, df in (("lateral", lateral_df), ("vertical", vertical_df)):
+            if mode in modes:
+                df.to_csv(paths[mode], index=False)
+        del lateral_df, vertical_df
+        print(f"  Generated synthetic 1ft data in {time.perf_counter() - t0:.1f}s")
+
+        for mode in modes:
+            out_dir = os.path.join(work_dir, mode)
+            os.makedirs(out_dir)
+            if mode == "lateral":
+                stages = lateral_stages(paths[mode], out_dir, params["engine"], target_lateral)
+            else:
+                stages = vertical_stages(paths[mode], out_dir, section_length)
+            seconds[mode], peak_mb[mode], rows[mode] = run_stages(stages, repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n  {'Stage':<22} {'Time (ms)':>12} {'Peak MB':>9}")
+    print(f"  {'-' * 45}")
+    for mode in modes:
+        for stage, sec in seconds[mode].items():
+            print(f"  {mode + '.' + stage:<22} {sec * 1000:>12.1f} {peak_mb[mode][stage]:>9.1f}")
+        total = sum(seconds[mode].values())
+        print(f"  {mode + ' total':<22} {total * 1000:>12.1f}   ({rows[mode]:,} rows)")
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n  Process peak RSS: {max_rss_mb:.0f} MB")
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "params": params,
+        "repeat": repeat,
+        "rows": rows,
+        "seconds": seconds,
+        "peak_mb": peak_mb,
+        "max_rss_mb": round(max_rss_mb, 1),
+    }
+
+    baseline = find_baseline(load_results(), params, compare)
+    regressions = []
+    if baseline is not None:
+        regressions = print_comparison(record, baseline, threshold)
+    elif compare:
+        print(f"\n  No earlier result for commit {compare} with these parameters")
+
+    if save:
+        with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\n  Results appended to {os.path.basename(RESULTS_FILE)}")
+
+    if regressions:
+        print(f"\n  {len(regressions)} stage(s) slower by more than {threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        if fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Build ROP curves for every section of a target well in one process.
+
+run_all_sections.py used to start build_rop_curves.py as a fresh
+subprocess for each section, one after another, paying the pandas / NumPy
+import and db init every time. build_sections() calls main_lateral /
+main_vertical in-process instead and fans the sections out across a
+process pool:
+
+  - each worker imports build_rop_curves once and builds several
+    sections, reusing its memoized motor / bit metadata parsing
+  - sections build concurrently; each one writes only its own output dir,
+    its own Parquet files and its own ttd_rankings rows (SQLite is in WAL
+    mode with a 30 s busy timeout)
+  - a section's console output is captured and printed in one piece, in
+    section order, so logs do not interleave
+
+Formation roadmaps are built from each section's own 1ft rows, so there
+is nothing to share across sections there.
+
+Usage:
+    python build_all_sections.py [target_sections.json] [--workers 4] [--max-missing-formations 1]
+                                 [--bootstrap 1000] [--export-csv]
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import build_rop_curves
+import db
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def section_jobs(sections, max_missing_formations=1, export_csv=False, bootstrap_iters=0,
+                 sections_dir=None):
+    """build_section() jobs for target_sections.json entries.
+
+    Output dirs (sections_dir/<safe name>, default SCRIPT_DIR/sections) and
+    1ft CSV names follow run_all_sections.py. Sections
+    whose 1ft data is missing are still returned; build_section() reports
+    them as skipped (it checks the Parquet store too, which needs the db).
+    """
+    sections_dir = sections_dir or os.path.join(SCRIPT_DIR, "sections")
+    jobs = []
+    for section in sections:
+        name = section["name"]
+        mode = section.get("mode", "vertical")
+        safe_name = name.replace(" ", "_").replace("/", "-")
+        out_dir = os.path.join(sections_dir, safe_name)
+        csv_name = "rop_1ft_data_vertical.csv" if mode == "vertical" else "rop_1ft_data.csv"
+        jobs.append({
+            "name": name,
+            "mode": mode,
+            "csv_path": os.path.join(out_dir, csv_name),
+            "output_dir": out_dir,
+            "section_length": int(section.get("section_length_md", 5000)),
+            "max_missing_formations": max_missing_formations,
+            "export_csv": export_csv,
+            "bootstrap_iters": bootstrap_iters,
+        })
+    return jobs
+
+
+def build_section(job):
+    """Build one section's curves in this process.
+
+    Returns (name, status, elapsed seconds, captured output) where status
+    is "ok", "skipped" or "failed".
+    """
+    buf = io.StringIO()
+    status = "ok"
+    t0 = time.time()
+    with contextlib.redirect_stdout(buf):
+        try:
+            out = job["output_dir"]
+            latest = db.get_latest_run()
+            from_parquet = db.has_1ft_data(os.path.basename(out), job["mode"],
+                                           run_id=latest["id"] if latest else None)
+            if not from_parquet and not os.path.exists(job["csv_path"]):
+                print(f"  SKIP curves: {job['csv_path']} not found")
+                status = "skipped"
+            elif job["mode"] == "vertical":
+                build_rop_curves.main_vertical(
+                    job["csv_path"], job["section_length"], None, out,
+                    job["max_missing_formations"], job["export_csv"], from_parquet,
+                    job["bootstrap_iters"])
+            else:
+                build_rop_curves.main_lateral(
+                    job["csv_path"], build_rop_curves.DEFAULT_ROTARY_BIN,
+                    build_rop_curves.DEFAULT_SLIDE_BIN, job["section_length"], None, out,
+                    job["export_csv"], "auto", from_parquet, job["bootstrap_iters"])
+        except (Exception, SystemExit):
+            traceback.print_exc(file=buf)
+            status = "failed"
+    return job["name"], status, time.time() - t0, buf.getvalue()
+
+
+def build_sections(jobs, workers=None):
+    """Run build_section() for every job, across a process pool.
+
+    workers defaults to one per section up to the CPU count; 1 builds the
+    sections sequentially in this process. Each section's output is
+    printed as it completes, in job order. Returns {name: status}.
+    """
+    if not jobs:
+        return {}
+    if workers is None:
+        workers = min(len(jobs), os.cpu_count() or 1)
+
+    if workers <= 1:
+        results = map(build_section, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(build_section, jobs)
+
+    statuses = {}
+    try:
+        for name, status, elapsed, output in results:
+            print(f"\n{'-' * 70}")
+            print(f"  BUILD ROP CURVES: {name}  [{status}, {elapsed:.1f}s]")
+            print(f"{'-' * 70}")
+            print(output, end="")
+            statuses[name] = status
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return statuses
+
+
+def main():
+    sections_json = os.path.join(SCRIPT_DIR, "target_sections.json")
+    workers = None
+    max_missing_formations = 1
+    bootstrap_iters = 0
+    export_csv = False
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        if args[i] == "--workers" and i + 1 < len(args):
+            workers = int(args[i + 1])
+            i += 2
+        elif args[i] == "--max-missing-formations" and i + 1 < len(args):
+            max_missing_formations = int(args[i + 1])
+            i += 2
+        elif args[i] == "--bootstrap" and i + 1 < len(args):
+            bootstrap_iters = int(args[i + 1])
+            i += 2
+        elif args[i] == "--export-csv":
+            export_csv = True
+            i += 1
+        elif not args[i].startswith("--"):
+            sections_json = args[i]
+            if not os.path.isabs(sections_json):
+                sections_json = os.path.join(SCRIPT_DIR, sections_json)
+            i += 1
+        else:
+            i += 1
+
+    if not os.path.exists(sections_json):
+        print(f"ERROR: {sections_json} not found")
+        sys.exit(1)
+    with open(sections_json, encoding="utf-8") as f:
+        sections = json.load(f).get("sections", [])
+
+    jobs = section_jobs(sections, max_missing_formations, export_csv, bootstrap_iters)
+    n_workers = workers if workers is not None else min(len(jobs), os.cpu_count() or 1)
+
+    print(f"\n{'=' * 70}")
+    print(f"  BUILD ROP CURVES: ALL SECTIONS")
+    print(f"  Sections: {len(jobs)} | Workers: {max(n_workers, 1)}")
+    print(f"{'=' * 70}")
+
+    t0 = time.time()
+    statuses = build_sections(jobs, n_workers)
+    elapsed = time.time() - t0
+
+    print(f"\n{'=' * 70}")
+    print(f"  {'Section':<30} Status")
+    for name, status in statuses.items():
+        print(f"  {name:<30} {status}")
+    print(f"  Total time: {elapsed:.1f}s")
+    print(f"{'=' * 70}")
+    if any(s == "failed" for s in statuses.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
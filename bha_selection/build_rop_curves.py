@@ -17,6 +17,18 @@ per-group P10/P50/P90 curves, agitator impact, and Time-to-TD ranking.
 
 Usage:
     python build_rop_curves.py [rop_1ft_data.csv] [--bin-size 100] [--lateral-length 10000] [--slide-pct 0.12]
+    python build_rop_curves.py rop_1ft_data.csv --engine vectorized   # dict | vectorized | auto (default)
+    python build_rop_curves.py --output-dir Production_Lateral --source csv  # parquet | csv | auto (default)
+    python build_rop_curves.py rop_1ft_data.csv --bootstrap 1000 --seed 7   # TTD P10/P50/P90 + rank stability
+    python build_rop_curves.py rop_1ft_data.csv --full-rebuild   # ignore the per-run curve cache
+
+The 1ft input is read from the section's Parquet store (db.load_1ft_data,
+section = basename of --output-dir) when one exists; the CSV argument is
+the fallback.
+
+Per-run and group curves are cached in the output directory
+(_curve_cache_<mode>.pkl, see curve_cache.py); a rerun only rebuilds runs
+whose 1ft rows changed and the groups that contain them.
     python build_rop_curves.py rop_1ft_data_vertical.csv --mode vertical --section-length 5000 --slide-pct 0.20
 """
 import csv
@@ -25,11 +37,19 @@ import os
 import re
 import sys
 import statistics
+import time
 from collections import defaultdict
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 
+import curve_cache
 import db
+from curve_stats import quantiles, sliding_median
+from run_curves import RunCurves
+from ttd_bootstrap import bootstrap_ttd, lateral_steps, vertical_steps
+from ttd_engine import LateralTTDModel, fallback_p50
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -40,6 +60,23 @@ ROLLING_WINDOW_VERT = 3    # bins for rolling median smoothing (vertical, fewer
 FORMATION_SEGMENT_PCT = 10 # % per formation segment
 MIN_LATERAL_COVERAGE_PCT = 0.85
 MIN_BIT_SUBSET_RUNS = 2
+VECTORIZED_MIN_ROWS = 50000 # --engine auto uses the vectorized path from this many 1ft rows
+CURVE_CACHE_FILE = "_curve_cache_{mode}.pkl"  # per-run / group curve cache in the output dir
+
+# Columns curve building reads from the 1ft Parquet store (column pruning)
+_1FT_META_COLUMNS = [
+    "asset_id", "well_name", "operator", "bha_number", "equiv_bha_key",
+    "has_agitator", "bit_manufacturer", "bit_model", "motor_od",
+    "motor_model", "motor_lobe_config", "motor_stages", "state",
+]
+LATERAL_1FT_COLUMNS = _1FT_META_COLUMNS + [
+    "rop_ft_hr", "distance_from_run_start", "distance_from_lateral_start",
+]
+VERTICAL_1FT_COLUMNS = _1FT_META_COLUMNS + [
+    "hole_depth", "rop_ft_hr", "distance_from_run_start",
+    "formation_name", "formation_pct", "formation_segment",
+]
+DRILLING_STATES = ["Rotary Drilling", "Slide Drilling"]
 
 
 def _clean_text(value, default="N/A"):
@@ -51,6 +88,7 @@ def _clean_text(value, default="N/A"):
     return text
 
 
+@lru_cache(maxsize=None)
 def _parse_motor_lobes(lobe_config):
     text = _clean_text(lobe_config, default="")
     if "/" not in text:
@@ -61,6 +99,7 @@ def _parse_motor_lobes(lobe_config):
     return rotor, stator
 
 
+@lru_cache(maxsize=None)
 def _parse_motor_stages(motor_model, motor_stages=None):
     explicit = _clean_text(motor_stages, default="")
     if explicit:
@@ -158,17 +197,78 @@ def load_1ft_data(csv_path):
     return rows
 
 
+def load_1ft_parquet(section_name, mode="lateral", run_id=None):
+    """Load a section's 1ft data from the db Parquet store.
+
+    Reads only the columns curve building needs and pushes the state (and,
+    for vertical mode, formation) predicates down to the Parquet reader.
+    The frame is shaped like the CSV loaders' output: metadata columns are
+    strings, numeric columns are float64 rounded to the 0.1 the pull step
+    writes (the streamed store keeps them as float32), and rows the CSV
+    loaders would skip are dropped. Returns None if no Parquet exists.
+    """
+    if db.find_1ft_data(section_name, mode, run_id) is None:
+        return None
+    filters = [("state", "in", DRILLING_STATES)]
+    if mode == "vertical":
+        columns = VERTICAL_1FT_COLUMNS
+        float_columns = ["rop_ft_hr", "distance_from_run_start", "formation_pct"]
+        filters.append(("formation_name", "!=", ""))
+    else:
+        columns = LATERAL_1FT_COLUMNS
+        float_columns = ["rop_ft_hr", "distance_from_run_start", "distance_from_lateral_start"]
+    df = db.load_1ft_data(section_name, mode, columns=columns, run_id=run_id,
+                          filters=filters)
+    if mode == "vertical" and "distance_from_run_start" not in df.columns:
+        df["distance_from_run_start"] = 0.0
+    required = float_columns + (["formation_segment"] if mode == "vertical" else [])
+    if df.empty or any(c not in df.columns for c in required):
+        return df.iloc[0:0]
+
+    keep = np.ones(len(df), dtype=bool)
+    for c in required:
+        values = df[c].to_numpy(dtype=float, na_value=np.nan)
+        keep &= ~np.isnan(values)
+        df[c] = np.round(values, 1)
+    df = df.loc[keep].reset_index(drop=True)
+    if mode == "vertical":
+        df["formation_segment"] = df["formation_segment"].astype(np.int64)
+    if "hole_depth" in df.columns:
+        df["hole_depth"] = np.round(df["hole_depth"].to_numpy(dtype=float, na_value=np.nan), 1)
+    for c in df.columns:
+        if c not in required and c != "hole_depth":
+            df[c] = _text_column(df[c])
+    return df
+
+
+def _text_column(col):
+    """Column as the strings the CSV would hold ("" for missing values)."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # Dictionary-encoded store columns: convert the categories, not every row
+        labels = np.array([str(v) for v in col.cat.categories] + [""], dtype=object)
+        return labels[col.cat.codes.to_numpy()]  # code -1 (missing) -> ""
+    if isinstance(col.dtype, pd.StringDtype):
+        return col.fillna("").to_numpy(dtype=object)
+    values = col.astype(object)
+    return values.where(values.notna(), "").map(str).to_numpy(dtype=object)
+
+
 def percentile(data, pct):
     """Compute percentile from sorted data."""
-    if not data:
-        return None
-    s = sorted(data)
-    k = (len(s) - 1) * pct / 100.0
-    f = int(k)
-    c = f + 1
-    if c >= len(s):
-        return s[f]
-    return s[f] + (k - f) * (s[c] - s[f])
+    return quantiles(data, (pct,))[0]
+
+
+def _percentile_band(rops, min_runs_for_confidence):
+    """P10/P50/P90 of one bin's run ROPs (single sort) plus run count."""
+    p10, p50, p90 = quantiles(rops, (10, 50, 90))
+    n = len(rops)
+    return {
+        "p10": round(p10, 1),
+        "p50": round(p50, 1),
+        "p90": round(p90, 1),
+        "num_runs": n,
+        "confident": n >= min_runs_for_confidence,
+    }
 
 
 def bin_value(distance, bin_size):
@@ -182,20 +282,7 @@ def rolling_median(values, window):
     Returns a list of the same length. Edge values use a smaller window.
     None values are passed through unchanged.
     """
-    n = len(values)
-    if n == 0:
-        return []
-    result = []
-    half = window // 2
-    for i in range(n):
-        lo = max(0, i - half)
-        hi = min(n, i + half + 1)
-        neighborhood = [v for v in values[lo:hi] if v is not None]
-        if neighborhood:
-            result.append(round(statistics.median(neighborhood), 1))
-        else:
-            result.append(values[i])
-    return result
+    return sliding_median(values, window)
 
 
 def smooth_group_curve(curve_dict, window):
@@ -211,9 +298,9 @@ def smooth_group_curve(curve_dict, window):
     p50s = [curve_dict[b]["p50"] for b in bins_sorted]
     p90s = [curve_dict[b]["p90"] for b in bins_sorted]
 
-    p10_smooth = rolling_median(p10s, window)
-    p50_smooth = rolling_median(p50s, window)
-    p90_smooth = rolling_median(p90s, window)
+    p10_smooth = sliding_median(p10s, window)
+    p50_smooth = sliding_median(p50s, window)
+    p90_smooth = sliding_median(p90s, window)
 
     smoothed = {}
     for i, b in enumerate(bins_sorted):
@@ -425,29 +512,15 @@ def build_group_curves_vertical(per_run, roadmap, min_runs_for_confidence=3):
         rotary_group = {}
         for key in roadmap:
             if key in rotary_bin_rops:
-                rops = rotary_bin_rops[key]
-                n = len(rops)
-                rotary_group[key] = {
-                    "p10": round(percentile(rops, 10), 1),
-                    "p50": round(percentile(rops, 50), 1),
-                    "p90": round(percentile(rops, 90), 1),
-                    "num_runs": n,
-                    "confident": n >= min_runs_for_confidence,
-                }
+                rotary_group[key] = _percentile_band(rotary_bin_rops[key],
+                                                     min_runs_for_confidence)
 
         # Build slide P10/P50/P90
         slide_group = {}
         for key in roadmap:
             if key in slide_bin_rops:
-                rops = slide_bin_rops[key]
-                n = len(rops)
-                slide_group[key] = {
-                    "p10": round(percentile(rops, 10), 1),
-                    "p50": round(percentile(rops, 50), 1),
-                    "p90": round(percentile(rops, 90), 1),
-                    "num_runs": n,
-                    "confident": n >= min_runs_for_confidence,
-                }
+                slide_group[key] = _percentile_band(slide_bin_rops[key],
+                                                    min_runs_for_confidence)
 
         # Agitator impact
         agitator_impact = {}
@@ -530,9 +603,9 @@ def smooth_formation_curves(curve_dict, roadmap, window):
     p50s = [curve_dict[k]["p50"] for k in ordered_keys]
     p90s = [curve_dict[k]["p90"] for k in ordered_keys]
 
-    p10_smooth = rolling_median(p10s, window)
-    p50_smooth = rolling_median(p50s, window)
-    p90_smooth = rolling_median(p90s, window)
+    p10_smooth = sliding_median(p10s, window)
+    p50_smooth = sliding_median(p50s, window)
+    p90_smooth = sliding_median(p90s, window)
 
     smoothed = {}
     for i, k in enumerate(ordered_keys):
@@ -597,7 +670,7 @@ def _rebuild_single_vertical_group(run_list, roadmap):
 
 def calculate_ttd_vertical(group_curves, roadmap, fm_order, section_length_ft,
                            expected_slide_pct, formation_md_lengths=None,
-                           include_bit_breakdown=True):
+                           include_bit_breakdown=True, override_slide_pct=None):
     """Calculate Time to TD for vertical sections.
 
     For each formation segment in the roadmap, computes drilling time
@@ -612,6 +685,9 @@ def calculate_ttd_vertical(group_curves, roadmap, fm_order, section_length_ft,
 
     If formation_md_lengths is not provided, distributes section_length_ft
     equally across the formations in the roadmap.
+
+    override_slide_pct: if given, used for every non-RSS group instead of
+    its observed slide % (what-if ranking).
     """
     # Compute MD length per formation segment
     if formation_md_lengths is None:
@@ -628,7 +704,14 @@ def calculate_ttd_vertical(group_curves, roadmap, fm_order, section_length_ft,
         segments_missing = 0
 
         # Use per-group slide pct; fall back to global if not available
-        slide_pct = gc.get("group_slide_pct", expected_slide_pct)
+        if override_slide_pct is not None and not gc.get("is_rss", False):
+            slide_pct = override_slide_pct
+        else:
+            slide_pct = gc.get("group_slide_pct", expected_slide_pct)
+
+        # Group fallback ROPs for segments without a confident bin (once per group)
+        rotary_fallback = fallback_p50(gc["rotary"])
+        slide_fallback = fallback_p50(gc["slide"])
 
         # Per-formation detail collectors keyed by formation name
         fm_detail = {}  # {fm_name: {rot_ft, rot_time, sli_ft, sli_time, rot_rops, sli_rops, total_len}}
@@ -652,8 +735,7 @@ def calculate_ttd_vertical(group_curves, roadmap, fm_order, section_length_ft,
             if rotary_rop and rotary_rop > 0:
                 rotary_time = seg_len * (1 - slide_pct) / rotary_rop
             else:
-                all_rotary = [v["p50"] for v in gc["rotary"].values() if v["confident"]]
-                fallback = statistics.median(all_rotary) if all_rotary else None
+                fallback = rotary_fallback
                 if fallback and fallback > 0:
                     rotary_time = seg_len * (1 - slide_pct) / fallback
                     rotary_rop = fallback
@@ -664,8 +746,7 @@ def calculate_ttd_vertical(group_curves, roadmap, fm_order, section_length_ft,
             if slide_rop and slide_rop > 0 and slide_pct > 0:
                 slide_time = seg_len * slide_pct / slide_rop
             else:
-                all_slide = [v["p50"] for v in gc["slide"].values() if v["confident"]]
-                fallback = statistics.median(all_slide) if all_slide else None
+                fallback = slide_fallback
                 if fallback and fallback > 0:
                     slide_time = seg_len * slide_pct / fallback
                     slide_rop = fallback
@@ -738,6 +819,7 @@ def calculate_ttd_vertical(group_curves, roadmap, fm_order, section_length_ft,
                     expected_slide_pct=expected_slide_pct,
                     formation_md_lengths=formation_md_lengths,
                     include_bit_breakdown=False,
+                    override_slide_pct=override_slide_pct,
                 )
                 if not subset_results:
                     continue
@@ -870,6 +952,36 @@ def save_group_csv_vertical(group_curves, out_path):
     return rows
 
 
+def _new_run_info(meta, total_feet):
+    """Per-run metadata dict from the run's first 1ft row."""
+    run_info = {
+        "asset_id": meta["asset_id"],
+        "well_name": meta["well_name"],
+        "operator": meta["operator"],
+        "bha_number": meta["bha_number"],
+        "equiv_bha_key": meta["equiv_bha_key"],
+        "has_agitator": meta.get("has_agitator", "False"),
+        "bit_manufacturer": meta.get("bit_manufacturer", ""),
+        "bit_model": meta.get("bit_model", ""),
+        "motor_diam": meta.get("motor_od", ""),
+        "motor_model": meta.get("motor_model", ""),
+        "motor_lobe_config": meta.get("motor_lobe_config", ""),
+        "motor_stages_raw": meta.get("motor_stages", ""),
+        "motor_rotor_lobes": "N/A",
+        "motor_stator_lobes": "N/A",
+        "motor_stages": "N/A",
+        "total_feet": total_feet,
+    }
+    rotor_lobes, stator_lobes = _parse_motor_lobes(run_info["motor_lobe_config"])
+    run_info["motor_rotor_lobes"] = rotor_lobes
+    run_info["motor_stator_lobes"] = stator_lobes
+    run_info["motor_stages"] = _parse_motor_stages(
+        run_info["motor_model"],
+        run_info.get("motor_stages_raw"),
+    )
+    return run_info
+
+
 def build_per_run_curves(rows, rotary_bin, slide_bin):
     """Build per-run binned curves.
 
@@ -885,32 +997,7 @@ def build_per_run_curves(rows, rotary_bin, slide_bin):
 
     per_run = {}
     for run_key, feet in run_data.items():
-        meta = feet[0]
-        run_info = {
-            "asset_id": meta["asset_id"],
-            "well_name": meta["well_name"],
-            "operator": meta["operator"],
-            "bha_number": meta["bha_number"],
-            "equiv_bha_key": meta["equiv_bha_key"],
-            "has_agitator": meta.get("has_agitator", "False"),
-            "bit_manufacturer": meta.get("bit_manufacturer", ""),
-            "bit_model": meta.get("bit_model", ""),
-            "motor_diam": meta.get("motor_od", ""),
-            "motor_model": meta.get("motor_model", ""),
-            "motor_lobe_config": meta.get("motor_lobe_config", ""),
-            "motor_stages_raw": meta.get("motor_stages", ""),
-            "motor_rotor_lobes": "N/A",
-            "motor_stator_lobes": "N/A",
-            "motor_stages": "N/A",
-            "total_feet": len(feet),
-        }
-        rotor_lobes, stator_lobes = _parse_motor_lobes(run_info["motor_lobe_config"])
-        run_info["motor_rotor_lobes"] = rotor_lobes
-        run_info["motor_stator_lobes"] = stator_lobes
-        run_info["motor_stages"] = _parse_motor_stages(
-            run_info["motor_model"],
-            run_info.get("motor_stages_raw"),
-        )
+        run_info = _new_run_info(feet[0], len(feet))
 
         # Rotary bins by distance_from_run_start (100 ft bins)
         rotary_bins = defaultdict(list)
@@ -993,7 +1080,7 @@ def build_group_curves(per_run, rotary_bin, slide_bin, min_runs_for_confidence=3
         slide_bin_rops_agitator = defaultdict(list)
         slide_bin_rops_no_agitator = defaultdict(list)
         for run_info in run_list:
-            has_agitator = str(run_info.get("has_agitator", "")).lower() in ("true", "1", "yes")
+            has_agitator = _is_agitator_run(run_info)
             for b, curve_data in run_info["slide_curve"].items():
                 slide_bin_rops[b].append(curve_data["median_rop"])
                 if has_agitator:
@@ -1010,28 +1097,12 @@ def build_group_curves(per_run, rotary_bin, slide_bin, min_runs_for_confidence=3
         # Build rotary P10/P50/P90
         rotary_group = {}
         for b in sorted(rotary_bin_rops.keys()):
-            rops = rotary_bin_rops[b]
-            n = len(rops)
-            rotary_group[b] = {
-                "p10": round(percentile(rops, 10), 1),
-                "p50": round(percentile(rops, 50), 1),
-                "p90": round(percentile(rops, 90), 1),
-                "num_runs": n,
-                "confident": n >= min_runs_for_confidence,
-            }
+            rotary_group[b] = _percentile_band(rotary_bin_rops[b], min_runs_for_confidence)
 
         # Build slide P10/P50/P90
         slide_group = {}
         for b in sorted(slide_bin_rops.keys()):
-            rops = slide_bin_rops[b]
-            n = len(rops)
-            slide_group[b] = {
-                "p10": round(percentile(rops, 10), 1),
-                "p50": round(percentile(rops, 50), 1),
-                "p90": round(percentile(rops, 90), 1),
-                "num_runs": n,
-                "confident": n >= min_runs_for_confidence,
-            }
+            slide_group[b] = _percentile_band(slide_bin_rops[b], min_runs_for_confidence)
 
         # Agitator vs no-agitator slide comparison
         agitator_impact = {}
@@ -1055,54 +1126,309 @@ def build_group_curves(per_run, rotary_bin, slide_bin, min_runs_for_confidence=3
                 "num_runs": len(pcts),
             }
 
-        # Apply rolling median smoothing to both curve types
-        rotary_group_smooth = smooth_group_curve(rotary_group, ROLLING_WINDOW)
-        slide_group_smooth = smooth_group_curve(slide_group, ROLLING_WINDOW)
+        group_curves[group_key] = _assemble_group_curve(
+            group_key, run_list, rotary_group, slide_group, slide_pct_group, agitator_impact)
 
-        num_agitator = sum(1 for ri in run_list
-                          if str(ri.get("has_agitator", "")).lower() in ("true", "1", "yes"))
+    return group_curves
 
-        # Compute per-group overall slide percentage from actual data
-        total_rotary_ft = sum(ri.get("rotary_feet", 0) for ri in run_list)
-        total_slide_ft = sum(ri.get("slide_feet", 0) for ri in run_list)
-        total_drilling_ft = total_rotary_ft + total_slide_ft
-        is_rss = "RSS" in group_key.upper()
-        if is_rss:
-            grp_slide_pct = 0.0
-        elif total_drilling_ft > 0:
-            grp_slide_pct = round(total_slide_ft / total_drilling_ft, 4)
-        else:
-            grp_slide_pct = 0.0
-        common_motor, bit_usage = _build_group_equipment_metadata(run_list)
 
-        group_curves[group_key] = {
-            "num_runs": len(run_list),
-            "num_wells": len(set(ri["asset_id"] for ri in run_list)),
-            "num_with_agitator": num_agitator,
-            "group_slide_pct": grp_slide_pct,
-            "is_rss": is_rss,
-            "rotary": rotary_group_smooth,
-            "rotary_raw": rotary_group,
-            "slide": slide_group_smooth,
-            "slide_raw": slide_group,
-            "slide_pct": slide_pct_group,
-            "agitator_impact": agitator_impact,
-            "common_motor": common_motor,
-            "bit_usage": bit_usage,
-            "run_list": list(run_list),
-        }
+def _is_agitator_run(run_info):
+    return str(run_info.get("has_agitator", "")).lower() in ("true", "1", "yes")
+
+
+def _assemble_group_curve(group_key, run_list, rotary_group, slide_group,
+                          slide_pct_group, agitator_impact):
+    """Smooth a group's raw P10/P50/P90 curves and attach group metadata."""
+    # Apply rolling median smoothing to both curve types
+    rotary_group_smooth = smooth_group_curve(rotary_group, ROLLING_WINDOW)
+    slide_group_smooth = smooth_group_curve(slide_group, ROLLING_WINDOW)
+
+    num_agitator = sum(1 for ri in run_list if _is_agitator_run(ri))
+
+    # Compute per-group overall slide percentage from actual data
+    total_rotary_ft = sum(ri.get("rotary_feet", 0) for ri in run_list)
+    total_slide_ft = sum(ri.get("slide_feet", 0) for ri in run_list)
+    total_drilling_ft = total_rotary_ft + total_slide_ft
+    is_rss = "RSS" in group_key.upper()
+    if is_rss:
+        grp_slide_pct = 0.0
+    elif total_drilling_ft > 0:
+        grp_slide_pct = round(total_slide_ft / total_drilling_ft, 4)
+    else:
+        grp_slide_pct = 0.0
+    common_motor, bit_usage = _build_group_equipment_metadata(run_list)
+
+    return {
+        "num_runs": len(run_list),
+        "num_wells": len(set(ri["asset_id"] for ri in run_list)),
+        "num_with_agitator": num_agitator,
+        "group_slide_pct": grp_slide_pct,
+        "is_rss": is_rss,
+        "rotary": rotary_group_smooth,
+        "rotary_raw": rotary_group,
+        "slide": slide_group_smooth,
+        "slide_raw": slide_group,
+        "slide_pct": slide_pct_group,
+        "agitator_impact": agitator_impact,
+        "common_motor": common_motor,
+        "bit_usage": bit_usage,
+        "run_list": list(run_list),
+    }
+
+
+# ---------------------------------------------------------------------------
+#  Vectorized lateral engine (pandas / NumPy)
+# ---------------------------------------------------------------------------
+#
+# Same outputs as build_per_run_curves() / build_group_curves(), computed
+# with one sort per curve type instead of per-bin Python lists. Medians and
+# percentiles use the exact formulas of statistics.median() and percentile()
+# and values are rounded with Python's round(), so both engines produce
+# identical dicts and can be diffed.
+
+_LATERAL_FLOAT_COLUMNS = ["rop_ft_hr", "distance_from_run_start", "distance_from_lateral_start"]
+
+
+def _parse_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_1ft_frame(csv_path):
+    """DataFrame equivalent of load_1ft_data() for the vectorized engine.
+
+    Columns are read as the same strings csv.DictReader yields; the three
+    numeric columns are parsed with float() and rows that fail to parse are
+    dropped, exactly as load_1ft_data() does.
+    """
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding="utf-8")
+    if any(c not in df.columns for c in _LATERAL_FLOAT_COLUMNS):
+        return df.iloc[0:0]
+    keep = np.ones(len(df), dtype=bool)
+    parsed = {}
+    for c in _LATERAL_FLOAT_COLUMNS:
+        raw = df[c].to_numpy(dtype=object)
+        try:
+            # object -> float64 calls float() per value, in C
+            parsed[c] = raw.astype(float)
+        except ValueError:
+            values = [_parse_float(v) for v in raw]
+            ok = np.array([v is not None for v in values], dtype=bool)
+            parsed[c] = np.array([v if v is not None else np.nan for v in values], dtype=float)
+            keep &= ok
+    if not keep.all():
+        df = df.loc[keep].reset_index(drop=True)
+    for c, values in parsed.items():
+        df[c] = values[keep]
+    return df
+
+
+def _group_bounds(*keys):
+    """Start offsets and sizes of runs of equal keys in already-sorted arrays."""
+    n = len(keys[0])
+    change = np.zeros(n, dtype=bool)
+    if n:
+        change[0] = True
+    for k in keys:
+        change[1:] |= k[1:] != k[:-1]
+    starts = np.flatnonzero(change)
+    return starts, np.diff(np.append(starts, n))
+
+
+def _grouped_medians(codes, bins, values):
+    """statistics.median() of values per (code, bin), sorted by code then bin.
+
+    Returns (codes, bins, counts, medians) arrays, one entry per group.
+    """
+    order = np.lexsort((values, bins, codes))
+    c, b, v = codes[order], bins[order], values[order]
+    starts, counts = _group_bounds(c, b)
+    mid = starts + counts // 2
+    lower = np.maximum(mid - 1, 0)
+    medians = np.where(counts % 2 == 1, v[mid], (v[lower] + v[mid]) / 2)
+    return c[starts], b[starts], counts, medians
+
+
+def _grouped_percentiles(codes, bins, values, pcts):
+    """percentile() of values per (code, bin) for several pcts with one sort.
+
+    Returns (codes, bins, counts, {pct: array}).
+    """
+    order = np.lexsort((values, bins, codes))
+    c, b, v = codes[order], bins[order], values[order]
+    starts, counts = _group_bounds(c, b)
+    out = {}
+    for pct in pcts:
+        k = (counts - 1) * pct / 100.0
+        f = k.astype(np.int64)
+        hi = f + 1
+        has_hi = hi < counts
+        v_f = v[starts + f]
+        v_c = v[starts + np.where(has_hi, hi, f)]
+        out[pct] = np.where(has_hi, v_f + (k - f) * (v_c - v_f), v_f)
+    return c[starts], b[starts], counts, out
+
+
+def _floor_bins(distance, bin_size):
+    """Vectorized bin_value(): int(distance // bin_size) * bin_size."""
+    return np.floor_divide(distance, bin_size).astype(np.int64) * bin_size
+
+
+def _dense_curve(n_runs, codes, bins, values, digits):
+    """Scatter per-(run, bin) values into a (runs x bins) array over their bin grid.
+
+    Values are rounded with Python's round(), as the dict engine does.
+    Returns (grid, values, column index of each entry).
+    """
+    grid = np.unique(bins)
+    cols = np.searchsorted(grid, bins)
+    dense = np.full((n_runs, len(grid)), np.nan)
+    dense[codes, cols] = [round(v, digits) for v in values.tolist()]
+    return grid, dense, cols
+
+
+def build_run_curves(df, rotary_bin, slide_bin):
+    """Vectorized build_per_run_curves() over a load_1ft_frame() DataFrame.
+
+    Returns the curves as a RunCurves (see run_curves.py); its
+    as_per_run() is the build_per_run_curves() dict.
+    """
+    if df.empty:
+        return RunCurves.from_runs([])
+    # Run codes 0..n_runs-1 in order of first appearance, like the dict engine
+    asset_codes, _ = pd.factorize(df["asset_id"])
+    bha_codes, bha_uniques = pd.factorize(df["bha_number"])
+    codes, uniques = pd.factorize(asset_codes.astype(np.int64) * len(bha_uniques) + bha_codes)
+    n_runs = len(uniques)
+    total_feet = np.bincount(codes, minlength=n_runs)
+    first_row = np.full(n_runs, len(df), dtype=np.int64)
+    np.minimum.at(first_row, codes, np.arange(len(df)))
+
+    state = df["state"].to_numpy(dtype=object)
+    rop = df["rop_ft_hr"].to_numpy(dtype=float)
+    is_rot = state == "Rotary Drilling"
+    is_slide = state == "Slide Drilling"
+    lat_bins = _floor_bins(df["distance_from_lateral_start"].to_numpy(dtype=float), slide_bin)
+
+    # Rotary bins by distance_from_run_start, slide bins by lateral-start distance
+    rot_curves = _grouped_medians(
+        codes[is_rot],
+        _floor_bins(df["distance_from_run_start"].to_numpy(dtype=float)[is_rot], rotary_bin),
+        rop[is_rot])
+    slide_curves = _grouped_medians(codes[is_slide], lat_bins[is_slide], rop[is_slide])
+
+    # Slide percentage per lateral-start bin (rotary + slide feet only)
+    drilling = is_rot | is_slide
+    d_codes, d_bins, d_slide = codes[drilling], lat_bins[drilling], is_slide[drilling]
+    order = np.lexsort((d_bins, d_codes))
+    d_codes, d_bins, d_slide = d_codes[order], d_bins[order], d_slide[order]
+    starts, counts = _group_bounds(d_codes, d_bins)
+    slide_counts = (np.add.reduceat(d_slide.astype(np.int64), starts)
+                    if len(starts) else np.zeros(0, dtype=np.int64))
+
+    rotary_ft = np.bincount(codes[is_rot], minlength=n_runs)
+    slide_ft = np.bincount(codes[is_slide], minlength=n_runs)
+
+    meta_cols = [c for c in df.columns if c not in _LATERAL_FLOAT_COLUMNS]
+    first = df.iloc[first_row][meta_cols].to_dict("records")
+    meta_rows = []
+    for idx in range(n_runs):
+        run_info = _new_run_info(first[idx], int(total_feet[idx]))
+        run_info["rotary_feet"] = int(rotary_ft[idx])
+        run_info["slide_feet"] = int(slide_ft[idx])
+        meta_rows.append(run_info)
+    # object columns keep the exact values run_info dicts held
+    meta = pd.DataFrame(meta_rows, dtype=object)
+
+    grids, values, foot_counts = {}, {}, {}
+    for name, (c, b, n, med) in (("rotary_curve", rot_curves), ("slide_curve", slide_curves)):
+        grids[name], values[name], cols = _dense_curve(n_runs, c, b, med, 1)
+        foot_counts[name] = np.zeros(values[name].shape, dtype=np.int32)
+        foot_counts[name][c, cols] = n
+    grids["slide_pct_curve"], values["slide_pct_curve"], _ = _dense_curve(
+        n_runs, d_codes[starts], d_bins[starts], slide_counts / np.maximum(counts, 1), 3)
+
+    return RunCurves(meta, grids, values, foot_counts)
+
+
+def build_per_run_curves_vectorized(df, rotary_bin, slide_bin):
+    """Vectorized build_per_run_curves(): {(asset_id, bha_number): RunView}."""
+    return build_run_curves(df, rotary_bin, slide_bin).as_per_run()
+
+
+def build_group_curves_vectorized(per_run, rotary_bin, slide_bin, min_runs_for_confidence=3):
+    """Vectorized build_group_curves(): per-group percentiles with one sort per curve."""
+    groups = defaultdict(list)
+    for run_key, run_info in per_run.items():
+        groups[run_info["equiv_bha_key"]].append(run_info)
+    group_keys = list(groups)
+    runs = [ri for gk in group_keys for ri in groups[gk]]
+    run_group = np.repeat(np.arange(len(group_keys)), [len(groups[gk]) for gk in group_keys])
+    curves = RunCurves.from_runs(runs)
+    agitator = np.array([_is_agitator_run(ri) for ri in runs], dtype=bool)
+
+    def _by_group(run_idx, bins, values, pcts):
+        g, b, n, q = _grouped_percentiles(run_group[run_idx], bins, values, pcts)
+        table = defaultdict(list)
+        for i, (g_, b_, n_) in enumerate(zip(g.tolist(), b.tolist(), n.tolist())):
+            table[g_].append((b_, n_, {p: q[p][i] for p in pcts}))
+        return table
+
+    def _pct_curve(table, gi):
+        return {b: {
+            "p10": round(float(q[10]), 1),
+            "p50": round(float(q[50]), 1),
+            "p90": round(float(q[90]), 1),
+            "num_runs": n,
+            "confident": n >= min_runs_for_confidence,
+        } for b, n, q in table.get(gi, [])}
+
+    rot_idx, rot_bins, rot_vals, _ = curves.table("rotary_curve")
+    sl_idx, sl_bins, sl_vals, _ = curves.table("slide_curve")
+    pct_idx, pct_bins, pct_vals, _ = curves.table("slide_pct_curve")
+
+    rotary = _by_group(rot_idx, rot_bins, rot_vals, (10, 50, 90))
+    slide = _by_group(sl_idx, sl_bins, sl_vals, (10, 50, 90))
+    ag = agitator[sl_idx]
+    slide_ag = _by_group(sl_idx[ag], sl_bins[ag], sl_vals[ag], (50,))
+    slide_no_ag = _by_group(sl_idx[~ag], sl_bins[~ag], sl_vals[~ag], (50,))
+    slide_pct = _by_group(pct_idx, pct_bins, pct_vals, (50,))
+
+    group_curves = {}
+    for gi, group_key in enumerate(group_keys):
+        ag_p50 = {b: (n, q[50]) for b, n, q in slide_ag.get(gi, [])}
+        no_ag_p50 = {b: (n, q[50]) for b, n, q in slide_no_ag.get(gi, [])}
+        agitator_impact = {}
+        for b in sorted(set(ag_p50) | set(no_ag_p50)):
+            n_ag, p_ag = ag_p50.get(b, (0, None))
+            n_no, p_no = no_ag_p50.get(b, (0, None))
+            agitator_impact[b] = {
+                "agitator_p50": round(float(p_ag), 1) if n_ag else None,
+                "no_agitator_p50": round(float(p_no), 1) if n_no else None,
+                "agitator_runs": n_ag,
+                "no_agitator_runs": n_no,
+            }
+        slide_pct_group = {b: {"p50": round(float(q[50]), 3), "num_runs": n}
+                           for b, n, q in slide_pct.get(gi, [])}
+        group_curves[group_key] = _assemble_group_curve(
+            group_key, groups[group_key], _pct_curve(rotary, gi), _pct_curve(slide, gi),
+            slide_pct_group, agitator_impact)
 
     return group_curves
 
 
 def calculate_ttd(group_curves, target_lateral_length, expected_slide_pct, rotary_bin, slide_bin,
                   bucket_size=1000, include_bit_breakdown=True,
-                  min_coverage_pct=MIN_LATERAL_COVERAGE_PCT):
+                  min_coverage_pct=MIN_LATERAL_COVERAGE_PCT, ttd_models=None,
+                  override_slide_pct=None):
     """Calculate Time to TD for each equivalent BHA group.
 
     Uses rotary P50 at the corresponding run-length bin and
-    slide P50 at the lateral-length bin.
-    Iterates in 100-ft steps and looks up the appropriate bin for each curve.
+    slide P50 at the lateral-length bin, in 100-ft steps (see
+    ttd_engine.LateralTTDModel, which precomputes the steps and prefix sums
+    once per group).
 
     Per-group slide percentage: each group uses its own observed slide %
     (from group_slide_pct). RSS groups always use 0%. The expected_slide_pct
@@ -1110,124 +1436,35 @@ def calculate_ttd(group_curves, target_lateral_length, expected_slide_pct, rotar
 
     Also collects per-step detail and aggregates into ``bucket_size``-ft
     buckets (default 1000 ft) for the breakdown table.
+
+    ttd_models: optional dict {group_key: LateralTTDModel} reused across
+    calls (models for new groups are added to it), so re-ranking the same
+    curves for another lateral length or slide % skips the precompute.
+
+    override_slide_pct: if given, used for every non-RSS group instead of
+    its observed slide % (what-if ranking).
     """
-    step = min(rotary_bin, slide_bin)  # iterate at the finer resolution
     results = []
     for group_key, gc in group_curves.items():
-        total_time_hrs = 0
-        bins_covered = 0
-        bins_missing = 0
+        # Step grid, fallback medians and prefix sums are precomputed once
+        model = ttd_models.get(group_key) if ttd_models is not None else None
+        if model is None:
+            model = LateralTTDModel(gc, rotary_bin, slide_bin)
+            if ttd_models is not None:
+                ttd_models[group_key] = model
 
         # Use per-group slide pct; fall back to global if not available
-        slide_pct = gc.get("group_slide_pct", expected_slide_pct)
-
-        confident_rotary_bins = [
-            b for b, v in gc["rotary"].items()
-            if v.get("confident", False)
-        ]
-        confident_slide_bins = [
-            b for b, v in gc["slide"].items()
-            if v.get("confident", False)
-        ]
-        rotary_coverage_ft = (
-            max(confident_rotary_bins) + rotary_bin if confident_rotary_bins else 0
-        )
-        slide_coverage_ft = (
-            max(confident_slide_bins) + slide_bin if confident_slide_bins else 0
-        )
-        if slide_pct > 0:
-            effective_coverage_ft = min(rotary_coverage_ft, slide_coverage_ft)
+        if override_slide_pct is not None and not gc.get("is_rss", False):
+            slide_pct = override_slide_pct
         else:
-            effective_coverage_ft = rotary_coverage_ft
-        min_required_coverage_ft = target_lateral_length * min_coverage_pct
+            slide_pct = model.slide_pct(expected_slide_pct)
 
-        if effective_coverage_ft < min_required_coverage_ft:
+        min_required_coverage_ft = target_lateral_length * min_coverage_pct
+        if model.coverage_ft(slide_pct) < min_required_coverage_ft:
             continue
 
-        # Per-step detail collectors keyed by bucket_start
-        bucket_detail = {}  # {bucket_start: {rot_ft, rot_time, sli_ft, sli_time, rot_rops, sli_rops}}
-
-        for pos in range(0, target_lateral_length, step):
-            seg_length = min(step, target_lateral_length - pos)
-            b_rot = bin_value(pos, rotary_bin)
-            b_sli = bin_value(pos, slide_bin)
-
-            rotary_data = gc["rotary"].get(b_rot)
-            rotary_rop = rotary_data["p50"] if rotary_data and rotary_data["confident"] else None
-
-            slide_data = gc["slide"].get(b_sli)
-            slide_rop = slide_data["p50"] if slide_data and slide_data["confident"] else None
-
-            if rotary_rop and rotary_rop > 0:
-                rotary_time = seg_length * (1 - slide_pct) / rotary_rop
-            else:
-                all_rotary = [v["p50"] for v in gc["rotary"].values() if v["confident"]]
-                fallback = statistics.median(all_rotary) if all_rotary else None
-                if fallback and fallback > 0:
-                    rotary_time = seg_length * (1 - slide_pct) / fallback
-                    rotary_rop = fallback
-                else:
-                    bins_missing += 1
-                    continue
-
-            if slide_rop and slide_rop > 0 and slide_pct > 0:
-                slide_time = seg_length * slide_pct / slide_rop
-            else:
-                all_slide = [v["p50"] for v in gc["slide"].values() if v["confident"]]
-                fallback = statistics.median(all_slide) if all_slide else None
-                if fallback and fallback > 0:
-                    slide_time = seg_length * slide_pct / fallback
-                    slide_rop = fallback
-                else:
-                    slide_time = 0
-                    slide_rop = 0
-
-            total_time_hrs += rotary_time + slide_time
-            bins_covered += 1
-
-            # Accumulate into 1000' bucket
-            bk = int(pos // bucket_size) * bucket_size
-            if bk not in bucket_detail:
-                bucket_detail[bk] = {
-                    "rot_ft": 0, "rot_time": 0, "sli_ft": 0, "sli_time": 0,
-                    "rot_rops": [], "sli_rops": [],
-                }
-            bd = bucket_detail[bk]
-            rot_ft = seg_length * (1 - slide_pct)
-            sli_ft = seg_length * slide_pct
-            bd["rot_ft"] += rot_ft
-            bd["rot_time"] += rotary_time
-            bd["sli_ft"] += sli_ft
-            bd["sli_time"] += slide_time
-            if rotary_rop and rotary_rop > 0:
-                bd["rot_rops"].append((rot_ft, rotary_rop))
-            if slide_rop and slide_rop > 0:
-                bd["sli_rops"].append((sli_ft, slide_rop))
-
-        # Build bucket breakdown list
-        buckets = []
-        for bk in sorted(bucket_detail.keys()):
-            bd = bucket_detail[bk]
-            bk_end = min(bk + bucket_size, target_lateral_length)
-            bk_len = bk_end - bk
-            # Weighted-average ROP (ft-weighted)
-            rot_rop_avg = 0
-            if bd["rot_rops"]:
-                total_w = sum(w for w, _ in bd["rot_rops"])
-                rot_rop_avg = round(sum(w * r for w, r in bd["rot_rops"]) / total_w, 1) if total_w else 0
-            sli_rop_avg = 0
-            if bd["sli_rops"]:
-                total_w = sum(w for w, _ in bd["sli_rops"])
-                sli_rop_avg = round(sum(w * r for w, r in bd["sli_rops"]) / total_w, 1) if total_w else 0
-            buckets.append({
-                "label": f"{bk}-{bk_end}'",
-                "length_ft": round(bk_len, 1),
-                "rotary_rop": rot_rop_avg,
-                "rotary_time": round(bd["rot_time"], 3),
-                "slide_rop": sli_rop_avg,
-                "slide_time": round(bd["sli_time"], 3),
-                "total_time": round(bd["rot_time"] + bd["sli_time"], 3),
-            })
+        total_time_hrs, bins_covered, bins_missing = model.ttd(target_lateral_length, slide_pct)
+        buckets = model.buckets(target_lateral_length, slide_pct, bucket_size)
 
         bit_ttd_by_mfg_model = []
         fastest_bit = None
@@ -1246,6 +1483,7 @@ def calculate_ttd(group_curves, target_lateral_length, expected_slide_pct, rotar
                     slide_bin=slide_bin,
                     bucket_size=bucket_size,
                     include_bit_breakdown=False,
+                    override_slide_pct=override_slide_pct,
                 )
                 if not subset_results:
                     # Retry subset ranking without strict coverage gate so
@@ -1258,6 +1496,7 @@ def calculate_ttd(group_curves, target_lateral_length, expected_slide_pct, rotar
                         slide_bin=slide_bin,
                         bucket_size=bucket_size,
                         include_bit_breakdown=False,
+                        override_slide_pct=override_slide_pct,
                         min_coverage_pct=0.0,
                     )
                 if not subset_results:
@@ -1303,46 +1542,57 @@ def calculate_ttd(group_curves, target_lateral_length, expected_slide_pct, rotar
     return results
 
 
+def _add_ttd_bootstrap(group_curves, ttd_results, steps, n_iter, seed, window, roadmap=None):
+    """Run the TTD bootstrap, print it and add its columns to ttd_results."""
+    print(f"\n  Bootstrapping TTD ({n_iter:,} iterations, runs resampled per group)...")
+    t0 = time.perf_counter()
+    stats = bootstrap_ttd(group_curves, ttd_results, steps, n_iter=n_iter, seed=seed,
+                          window=window, roadmap=roadmap)
+    print(f"  Done in {time.perf_counter() - t0:.2f}s")
+
+    print(f"\n  {'#':<4} {'Group':<30} {'TTD P10':<9} {'TTD P50':<9} {'TTD P90':<9} "
+          f"{'P(1st)':<8} {'P(top3)':<8}")
+    print(f"  {'-' * 80}")
+    for idx, t in enumerate(ttd_results, 1):
+        st = stats.get(t["group_key"])
+        if st is None:
+            continue
+        t.update(st)
+        print(f"  {idx:<4} {t['group_key']:<30} {st['ttd_p10_hours']:<9} "
+              f"{st['ttd_p50_hours']:<9} {st['ttd_p90_hours']:<9} "
+              f"{st['prob_fastest']:<8.1%} {st['prob_top3']:<8.1%}")
+
+
+_PER_RUN_META = ["asset_id", "well_name", "bha_number", "equiv_bha_key", "has_agitator"]
+
+
 def save_per_run_csv(per_run, bin_size, out_path):
-    """Save per-run curves to CSV."""
-    rows = []
-    for run_key, run_info in per_run.items():
-        # Rotary bins
-        for b, data in sorted(run_info["rotary_curve"].items()):
-            rows.append({
-                "asset_id": run_info["asset_id"],
-                "well_name": run_info["well_name"],
-                "bha_number": run_info["bha_number"],
-                "equiv_bha_key": run_info["equiv_bha_key"],
-                "has_agitator": run_info["has_agitator"],
-                "curve_type": "rotary",
-                "bin_start_ft": b,
-                "bin_axis": "distance_from_run_start",
-                "median_rop": data["median_rop"],
-                "foot_count": data["count"],
-            })
-        # Slide bins
-        for b, data in sorted(run_info["slide_curve"].items()):
-            rows.append({
-                "asset_id": run_info["asset_id"],
-                "well_name": run_info["well_name"],
-                "bha_number": run_info["bha_number"],
-                "equiv_bha_key": run_info["equiv_bha_key"],
-                "has_agitator": run_info["has_agitator"],
-                "curve_type": "slide",
-                "bin_start_ft": b,
-                "bin_axis": "distance_from_lateral_start",
-                "median_rop": data["median_rop"],
-                "foot_count": data["count"],
-            })
+    """Save per-run curves to CSV.
 
-    if rows:
-        with open(out_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-            writer.writeheader()
-            writer.writerows(rows)
-        print(f"  Per-run curves: {out_path} ({len(rows)} rows)")
-    return rows
+    Rows (rotary bins, then slide bins, per run) come straight from the
+    RunCurves arrays. Returns them as a DataFrame.
+    """
+    curves = RunCurves.from_runs(per_run.values())
+    parts = []
+    for kind, (name, axis) in enumerate((("rotary_curve", "distance_from_run_start"),
+                                         ("slide_curve", "distance_from_lateral_start"))):
+        run_idx, bins, values, counts = curves.table(name)
+        parts.append((np.full(len(run_idx), kind), run_idx, bins, values, counts))
+    kind, run_idx, bins, values, counts = (np.concatenate(a) for a in zip(*parts))
+    order = np.lexsort((kind, run_idx))
+    kind, run_idx = kind[order], run_idx[order]
+
+    df = pd.DataFrame({c: [curves.field(i, c) for i in run_idx.tolist()] for c in _PER_RUN_META})
+    df["curve_type"] = np.where(kind == 0, "rotary", "slide")
+    df["bin_start_ft"] = bins[order]
+    df["bin_axis"] = np.where(kind == 0, "distance_from_run_start", "distance_from_lateral_start")
+    df["median_rop"] = values[order]
+    df["foot_count"] = counts[order].astype(np.int64)
+
+    if not df.empty:
+        df.to_csv(out_path, index=False, lineterminator="\r\n", encoding="utf-8")
+        print(f"  Per-run curves: {out_path} ({len(df)} rows)")
+    return df
 
 
 def save_group_csv(group_curves, bin_size, out_path):
@@ -1440,6 +1690,11 @@ def main():
     output_dir = None
     max_missing_formations = 1  # exclude groups missing > 1 formation
     export_csv = False
+    engine = "auto"  # lateral curve engine: dict | vectorized | auto
+    source = "auto"  # 1ft input: parquet | csv | auto (Parquet store, else CSV)
+    bootstrap_iters = 0  # TTD bootstrap iterations (0 = off)
+    bootstrap_seed = None
+    full_rebuild = False  # ignore the curve cache (it is still rewritten)
 
     args = sys.argv[1:]
     i = 0
@@ -1472,6 +1727,21 @@ def main():
         elif args[i] == "--export-csv":
             export_csv = True
             i += 1
+        elif args[i] == "--engine" and i + 1 < len(args):
+            engine = args[i + 1].lower()
+            i += 2
+        elif args[i] == "--source" and i + 1 < len(args):
+            source = args[i + 1].lower()
+            i += 2
+        elif args[i] == "--bootstrap" and i + 1 < len(args):
+            bootstrap_iters = int(args[i + 1])
+            i += 2
+        elif args[i] == "--seed" and i + 1 < len(args):
+            bootstrap_seed = int(args[i + 1])
+            i += 2
+        elif args[i] == "--full-rebuild":
+            full_rebuild = True
+            i += 1
         elif not args[i].startswith("--"):
             csv_path = args[i]
             if not os.path.isabs(csv_path):
@@ -1493,34 +1763,100 @@ def main():
         else:
             csv_path = os.path.join(SCRIPT_DIR, "rop_1ft_data.csv")
 
-    if not os.path.exists(csv_path):
+    # Prefer the Parquet copy pull_1ft_for_runs.py saves for this section
+    # (same section name and run scope); the CSV is only the fallback.
+    from_parquet = False
+    if source != "csv":
+        latest = db.get_latest_run()
+        from_parquet = db.has_1ft_data(os.path.basename(output_dir), mode,
+                                       run_id=latest["id"] if latest else None)
+        if source == "parquet" and not from_parquet:
+            print(f"ERROR: no 1ft Parquet for section '{os.path.basename(output_dir)}'")
+            sys.exit(1)
+
+    if not from_parquet and not os.path.exists(csv_path):
         print(f"ERROR: {csv_path} not found")
         sys.exit(1)
 
     if mode == "vertical":
         main_vertical(csv_path, target_length, slide_pct, output_dir,
-                      max_missing_formations, export_csv)
+                      max_missing_formations, export_csv, from_parquet,
+                      bootstrap_iters, bootstrap_seed, full_rebuild)
     else:
         main_lateral(csv_path, rotary_bin, slide_bin, target_length, slide_pct,
-                     output_dir, export_csv)
+                     output_dir, export_csv, engine, from_parquet,
+                     bootstrap_iters, bootstrap_seed, full_rebuild)
+
+
+def _compact_per_run(per_run, group_curves, cache):
+    """Move all per-run curves into one RunCurves.
+
+    Cached, rebuilt and dict-engine runs end up as views of a single set of
+    arrays; group run lists and the cache entries are repointed to them.
+    """
+    views = dict(zip(per_run, RunCurves.from_runs(per_run.values()).views()))
+    for gc in group_curves.values():
+        gc["run_list"] = [views[(ri["asset_id"], ri["bha_number"])] for ri in gc["run_list"]]
+    cache["runs"] = {k: (h, views[k]) for k, (h, _) in cache["runs"].items()}
+    return views
 
 
 def main_lateral(csv_path, rotary_bin, slide_bin, target_lateral, slide_pct, output_dir=None,
-                 export_csv=False):
-    """Run the lateral (distance-based) curve building pipeline."""
+                 export_csv=False, engine="auto", from_parquet=False,
+                 bootstrap_iters=0, bootstrap_seed=None, full_rebuild=False):
+    """Run the lateral (distance-based) curve building pipeline.
+
+    engine selects how per-run and group curves are built: "dict" (per-row
+    Python loops), "vectorized" (pandas/NumPy groupby) or "auto", which uses
+    the vectorized engine once the input has VECTORIZED_MIN_ROWS rows. Both
+    engines produce identical curves.
+
+    With from_parquet the 1ft data is read from the section's Parquet store
+    (see load_1ft_parquet) instead of csv_path.
+
+    bootstrap_iters > 0 adds bootstrap TTD P10/P50/P90 and rank-stability
+    columns to the ranking (see ttd_bootstrap).
+
+    Curves of runs whose 1ft rows are unchanged since the last build in
+    output_dir are taken from the curve cache; full_rebuild ignores it.
+    """
+    out = output_dir or SCRIPT_DIR
+    section_name = os.path.basename(out)
+    latest = db.get_latest_run()
+    rid = latest["id"] if latest else None
+    if from_parquet:
+        input_name = os.path.relpath(db.find_1ft_data(section_name, "lateral", rid), db.DATA_DIR)
+    else:
+        input_name = os.path.basename(csv_path)
+
     print(f"\n{'=' * 80}")
     print(f"  BUILD ROP TYPE CURVES (LATERAL MODE)")
-    print(f"  Input: {os.path.basename(csv_path)}")
+    print(f"  Input: {input_name}")
     print(f"  Rotary bin: {rotary_bin} ft | Slide bin: {slide_bin} ft")
     print(f"  Smoothing: rolling median, window={ROLLING_WINDOW} bins")
     print(f"{'=' * 80}\n")
 
-    rows = load_1ft_data(csv_path)
-    print(f"  Loaded {len(rows):,} 1ft records")
+    if from_parquet:
+        frame = load_1ft_parquet(section_name, "lateral", rid)
+    else:
+        frame = load_1ft_frame(csv_path)
+    # Content hash per run, taken before the dict engine turns frame into rows
+    run_hashes = curve_cache.run_content_hashes(frame, LATERAL_1FT_COLUMNS)
+    rows = None
+    if engine == "dict" or (engine == "auto" and len(frame) < VECTORIZED_MIN_ROWS):
+        engine = "dict"
+        rows = frame.to_dict("records")
+        frame = None
+    else:
+        engine = "vectorized"
+    total_count = len(frame) if frame is not None else len(rows)
+    print(f"  Loaded {total_count:,} 1ft records ({engine} engine)")
 
     if slide_pct is None:
-        slide_count = sum(1 for r in rows if r["state"] == "Slide Drilling")
-        total_count = len(rows)
+        if frame is not None:
+            slide_count = int((frame["state"] == "Slide Drilling").sum())
+        else:
+            slide_count = sum(1 for r in rows if r["state"] == "Slide Drilling")
         slide_pct = slide_count / total_count if total_count > 0 else 0.12
         print(f"  Auto-detected slide %: {slide_pct:.1%}")
     else:
@@ -1528,13 +1864,33 @@ def main_lateral(csv_path, rotary_bin, slide_bin, target_lateral, slide_pct, out
 
     print(f"  Target lateral length: {target_lateral:,} ft")
 
-    print(f"\n  Building per-run curves (rotary={rotary_bin}ft, slide={slide_bin}ft)...")
-    per_run = build_per_run_curves(rows, rotary_bin, slide_bin)
-    print(f"  {len(per_run)} runs processed")
-
-    print(f"\n  Building group P10/P50/P90 curves (smoothed, window={ROLLING_WINDOW})...")
-    group_curves = build_group_curves(per_run, rotary_bin, slide_bin)
-    print(f"  {len(group_curves)} groups")
+    def _build_per_run(run_keys):
+        if frame is not None:
+            runs = pd.MultiIndex.from_arrays([frame["asset_id"], frame["bha_number"]])
+            return build_per_run_curves_vectorized(frame[runs.isin(run_keys)], rotary_bin, slide_bin)
+        return build_per_run_curves([r for r in rows if (r["asset_id"], r["bha_number"]) in run_keys],
+                                    rotary_bin, slide_bin)
+
+    def _build_groups(runs):
+        if engine == "vectorized":
+            return build_group_curves_vectorized(runs, rotary_bin, slide_bin)
+        return build_group_curves(runs, rotary_bin, slide_bin)
+
+    cache_path = os.path.join(out, CURVE_CACHE_FILE.format(mode="lateral"))
+    cache_params = {"mode": "lateral", "rotary_bin": rotary_bin, "slide_bin": slide_bin,
+                    "window": ROLLING_WINDOW, "source": "parquet" if from_parquet else "csv"}
+    cache = curve_cache.load_cache(None if full_rebuild else cache_path, cache_params)
+
+    print(f"\n  Building per-run curves (rotary={rotary_bin}ft, slide={slide_bin}ft) "
+          f"and group P10/P50/P90 curves (smoothed, window={ROLLING_WINDOW})...")
+    per_run, group_curves, cache, info = curve_cache.rebuild(
+        cache, run_hashes, _build_per_run, _build_groups)
+    frame = rows = None
+    per_run = _compact_per_run(per_run, group_curves, cache)
+    curve_cache.save_cache(cache_path, cache)
+    print(f"  {len(per_run)} runs ({info['runs_built']} built, {info['runs_reused']} cached)")
+    print(f"  {len(group_curves)} groups ({info['groups_built']} built, "
+          f"{info['groups_reused']} cached)")
 
     print(f"\n  {'Group':<30} {'Runs':<6} {'Wells':<7} {'Agit.':<6} "
           f"{'Rot Bins':<10} {'Sli Bins':<10} {'Sli(raw)':<10}")
@@ -1558,14 +1914,14 @@ def main_lateral(csv_path, rotary_bin, slide_bin, target_lateral, slide_pct, out
               f"{t['ttd_hours']:<10} {t['ttd_days']:<10} "
               f"{t['bins_with_data']:<8} {t['bins_missing']:<8}")
 
-    out = output_dir or SCRIPT_DIR
-    section_name = os.path.basename(out)
-    latest = db.get_latest_run()
-    rid = latest["id"] if latest else None
+    if bootstrap_iters > 0 and ttd_results:
+        steps = lateral_steps(target_lateral, rotary_bin, slide_bin)
+        _add_ttd_bootstrap(group_curves, ttd_results, steps, bootstrap_iters, bootstrap_seed,
+                           ROLLING_WINDOW)
+
     print(f"\n  Saving outputs (run_id={rid})...")
-    per_run_rows = save_per_run_csv(per_run, rotary_bin, os.path.join(out, "rop_curves_per_run.csv"))
-    if per_run_rows:
-        df = pd.DataFrame(per_run_rows)
+    df = save_per_run_csv(per_run, rotary_bin, os.path.join(out, "rop_curves_per_run.csv"))
+    if not df.empty:
         db.save_rop_curves_per_run(section_name, df, "lateral", run_id=rid)
         if export_csv:
             db.export_csv(df, "rop_curves_per_run")
@@ -1585,16 +1941,44 @@ def main_lateral(csv_path, rotary_bin, slide_bin, target_lateral, slide_pct, out
 
 
 def main_vertical(csv_path, section_length, slide_pct, output_dir=None,
-                  max_missing_formations=1, export_csv=False):
-    """Run the vertical (formation-based) curve building pipeline."""
+                  max_missing_formations=1, export_csv=False, from_parquet=False,
+                  bootstrap_iters=0, bootstrap_seed=None, full_rebuild=False):
+    """Run the vertical (formation-based) curve building pipeline.
+
+    With from_parquet the 1ft data is read from the section's Parquet store
+    (see load_1ft_parquet) instead of csv_path.
+
+    bootstrap_iters > 0 adds bootstrap TTD P10/P50/P90 and rank-stability
+    columns to the ranking (see ttd_bootstrap).
+
+    Curves of runs whose 1ft rows are unchanged since the last build in
+    output_dir are taken from the curve cache; full_rebuild ignores it.
+    Group curves are rebuilt whenever the formation roadmap changes.
+    """
+    out = output_dir or SCRIPT_DIR
+    section_name = os.path.basename(out)
+    latest = db.get_latest_run()
+    rid = latest["id"] if latest else None
+    if from_parquet:
+        input_name = os.path.relpath(db.find_1ft_data(section_name, "vertical", rid), db.DATA_DIR)
+    else:
+        input_name = os.path.basename(csv_path)
+
     print(f"\n{'=' * 80}")
     print(f"  BUILD ROP TYPE CURVES (VERTICAL / FORMATION MODE)")
-    print(f"  Input: {os.path.basename(csv_path)}")
+    print(f"  Input: {input_name}")
     print(f"  Formation segment: {FORMATION_SEGMENT_PCT}% per bin")
     print(f"  Smoothing: rolling median, window={ROLLING_WINDOW_VERT} segments")
     print(f"{'=' * 80}\n")
 
-    rows = load_1ft_data_vertical(csv_path)
+    if from_parquet:
+        frame = load_1ft_parquet(section_name, "vertical", rid)
+        run_hashes = curve_cache.run_content_hashes(frame, VERTICAL_1FT_COLUMNS)
+        rows = frame.to_dict("records")
+        del frame
+    else:
+        rows = load_1ft_data_vertical(csv_path)
+        run_hashes = curve_cache.run_content_hashes_records(rows, VERTICAL_1FT_COLUMNS)
     print(f"  Loaded {len(rows):,} 1ft records (with formation mapping)")
 
     if not rows:
@@ -1618,16 +2002,26 @@ def main_vertical(csv_path, section_length, slide_pct, output_dir=None,
         fm_feet = sum(1 for r in rows if r.get("formation_name") == fm)
         print(f"    {fm:<30} {fm_feet:>7,} feet")
 
-    # Phase 1: Per-run curves
-    print(f"\n  Building per-run formation curves...")
-    per_run = build_per_run_curves_vertical(rows)
-    print(f"  {len(per_run)} runs processed")
+    # Phase 1 + 2: Per-run curves and group curves (unchanged runs from the cache)
+    cache_path = os.path.join(out, CURVE_CACHE_FILE.format(mode="vertical"))
+    cache_params = {"mode": "vertical", "segment_pct": FORMATION_SEGMENT_PCT,
+                    "window": ROLLING_WINDOW_VERT, "source": "parquet" if from_parquet else "csv"}
+    cache = curve_cache.load_cache(None if full_rebuild else cache_path, cache_params)
 
-    # Phase 2: Group curves
-    print(f"\n  Building group P10/P50/P90 formation curves "
+    print(f"\n  Building per-run formation curves and group P10/P50/P90 formation curves "
           f"(smoothed, window={ROLLING_WINDOW_VERT})...")
-    group_curves = build_group_curves_vertical(per_run, roadmap)
-    print(f"  {len(group_curves)} groups")
+    per_run, all_group_curves, cache, info = curve_cache.rebuild(
+        cache, run_hashes,
+        lambda run_keys: build_per_run_curves_vertical(
+            [r for r in rows if (r["asset_id"], r["bha_number"]) in run_keys]),
+        lambda runs: build_group_curves_vertical(runs, roadmap),
+        group_context=tuple(roadmap),
+    )
+    curve_cache.save_cache(cache_path, cache)
+    group_curves = all_group_curves
+    print(f"  {len(per_run)} runs ({info['runs_built']} built, {info['runs_reused']} cached)")
+    print(f"  {len(group_curves)} groups ({info['groups_built']} built, "
+          f"{info['groups_reused']} cached)")
 
     print(f"\n  {'Group':<30} {'Runs':<6} {'Wells':<7} {'Agit.':<6} "
           f"{'Rot Segs':<10} {'Sli Segs':<10}")
@@ -1652,7 +2046,7 @@ def main_vertical(csv_path, section_length, slide_pct, output_dir=None,
         relaxed_missing = max_missing_formations + 1
         print(f"  No groups passed; retrying with max_missing={relaxed_missing}...")
         group_curves, excluded = filter_groups_by_formation_coverage(
-            group_curves=build_group_curves_vertical(per_run, roadmap),
+            group_curves=all_group_curves,
             roadmap=roadmap,
             fm_order=fm_order,
             max_missing=relaxed_missing,
@@ -1682,10 +2076,11 @@ def main_vertical(csv_path, section_length, slide_pct, output_dir=None,
               f"{t['ttd_hours']:<10} {t['ttd_days']:<10} "
               f"{t['segments_with_data']:<9} {t['segments_missing']:<8}")
 
-    out = output_dir or SCRIPT_DIR
-    section_name = os.path.basename(out)
-    latest = db.get_latest_run()
-    rid = latest["id"] if latest else None
+    if bootstrap_iters > 0 and ttd_results:
+        steps = vertical_steps(roadmap, fm_order, section_length, FORMATION_SEGMENT_PCT)
+        _add_ttd_bootstrap(group_curves, ttd_results, steps, bootstrap_iters, bootstrap_seed,
+                           ROLLING_WINDOW_VERT, roadmap)
+
     # Save outputs
     print(f"\n  Saving outputs (run_id={rid})...")
     per_run_rows = save_per_run_csv_vertical(per_run, os.path.join(out, "rop_curves_per_run_vertical.csv"))
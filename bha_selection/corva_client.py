@@ -0,0 +1,479 @@
+"""Shared pooled HTTP client for the Corva data and platform APIs.
+
+Every fetch script used to build its own HEADERS and call bare
+requests.get(), opening a new TLS connection per request. This module
+holds one process-wide requests.Session with:
+
+  - keep-alive connection pooling (POOL_SIZE connections per host, enough
+    for the largest thread pools / adaptive limiter ceilings)
+  - consistent retries: up to RETRY_TOTAL on 429/500/502/503/504 and
+    connection errors, exponential backoff, honouring Retry-After
+  - gzip / deflate response compression
+  - per-endpoint request timing metrics (print_metrics())
+  - an on-disk response cache for slow-changing datasets (see below)
+
+Pagination helpers:
+  fetch_all(dataset, query, ...)   skip/limit paging of a data API dataset
+  iter_asset_pages(params)         page-based paging of the v2 assets API
+
+After retries are exhausted get() returns the final response (not
+raised), so callers keep their existing status_code checks. fetch_all() /
+iter_pages() / iter_asset_pages() raise instead: a failed page would
+otherwise leave a silently truncated record or well list.
+
+Response cache: opt-in per request with cache=True (only the scripts
+that re-read slow-changing per-well data pass it; asset enumeration and
+scans always go to the network). 200 responses for the datasets in
+CACHE_TTLS are stored under data/http_cache/, keyed on a hash of the URL
+and query params (dataset, query, fields, sort, skip, limit). Each
+dataset has two TTLs: a long one for a completed well, whose
+drillstrings / formations no longer change, and a short one otherwise.
+The caller passes completed=True when it knows the well's status is
+complete (is_completed(well_state)); well_cache responses are also
+judged by their own asset.state. CACHE_MODE (or the CORVA_CACHE_MODE env
+var, or the --offline / --no-cache / --refresh-cache flags via
+apply_cache_flags()) selects how cache=True requests behave:
+  on       read and write the cache (default)
+  refresh  always fetch, then overwrite the cache
+  off      bypass the cache entirely
+  offline  read only; a miss (or any uncached request) raises
+           OfflineCacheMiss without touching the network
+
+Usage:
+    import corva_client
+    records = corva_client.fetch_all("data.drillstring", {"asset_id": 123},
+                                     sort={"timestamp": 1}, cache=True,
+                                     completed=corva_client.is_completed(state))
+    r = corva_client.get_data("well_cache", {"asset_id": 123}, limit=1)
+    corva_client.print_metrics()
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+load_dotenv()
+
+API_KEY = os.getenv("CORVA_API_KEY")
+# Overridable to point at a local stand-in (mock_corva_server.py)
+DATA_API = os.getenv("CORVA_DATA_API", "https://data.corva.ai")
+PLATFORM_API = os.getenv("CORVA_PLATFORM_API", "https://api.corva.ai")
+HEADERS = {"Authorization": f"API {API_KEY}"}
+
+RETRY_TOTAL = 3
+BACKOFF_FACTOR = 1
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+POOL_SIZE = 64               # keep-alive connections per host
+DEFAULT_TIMEOUT = 30         # seconds
+DEFAULT_PAGE_SIZE = 100      # records per skip/limit page
+ASSETS_PAGE_SIZE = 100       # v2 assets per page
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, "data", "http_cache")
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Cached endpoints: (active TTL, completed TTL) in seconds
+CACHE_TTLS = {
+    "data.drillstring": (6 * HOUR, 90 * DAY),
+    "data.formations": (1 * DAY, 180 * DAY),
+    "data.well-sections": (6 * HOUR, 90 * DAY),
+    "well_cache": (6 * HOUR, 30 * DAY),
+    "v2/assets": (1 * DAY, 1 * DAY),
+}
+COMPLETED_STATES = ("complete", "completed")   # asset state / status values
+
+CACHE_MODES = ("on", "refresh", "off", "offline")
+CACHE_MODE = os.getenv("CORVA_CACHE_MODE", "on")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared requests.Session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(HEADERS)
+                session.headers.update({
+                    "Accept": "application/json",
+                    "Accept-Encoding": "gzip, deflate",
+                })
+                retry = Retry(
+                    total=RETRY_TOTAL,
+                    backoff_factor=BACKOFF_FACTOR,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=["GET"],
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    max_retries=retry,
+                    pool_connections=POOL_SIZE,
+                    pool_maxsize=POOL_SIZE,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def retry_count(response):
+    """Number of retries urllib3 made before returning this response."""
+    retries = getattr(response.raw, "retries", None)
+    return len(getattr(retries, "history", None) or ())
+
+
+def was_throttled(response):
+    """True if urllib3 had to retry this response on a 429/5xx."""
+    retries = getattr(response.raw, "retries", None)
+    history = getattr(retries, "history", None) or ()
+    return any(h.status in RETRY_STATUSES for h in history)
+
+
+# ---------------------------------------------------------------------------
+#  Request metrics
+# ---------------------------------------------------------------------------
+
+class RequestMetrics:
+    """Thread-safe per-endpoint request counters and timings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = defaultdict(lambda: {
+                "requests": 0, "errors": 0, "retries": 0,
+                "seconds": 0.0, "max_seconds": 0.0, "bytes": 0,
+                "cache_hits": 0,
+            })
+
+    def record(self, endpoint, seconds, ok, retries=0, nbytes=0):
+        with self._lock:
+            s = self._stats[endpoint]
+            s["requests"] += 1
+            s["errors"] += 0 if ok else 1
+            s["retries"] += retries
+            s["seconds"] += seconds
+            s["max_seconds"] = max(s["max_seconds"], seconds)
+            s["bytes"] += nbytes
+
+    def record_hit(self, endpoint):
+        with self._lock:
+            self._stats[endpoint]["cache_hits"] += 1
+
+    def snapshot(self):
+        """Return {endpoint: stats dict} (copies)."""
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+
+metrics = RequestMetrics()
+
+
+def _endpoint(url):
+    """Short metrics label: dataset name for the data API, path otherwise."""
+    path = urlparse(url).path.rstrip("/")
+    if "/api/v1/data/" in path:
+        return path.rsplit("/", 1)[-1]
+    if path.startswith("/v2/assets"):
+        return "v2/assets"
+    return path.lstrip("/") or url
+
+
+def print_metrics():
+    """Print per-endpoint request counts, errors, retries and timings."""
+    stats = metrics.snapshot()
+    if not stats:
+        return
+    print(f"\n  API requests:")
+    print(f"    {'Endpoint':<22} {'Reqs':>7} {'Cached':>7} {'Err':>5} {'Retry':>6} "
+          f"{'Mean ms':>8} {'Max ms':>8} {'MB':>8}")
+    for endpoint, s in sorted(stats.items(), key=lambda kv: -kv[1]["seconds"]):
+        mean_ms = s["seconds"] / s["requests"] * 1000 if s["requests"] else 0
+        print(f"    {endpoint:<22} {s['requests']:>7} {s['cache_hits']:>7} {s['errors']:>5} "
+              f"{s['retries']:>6} {mean_ms:>8.0f} {s['max_seconds'] * 1000:>8.0f} "
+              f"{s['bytes'] / 1e6:>8.1f}")
+
+
+# ---------------------------------------------------------------------------
+#  Response cache
+# ---------------------------------------------------------------------------
+
+class OfflineCacheMiss(RuntimeError):
+    """Raised in offline mode when a request is not in the response cache."""
+
+
+def set_cache_mode(mode):
+    """Set the response cache mode (one of CACHE_MODES)."""
+    global CACHE_MODE
+    if mode not in CACHE_MODES:
+        raise ValueError(f"cache mode must be one of {CACHE_MODES}, got {mode!r}")
+    CACHE_MODE = mode
+
+
+def apply_cache_flags(argv):
+    """Consume --offline / --no-cache / --refresh-cache from argv.
+
+    Sets the cache mode and returns argv without those flags.
+    """
+    flags = {"--offline": "offline", "--no-cache": "off", "--refresh-cache": "refresh"}
+    for flag, mode in flags.items():
+        if flag in argv:
+            set_cache_mode(mode)
+    return [a for a in argv if a not in flags]
+
+
+def cache_key(url, params=None):
+    """Content hash of a request: URL plus sorted query params."""
+    material = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json.gz")
+
+
+def _cache_read(key):
+    """Return the cached entry dict, or None if missing/expired/corrupt."""
+    path = _cache_path(key)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if CACHE_MODE != "offline" and entry.get("expires_at", 0) < time.time():
+        return None
+    return entry
+
+
+def is_completed(state):
+    """True if a well/asset state or status string means a completed well."""
+    return isinstance(state, str) and state.strip().lower() in COMPLETED_STATES
+
+
+def _reports_completed(endpoint, body):
+    """True if a well_cache response shows every returned well as completed."""
+    if endpoint != "well_cache" or not isinstance(body, list) or not body:
+        return False
+    return all(isinstance(rec, dict) and is_completed((rec.get("asset") or {}).get("state"))
+               for rec in body)
+
+
+def _cache_ttl(endpoint, body, completed):
+    active_ttl, completed_ttl = CACHE_TTLS[endpoint]
+    if completed or _reports_completed(endpoint, body):
+        return completed_ttl
+    return active_ttl
+
+
+def _cache_write(key, endpoint, url, params, response, completed):
+    """Store a 200 response (atomically; concurrent writers are harmless)."""
+    try:
+        body = response.json()
+    except ValueError:
+        return
+    now = time.time()
+    entry = {
+        "endpoint": endpoint,
+        "url": url,
+        "params": params,
+        "fetched_at": now,
+        "expires_at": now + _cache_ttl(endpoint, body, completed),
+        "body": body,
+    }
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _cached_response(url, entry):
+    """Build a requests.Response from a cache entry."""
+    r = requests.Response()
+    r.status_code = 200
+    r.url = url
+    r.encoding = "utf-8"
+    r.headers["Content-Type"] = "application/json"
+    r.headers["X-Cache"] = "HIT"
+    r._content = json.dumps(entry["body"]).encode("utf-8")
+    return r
+
+
+def clear_cache():
+    """Delete every cached response."""
+    if os.path.isdir(CACHE_DIR):
+        shutil.rmtree(CACHE_DIR)
+        print(f"  HTTP cache cleared: {CACHE_DIR}")
+
+
+# ---------------------------------------------------------------------------
+#  Requests
+# ---------------------------------------------------------------------------
+
+def dataset_url(dataset, provider="corva"):
+    """Data API URL for a dataset, e.g. dataset_url("data.drillstring")."""
+    return f"{DATA_API}/api/v1/data/{provider}/{dataset}/"
+
+
+def get(url, params=None, timeout=DEFAULT_TIMEOUT, limiter=None, cache=False,
+        completed=False):
+    """GET through the shared session, recording timing metrics.
+
+    With cache=True, endpoints listed in CACHE_TTLS are served from / stored
+    in the response cache according to CACHE_MODE; completed=True selects
+    the completed-well TTL. If limiter (an
+    adaptive_limiter.AdaptiveLimiter) is given, a network request holds one
+    of its slots and reports its status / retries back to it.
+    Raises requests.exceptions.RequestException on connection failures and
+    OfflineCacheMiss on a cache miss in offline mode.
+    """
+    endpoint = _endpoint(url)
+    cacheable = cache and endpoint in CACHE_TTLS and CACHE_MODE != "off"
+    if cacheable:
+        key = cache_key(url, params)
+        if CACHE_MODE in ("on", "offline"):
+            entry = _cache_read(key)
+            if entry is not None:
+                metrics.record_hit(endpoint)
+                return _cached_response(url, entry)
+        if CACHE_MODE == "offline":
+            raise OfflineCacheMiss(f"{endpoint} not cached: {url} {params}")
+        r = _fetch(url, params, timeout, limiter)
+        if r.status_code == 200:
+            _cache_write(key, endpoint, url, params, r, completed)
+        return r
+    if CACHE_MODE == "offline":
+        raise OfflineCacheMiss(f"{endpoint} is not cached in offline mode: {url}")
+    return _fetch(url, params, timeout, limiter)
+
+
+def _fetch(url, params, timeout, limiter):
+    """Network GET (optionally through an adaptive limiter slot)."""
+    if limiter is not None:
+        with limiter.slot() as slot:
+            r = _fetch(url, params, timeout, None)
+            slot.observe(r.status_code)
+            if was_throttled(r):
+                slot.throttle()
+        return r
+
+    session = get_session()
+    endpoint = _endpoint(url)
+    t0 = time.perf_counter()
+    try:
+        r = session.get(url, params=params, timeout=timeout)
+    except requests.exceptions.RequestException:
+        metrics.record(endpoint, time.perf_counter() - t0, ok=False)
+        raise
+    metrics.record(endpoint, time.perf_counter() - t0, ok=r.status_code == 200,
+                   retries=retry_count(r), nbytes=len(r.content))
+    return r
+
+
+def data_params(query, sort=None, fields=None, limit=DEFAULT_PAGE_SIZE, skip=0):
+    """Build data API query params (query/sort are JSON-encoded)."""
+    params = {"limit": limit, "query": json.dumps(query)}
+    if skip:
+        params["skip"] = skip
+    if sort is not None:
+        params["sort"] = json.dumps(sort)
+    if fields:
+        params["fields"] = fields
+    return params
+
+
+def get_data(dataset, query, sort=None, fields=None, limit=DEFAULT_PAGE_SIZE,
+             skip=0, timeout=DEFAULT_TIMEOUT, limiter=None, cache=False,
+             completed=False):
+    """One data API request; returns the Response."""
+    return get(dataset_url(dataset),
+               params=data_params(query, sort, fields, limit, skip),
+               timeout=timeout, limiter=limiter, cache=cache, completed=completed)
+
+
+def iter_pages(dataset, query, sort=None, fields=None, page_size=DEFAULT_PAGE_SIZE,
+               timeout=DEFAULT_TIMEOUT, limiter=None, cache=False, completed=False):
+    """Yield successive skip/limit pages (lists of records) of a dataset.
+
+    Stops after a short or empty page. A non-200 response (requests.HTTPError)
+    or connection error left after the session's retries is raised, so a
+    caller never mistakes a partial result for the complete one.
+    """
+    skip = 0
+    while True:
+        r = get_data(dataset, query, sort, fields, page_size, skip,
+                     timeout=timeout, limiter=limiter, cache=cache,
+                     completed=completed)
+        r.raise_for_status()
+        records = r.json()
+        if not records:
+            return
+        yield records
+        if len(records) < page_size:
+            return
+        skip += page_size
+
+
+def fetch_all(dataset, query, sort=None, fields=None, page_size=DEFAULT_PAGE_SIZE,
+              timeout=DEFAULT_TIMEOUT, limiter=None, cache=False, completed=False):
+    """Fetch every record matching query via skip/limit pagination.
+
+    Raises requests.exceptions.RequestException if any page fails (see
+    iter_pages).
+    """
+    all_records = []
+    for records in iter_pages(dataset, query, sort, fields, page_size,
+                              timeout=timeout, limiter=limiter, cache=cache,
+                              completed=completed):
+        all_records.extend(records)
+    return all_records
+
+
+def iter_asset_pages(params=None, page_size=ASSETS_PAGE_SIZE, timeout=DEFAULT_TIMEOUT,
+                     start_page=1):
+    """Yield (page_number, assets) from the page-based v2 assets API.
+
+    params are extra query params (e.g. {"types[]": "well", "company_id": 1}).
+    Stops after a short or empty page. A non-200 response left after the
+    session's retries raises requests.HTTPError, as in iter_pages().
+    """
+    page = start_page
+    while True:
+        r = get(f"{PLATFORM_API}/v2/assets",
+                params={**(params or {}), "limit": page_size, "page": page},
+                timeout=timeout)
+        if r.status_code != 200:
+            print(f"  Assets API error on page {page}: {r.status_code} {r.text[:200]}")
+        r.raise_for_status()
+        data = r.json().get("data", [])
+        if not data:
+            return
+        yield page, data
+        if len(data) < page_size:
+            return
+        page += 1
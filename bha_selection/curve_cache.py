@@ -0,0 +1,163 @@
+"""Per-run / per-group curve cache for incremental ROP curve rebuilds.
+
+build_rop_curves.py used to rebuild every per-run and group curve from the
+full 1ft file on each run. The cache file in the section output directory
+keeps, from the previous build:
+
+  - runs:   {(asset_id, bha_number): (content hash, per-run curve dict)}
+  - groups: {equiv_bha_key: (signature, group curve dict without run_list)}
+
+A run's content hash covers all of its 1ft rows, so on a rerun only runs
+whose rows changed (or that are new) go through the per-run builder, and
+only groups whose member runs changed (signature = their run keys and
+hashes, plus e.g. the formation roadmap in vertical mode) go through the
+group builder. Everything else is reused as is, so adding a couple of
+offset wells costs one hash pass over the 1ft data plus the new runs.
+
+The cache is discarded when the build parameters (bin sizes, smoothing
+window, ...) or CACHE_VERSION differ.
+
+Usage:
+    cache = load_cache(path, params)
+    per_run, group_curves, cache, info = rebuild(
+        cache, run_content_hashes(df, columns), build_per_run, build_groups)
+    save_cache(path, cache)
+"""
+
+import hashlib
+import os
+import pickle
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1  # bump when per-run / group curve logic changes
+
+
+def run_content_hashes(df, columns):
+    """{(asset_id, bha_number): digest of the run's rows} in first-appearance order.
+
+    Rows are hashed with pandas (vectorized) over the given columns that df
+    has; a run's digest is the SHA-1 of its row hashes in file order.
+    """
+    if df.empty:
+        return {}
+    cols = [c for c in columns if c in df.columns]
+    row_hash = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+    codes = df.groupby(["asset_id", "bha_number"], sort=False, observed=True).ngroup().to_numpy()
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    first_rows = order[np.concatenate(([0], bounds))]
+    assets = df["asset_id"].to_numpy(dtype=object)[first_rows]
+    bhas = df["bha_number"].to_numpy(dtype=object)[first_rows]
+    chunks = np.split(row_hash[order], bounds)
+    return {
+        (asset, bha): hashlib.sha1(chunk.tobytes()).hexdigest()
+        for asset, bha, chunk in zip(assets, bhas, chunks)
+    }
+
+
+def run_content_hashes_records(rows, columns):
+    """run_content_hashes() for a list of 1ft row dicts (no DataFrame round trip)."""
+    if not rows:
+        return {}
+    cols = [c for c in columns if c in rows[0]]
+    values = itemgetter(*cols)
+    hashers = {}
+    for r in rows:
+        key = (r["asset_id"], r["bha_number"])
+        h = hashers.get(key)
+        if h is None:
+            h = hashers[key] = hashlib.sha1()
+        h.update(repr(values(r)).encode())
+    return {key: h.hexdigest() for key, h in hashers.items()}
+
+
+def _empty(params):
+    return {"version": CACHE_VERSION, "params": params, "runs": {}, "groups": {}}
+
+
+def load_cache(path, params):
+    """Cache saved at path if it was built with the same params, else an empty one."""
+    if not path or not os.path.exists(path):
+        return _empty(params)
+    try:
+        with open(path, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return _empty(params)
+    if (not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION
+            or cache.get("params") != params):
+        return _empty(params)
+    return cache
+
+
+def save_cache(path, cache):
+    """Write the cache atomically (temp file + rename)."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def rebuild(cache, run_hashes, build_per_run, build_groups, group_context=None):
+    """Per-run and group curves, recomputing only what changed since the cache.
+
+    Args:
+        cache: load_cache() result
+        run_hashes: run_content_hashes() of the current 1ft data
+        build_per_run: f(set of run keys) -> per-run curve dict for those runs
+        build_groups: f(per_run subset) -> group curves for the groups in it
+        group_context: Extra group-build input (e.g. the vertical roadmap);
+            a change rebuilds every group
+
+    Returns (per_run, group_curves, new cache, info) where per_run and
+    group_curves are ordered as a full build would order them and info
+    counts reused / rebuilt runs and groups.
+    """
+    cached_runs = cache["runs"]
+    changed = {k for k, h in run_hashes.items()
+               if k not in cached_runs or cached_runs[k][0] != h}
+    fresh = build_per_run(changed) if changed else {}
+
+    per_run = {}
+    for k in run_hashes:
+        if k in fresh:
+            per_run[k] = fresh[k]
+        elif k not in changed:
+            per_run[k] = cached_runs[k][1]
+
+    members = {}
+    for k, ri in per_run.items():
+        members.setdefault(ri["equiv_bha_key"], []).append(k)
+    signatures = {gk: (group_context, tuple((k, run_hashes[k]) for k in keys))
+                  for gk, keys in members.items()}
+
+    cached_groups = cache["groups"]
+    stale = [gk for gk in members
+             if gk not in cached_groups or cached_groups[gk][0] != signatures[gk]]
+    rebuilt = build_groups({k: per_run[k] for gk in stale for k in members[gk]}) if stale else {}
+
+    group_curves = {}
+    for gk, keys in members.items():
+        if gk in rebuilt:
+            group_curves[gk] = rebuilt[gk]
+        else:
+            gc = dict(cached_groups[gk][1])
+            gc["run_list"] = [per_run[k] for k in keys]
+            group_curves[gk] = gc
+
+    new_cache = _empty(cache["params"])
+    new_cache["runs"] = {k: (run_hashes[k], ri) for k, ri in per_run.items()}
+    new_cache["groups"] = {
+        gk: (signatures[gk], {f: v for f, v in gc.items() if f != "run_list"})
+        for gk, gc in group_curves.items()
+    }
+    info = {
+        "runs_reused": len(per_run) - len(fresh),
+        "runs_built": len(fresh),
+        "groups_reused": len(group_curves) - len(rebuilt),
+        "groups_built": len(rebuilt),
+    }
+    return per_run, group_curves, new_cache, info
@@ -15,30 +15,52 @@ Usage:
     # Read them back
     wells = db.get_offset_wells(run_id)
 
-    # Heavy data via Parquet
+    # Several calls in one transaction (one snapshot / atomic writes)
+    with db.transaction():
+        run = db.get_current_run("58836173")
+        wells = db.get_offset_wells(run["id"])
+
+    # Heavy data via Parquet (DATASET_DIR, partitioned by kind/run_id/section/mode)
     db.save_1ft_data("Production_Vertical", df)
+    with db.open_1ft_writer("Production_Vertical", mode="vertical") as w:
+        w.write(well_df)  # one row group per well
     df = db.load_1ft_data("Production_Vertical", columns=["rop_ft_hr", "state"])
 
+    # Cross-run / cross-section queries: one filtered dataset scan
+    df = db.scan_dataset("rop_curves_by_group", filters=[("equiv_bha_key", "==", key)])
+
     # CSV debug export
     db.export_csv(wells, "offset_wells")
 """
 
+import atexit
 import csv
 import json
 import os
+import re
+import shutil
 import sqlite3
+import threading
 import time
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Any
+from urllib.parse import quote
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import geo
 
 # ── Paths ──
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, "bha_selection.db")
 DATA_DIR = os.path.join(SCRIPT_DIR, "data")
+DATASET_DIR = os.path.join(DATA_DIR, "dataset")  # partitioned per-run Parquet
 EXPORT_DIR = os.path.join(SCRIPT_DIR, "exports")
 
 # Ensure directories exist
@@ -138,6 +160,8 @@ CREATE INDEX IF NOT EXISTS idx_bha_run ON bha_runs(run_id);
 CREATE INDEX IF NOT EXISTS idx_bha_asset ON bha_runs(asset_id);
 CREATE INDEX IF NOT EXISTS idx_bha_section ON bha_runs(section_name);
 CREATE INDEX IF NOT EXISTS idx_bha_equiv ON bha_runs(equiv_bha_key);
+-- Lookup key of update_bha_equiv_keys (one probe per update instead of a run scan)
+CREATE INDEX IF NOT EXISTS idx_bha_run_asset_bha ON bha_runs(run_id, asset_id, bha_number);
 
 -- Formation tops (raw and canonical)
 CREATE TABLE IF NOT EXISTS formation_tops (
@@ -268,6 +292,31 @@ CREATE INDEX IF NOT EXISTS idx_wcr_fetched ON well_cache_records(fetched_at);
 CREATE INDEX IF NOT EXISTS idx_wcr_lat ON well_cache_records(lat);
 CREATE INDEX IF NOT EXISTS idx_wcr_lon ON well_cache_records(lon);
 
+-- Depth intervals of wits.summary-1ft already fetched per asset
+-- (records themselves live in data/wits_1ft_<asset_id>.parquet)
+CREATE TABLE IF NOT EXISTS wits_1ft_intervals (
+    id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+    asset_id            TEXT NOT NULL,
+    min_depth           REAL NOT NULL,
+    max_depth           REAL NOT NULL,
+    fetched_at          TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS idx_w1i_asset ON wits_1ft_intervals(asset_id);
+
+-- Per-well checkpoint journal for resumable pull_1ft_for_runs.py jobs
+-- (fetched records spooled to data/ckpt_1ft_<job_key>_<asset_id>.parquet)
+CREATE TABLE IF NOT EXISTS pull_1ft_checkpoints (
+    job_key             TEXT NOT NULL,
+    asset_id            TEXT NOT NULL,
+    min_depth           REAL,
+    max_depth           REAL,
+    first_depth         REAL,
+    last_depth          REAL,
+    record_count        INTEGER,
+    completed_at        TEXT NOT NULL DEFAULT (datetime('now')),
+    PRIMARY KEY (job_key, asset_id)
+);
+
 -- Bit catalog (reference data)
 CREATE TABLE IF NOT EXISTS bit_catalog (
     id                  INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -286,34 +335,184 @@ CREATE TABLE IF NOT EXISTS bit_catalog (
 """
 
 # ── Connection Management ──
+#
+# Each thread keeps one open connection (opened lazily, reopened after a
+# fork or a DB_PATH change) instead of connecting and re-issuing pragmas
+# on every call. sqlite3 caches up to STATEMENT_CACHE_SIZE prepared
+# statements per connection, so with the connection kept open the SQL of
+# the db functions is compiled once per thread rather than once per call.
+
+SQLITE_PRAGMAS = [
+    ("journal_mode", "WAL"),
+    ("foreign_keys", "ON"),
+    ("synchronous", "NORMAL"),      # WAL: durable at checkpoints, no fsync per commit
+    ("temp_store", "MEMORY"),
+    ("cache_size", -65536),         # KiB (64 MB page cache)
+    ("mmap_size", 268435456),       # 256 MB memory-mapped reads
+]
+STATEMENT_CACHE_SIZE = 256          # prepared statements kept per connection
 
-def _get_conn() -> sqlite3.Connection:
-    """Get a connection with dict-like row access and WAL mode."""
-    conn = sqlite3.connect(DB_PATH, timeout=30)
+_local = threading.local()
+_inherited_conns = []               # pre-fork connections: kept unused, never closed
+
+
+def _open_conn() -> sqlite3.Connection:
+    """New connection with dict-like row access and the tuned pragmas."""
+    conn = sqlite3.connect(DB_PATH, timeout=30, cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    for name, value in SQLITE_PRAGMAS:
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def _get_conn() -> sqlite3.Connection:
+    """This thread's persistent connection (opened on first use)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid() or _local.path != DB_PATH:
+        if conn is not None:
+            if _local.pid != os.getpid():
+                # Inherited across fork(): closing it here could checkpoint
+                # the parent's WAL, so just keep it referenced
+                _inherited_conns.append(conn)
+            else:
+                conn.close()
+        conn = _open_conn()
+        _local.conn, _local.pid, _local.path = conn, os.getpid(), DB_PATH
+        _local.depth = 0
     return conn
 
 
+def close_connection():
+    """Close this thread's connection (the next db call reopens it)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        if _local.pid == os.getpid():
+            conn.close()
+        else:
+            _inherited_conns.append(conn)
+    _local.conn = None
+
+
 @contextmanager
 def connection():
-    """Context manager for database connections."""
+    """Context manager for database connections.
+
+    Yields this thread's connection and commits on success (rolls back on
+    error). Inside transaction() it joins the open unit of work instead.
+    """
     conn = _get_conn()
+    if _local.depth:
+        yield conn
+        return
     try:
         yield conn
         conn.commit()
     except Exception:
         conn.rollback()
         raise
+
+
+@contextmanager
+def transaction():
+    """Unit of work: run several db calls in one transaction.
+
+        with db.transaction():
+            run = db.get_current_run(asset_id)
+            wells = db.get_offset_wells(run["id"])
+
+    Every db call in the block (on this thread) uses the same connection
+    and transaction, so reads see one consistent snapshot and writes commit
+    together at the end, or roll back together on error. Nested blocks
+    join the outer one. Do not await inside the block: the event loop
+    thread's connection is shared by all async routes.
+    """
+    conn = _get_conn()
+    if _local.depth:
+        _local.depth += 1
+        try:
+            yield conn
+        finally:
+            _local.depth -= 1
+        return
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN")
+    _local.depth = 1
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
     finally:
-        conn.close()
+        _local.depth = 0
+
+
+atexit.register(close_connection)
+
+
+# R*Tree over well_cache_records coordinates (one point box per located
+# well, id = the record's rowid), kept in sync by triggers so every write
+# path (save_well_cache_records upserts, clear_well_cache) updates it.
+_SPATIAL_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS well_cache_rtree USING rtree(
+    id, min_lat, max_lat, min_lon, max_lon
+);
+
+CREATE TRIGGER IF NOT EXISTS wcr_rtree_insert AFTER INSERT ON well_cache_records
+WHEN new.lat IS NOT NULL AND new.lon IS NOT NULL
+BEGIN
+    INSERT INTO well_cache_rtree VALUES (new.rowid, new.lat, new.lat, new.lon, new.lon);
+END;
+
+CREATE TRIGGER IF NOT EXISTS wcr_rtree_update AFTER UPDATE OF lat, lon ON well_cache_records
+BEGIN
+    DELETE FROM well_cache_rtree WHERE id = old.rowid;
+    INSERT INTO well_cache_rtree
+        SELECT new.rowid, new.lat, new.lat, new.lon, new.lon
+        WHERE new.lat IS NOT NULL AND new.lon IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS wcr_rtree_delete AFTER DELETE ON well_cache_records
+BEGIN
+    DELETE FROM well_cache_rtree WHERE id = old.rowid;
+END;
+"""
+
+_has_rtree = False  # set by init_db(); False = SQLite built without R*Tree
+
+
+def _sync_well_rtree(conn: sqlite3.Connection):
+    """Rebuild well_cache_rtree if its size does not match well_cache_records.
+
+    Covers databases created before the index existed; an index of the
+    right size is left alone (the triggers keep it current).
+    """
+    n_located = conn.execute(
+        "SELECT COUNT(*) FROM well_cache_records WHERE lat IS NOT NULL AND lon IS NOT NULL"
+    ).fetchone()[0]
+    n_indexed = conn.execute("SELECT COUNT(*) FROM well_cache_rtree").fetchone()[0]
+    if n_located == n_indexed:
+        return
+    conn.execute("DELETE FROM well_cache_rtree")
+    conn.execute(
+        """INSERT INTO well_cache_rtree
+           SELECT rowid, lat, lat, lon, lon FROM well_cache_records
+           WHERE lat IS NOT NULL AND lon IS NOT NULL"""
+    )
 
 
 def init_db():
     """Create all tables and indexes if they don't exist."""
+    global _has_rtree
     with connection() as conn:
         conn.executescript(_SCHEMA_SQL)
+        try:
+            conn.executescript(_SPATIAL_SQL)
+            _sync_well_rtree(conn)
+            _has_rtree = True
+        except sqlite3.OperationalError:
+            _has_rtree = False
     print(f"  DB initialized: {DB_PATH}")
 
 
@@ -355,6 +554,77 @@ def _safe_int(val, default=None):
         return default
 
 
+# Declared SQLite column type -> DataFrame dtype (nullable, so NULLs survive)
+_SQL_DTYPES = {"INTEGER": "Int64", "REAL": "float64", "TEXT": "string"}
+_table_dtypes_cache: dict[tuple[str, str], dict[str, str]] = {}
+
+
+def _table_dtypes(conn: sqlite3.Connection, table: str) -> dict[str, str]:
+    """{column: dtype} of a table, in schema order (from PRAGMA table_info)."""
+    key = (DB_PATH, table)
+    if key not in _table_dtypes_cache:
+        info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        if not info:
+            raise ValueError(f"Unknown table: {table}")
+        _table_dtypes_cache[key] = {
+            r["name"]: _SQL_DTYPES.get(r["type"].upper(), "object") for r in info
+        }
+    return _table_dtypes_cache[key]
+
+
+def _read_df(table: str, where: str = "", params: list | tuple = (),
+             columns: list[str] | None = None, order_by: str = "") -> pd.DataFrame:
+    """SELECT from table straight into a DataFrame with schema dtypes.
+
+    Rows go from the cursor into columns (pd.read_sql_query) without
+    per-row dicts. columns limits the SELECT (default: all, schema order).
+    INTEGER / REAL columns become Int64 / float64 (values SQLite stored as
+    text, e.g. "N/A", become missing) and TEXT columns pandas strings.
+    """
+    with connection() as conn:
+        dtypes = _table_dtypes(conn, table)
+        if columns is None:
+            columns = list(dtypes)
+        unknown = [c for c in columns if c not in dtypes]
+        if unknown:
+            raise ValueError(f"Unknown {table} columns: {', '.join(unknown)}")
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        df = pd.read_sql_query(sql, conn, params=list(params))
+    for c in columns:
+        dtype = dtypes[c]
+        if dtype in ("Int64", "float64"):
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(dtype)
+        elif dtype != "object":
+            df[c] = df[c].astype(dtype)
+    return df
+
+
+def _bulk_insert(conn: sqlite3.Connection, table: str, columns: list[str], rows,
+                 upsert_on: list[str] | None = None,
+                 update_columns: list[str] | None = None) -> int:
+    """INSERT column-ordered tuples with one executemany (one prepared statement).
+
+    rows is any iterable of tuples matching columns; it runs in the caller's
+    transaction. With upsert_on (the conflict-target columns of a UNIQUE
+    constraint) an existing row is updated instead: update_columns (default:
+    every column not in upsert_on) are set from the new row.
+    Returns the number of rows written.
+    """
+    sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+           f"VALUES ({', '.join('?' for _ in columns)})")
+    if upsert_on:
+        if update_columns is None:
+            update_columns = [c for c in columns if c not in upsert_on]
+        sql += (f" ON CONFLICT({', '.join(upsert_on)}) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in update_columns))
+    cur = conn.executemany(sql, rows)
+    return cur.rowcount
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  ANALYSIS RUNS
 # ═══════════════════════════════════════════════════════════════════
@@ -433,12 +703,8 @@ def save_offset_wells(run_id: int, wells: list[dict]):
     """
     with connection() as conn:
         conn.execute("DELETE FROM offset_wells WHERE run_id = ?", (run_id,))
-        for w in wells:
-            conn.execute(
-                f"""INSERT INTO offset_wells (run_id, {', '.join(_OW_COLUMNS)})
-                    VALUES (?, {', '.join('?' for _ in _OW_COLUMNS)})""",
-                (run_id, *[w.get(c) for c in _OW_COLUMNS]),
-            )
+        _bulk_insert(conn, "offset_wells", ["run_id", *_OW_COLUMNS],
+                     [(run_id, *[w.get(c) for c in _OW_COLUMNS]) for w in wells])
     print(f"  DB: Saved {len(wells)} offset wells (run {run_id})")
 
 
@@ -452,6 +718,11 @@ def get_offset_wells(run_id: int) -> list[dict]:
         return _rows_to_dicts(rows)
 
 
+def get_offset_wells_df(run_id: int, columns: list[str] | None = None) -> pd.DataFrame:
+    """get_offset_wells() as a typed DataFrame (optionally only some columns)."""
+    return _read_df("offset_wells", "run_id = ?", [run_id], columns, "distance_miles")
+
+
 def get_offset_filter_options(run_id: int) -> dict:
     """Return distinct basin and target_formation values for a run's offset wells."""
     with connection() as conn:
@@ -503,31 +774,33 @@ _BHA_COLUMNS = [
 ]
 
 
+_BHA_FLOAT_COLS = {
+    "distance_miles", "start_depth", "end_depth", "run_length",
+    "section_start_depth", "lateral_start_depth", "hole_size_filter",
+    "formation_coverage",
+}
+_BHA_INT_COLS = {"num_components", "is_rss", "has_agitator"}
+
+
 def save_bha_runs(run_id: int, runs: list[dict], replace: bool = True):
     """Bulk insert BHA runs for an analysis run.
 
     If replace=True, clears existing runs for this run_id first.
     """
+    # Per-column converter, decided once instead of per value
+    convert = []
+    for c in _BHA_COLUMNS:
+        if c in _BHA_FLOAT_COLS:
+            convert.append((c, _safe_float))
+        elif c in _BHA_INT_COLS:
+            convert.append((c, lambda v: _safe_int(v, 0)))
+        else:
+            convert.append((c, None))
+    rows = [(run_id, *[f(r.get(c)) if f else r.get(c) for c, f in convert]) for r in runs]
     with connection() as conn:
         if replace:
             conn.execute("DELETE FROM bha_runs WHERE run_id = ?", (run_id,))
-        for r in runs:
-            vals = []
-            for c in _BHA_COLUMNS:
-                v = r.get(c)
-                if c in ("distance_miles", "start_depth", "end_depth",
-                         "run_length", "section_start_depth",
-                         "lateral_start_depth", "hole_size_filter",
-                         "formation_coverage"):
-                    v = _safe_float(v)
-                elif c in ("num_components", "is_rss", "has_agitator"):
-                    v = _safe_int(v, 0)
-                vals.append(v)
-            conn.execute(
-                f"""INSERT INTO bha_runs (run_id, {', '.join(_BHA_COLUMNS)})
-                    VALUES (?, {', '.join('?' for _ in _BHA_COLUMNS)})""",
-                (run_id, *vals),
-            )
+        _bulk_insert(conn, "bha_runs", ["run_id", *_BHA_COLUMNS], rows)
     print(f"  DB: Saved {len(runs)} BHA runs (run {run_id})")
 
 
@@ -548,17 +821,19 @@ def get_bha_runs(run_id: int, section_name: str | None = None,
         return _rows_to_dicts(rows)
 
 
-def get_bha_runs_df(run_id: int, section_name: str | None = None) -> pd.DataFrame:
-    """Get BHA runs as a DataFrame."""
-    conn = _get_conn()
-    sql = "SELECT * FROM bha_runs WHERE run_id = ?"
+def get_bha_runs_df(run_id: int, section_name: str | None = None,
+                    asset_id: str | None = None,
+                    columns: list[str] | None = None) -> pd.DataFrame:
+    """get_bha_runs() as a typed DataFrame (optionally only some columns)."""
+    where = "run_id = ?"
     params: list[Any] = [run_id]
     if section_name:
-        sql += " AND section_name = ?"
+        where += " AND section_name = ?"
         params.append(section_name)
-    df = pd.read_sql_query(sql, conn, params=params)
-    conn.close()
-    return df
+    if asset_id:
+        where += " AND asset_id = ?"
+        params.append(asset_id)
+    return _read_df("bha_runs", where, params, columns, "asset_id, bha_number")
 
 
 def update_bha_parsed_fields(run_id: int, bha_id: int, fields: dict):
@@ -577,12 +852,12 @@ def update_bha_equiv_keys(run_id: int, updates: list[tuple[str, str, str]]):
     updates: list of (asset_id, bha_number, equiv_bha_key)
     """
     with connection() as conn:
-        for asset_id, bha_number, key in updates:
-            conn.execute(
-                """UPDATE bha_runs SET equiv_bha_key = ?
-                   WHERE run_id = ? AND asset_id = ? AND bha_number = ?""",
-                (key, run_id, asset_id, str(bha_number)),
-            )
+        conn.executemany(
+            """UPDATE bha_runs SET equiv_bha_key = ?
+               WHERE run_id = ? AND asset_id = ? AND bha_number = ?""",
+            [(key, run_id, asset_id, str(bha_number))
+             for asset_id, bha_number, key in updates],
+        )
 
 
 def update_bha_section_filter(run_id: int, bha_db_id: int,
@@ -643,23 +918,21 @@ def save_formation_tops(tops: list[dict], replace_asset: str | None = None):
                 "DELETE FROM formation_tops WHERE asset_id = ?",
                 (str(replace_asset),),
             )
-        for t in tops:
-            conn.execute(
-                """INSERT INTO formation_tops
-                   (asset_id, well_name, formation_name, md_top, tvd_top,
-                    md_thickness, tvd_thickness, lithology)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    str(t.get("asset_id", "")),
-                    t.get("well_name"),
-                    t.get("formation_name", ""),
-                    _safe_float(t.get("md_top")),
-                    _safe_float(t.get("tvd_top")),
-                    _safe_float(t.get("md_thickness")),
-                    _safe_float(t.get("tvd_thickness")),
-                    t.get("lithology"),
-                ),
-            )
+        _bulk_insert(
+            conn, "formation_tops",
+            ["asset_id", "well_name", "formation_name", "md_top", "tvd_top",
+             "md_thickness", "tvd_thickness", "lithology"],
+            [(
+                str(t.get("asset_id", "")),
+                t.get("well_name"),
+                t.get("formation_name", ""),
+                _safe_float(t.get("md_top")),
+                _safe_float(t.get("tvd_top")),
+                _safe_float(t.get("md_thickness")),
+                _safe_float(t.get("tvd_thickness")),
+                t.get("lithology"),
+            ) for t in tops],
+        )
     n_assets = len(set(str(t.get("asset_id", "")) for t in tops))
     print(f"  DB: Saved {len(tops)} formation tops ({n_assets} wells)")
 
@@ -676,6 +949,27 @@ def get_formation_tops(asset_id: str, canonical_only: bool = False) -> list[dict
         return _rows_to_dicts(rows)
 
 
+def get_formation_tops_df(asset_ids: str | list[str] | None = None,
+                          canonical_only: bool = False,
+                          columns: list[str] | None = None) -> pd.DataFrame:
+    """Formation tops of one well, several wells or all wells (None) as a DataFrame.
+
+    Ordered by asset_id, md_top -- a list of wells is one query.
+    """
+    clauses = []
+    params: list[Any] = []
+    if asset_ids is not None:
+        ids = [str(asset_ids)] if isinstance(asset_ids, (str, int)) else [str(a) for a in asset_ids]
+        if not ids:
+            clauses.append("0")
+        else:
+            clauses.append(f"asset_id IN ({', '.join('?' for _ in ids)})")
+            params.extend(ids)
+    if canonical_only:
+        clauses.append("is_canonical = 1")
+    return _read_df("formation_tops", " AND ".join(clauses), params, columns, "asset_id, md_top")
+
+
 def get_all_formation_tops() -> list[dict]:
     """Get all formation tops (all wells)."""
     with connection() as conn:
@@ -735,13 +1029,12 @@ def save_canonical_formations(run_id: int, formations: list[dict]):
                 ),
             )
             cf_id = cur.lastrowid
-            for sub in fm.get("sub_formations", fm.get("target_sub_formations", [])):
-                conn.execute(
-                    """INSERT INTO canonical_sub_formations
-                       (canonical_formation_id, sub_formation_name)
-                       VALUES (?, ?)""",
-                    (cf_id, sub),
-                )
+            _bulk_insert(
+                conn, "canonical_sub_formations",
+                ["canonical_formation_id", "sub_formation_name"],
+                [(cf_id, sub)
+                 for sub in fm.get("sub_formations", fm.get("target_sub_formations", []))],
+            )
     print(f"  DB: Saved {len(formations)} canonical formations (run {run_id})")
 
 
@@ -781,29 +1074,30 @@ def save_target_sections(run_id: int, sections: list[dict]):
     """Save target well sections."""
     with connection() as conn:
         conn.execute("DELETE FROM target_sections WHERE run_id = ?", (run_id,))
+        rows = []
         for s in sections:
             fms = s.get("formations_in_section", [])
-            conn.execute(
-                """INSERT INTO target_sections
-                   (run_id, name, hole_size, mode, top_md, bottom_md,
-                    section_length, top_tvd, bottom_tvd,
-                    start_formation, end_formation, formations_json)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    run_id,
-                    s.get("name", "Unknown"),
-                    _safe_float(s.get("hole_size")),
-                    s.get("mode", "vertical"),
-                    _safe_float(s.get("top_md")),
-                    _safe_float(s.get("bottom_md")),
-                    _safe_float(s.get("section_length_md", s.get("section_length"))),
-                    _safe_float(s.get("top_tvd")),
-                    _safe_float(s.get("bottom_tvd")),
-                    s.get("start_formation"),
-                    s.get("end_formation"),
-                    json.dumps(fms) if fms else None,
-                ),
-            )
+            rows.append((
+                run_id,
+                s.get("name", "Unknown"),
+                _safe_float(s.get("hole_size")),
+                s.get("mode", "vertical"),
+                _safe_float(s.get("top_md")),
+                _safe_float(s.get("bottom_md")),
+                _safe_float(s.get("section_length_md", s.get("section_length"))),
+                _safe_float(s.get("top_tvd")),
+                _safe_float(s.get("bottom_tvd")),
+                s.get("start_formation"),
+                s.get("end_formation"),
+                json.dumps(fms) if fms else None,
+            ))
+        _bulk_insert(
+            conn, "target_sections",
+            ["run_id", "name", "hole_size", "mode", "top_md", "bottom_md",
+             "section_length", "top_tvd", "bottom_tvd",
+             "start_formation", "end_formation", "formations_json"],
+            rows,
+        )
     print(f"  DB: Saved {len(sections)} target sections (run {run_id})")
 
 
@@ -844,14 +1138,11 @@ def save_equiv_bha_groups(run_id: int, section_name: str, groups: list[dict]):
             "DELETE FROM equiv_bha_groups WHERE run_id = ? AND section_name = ?",
             (run_id, section_name),
         )
-        for g in groups:
-            g_copy = dict(g)
-            g_copy["section_name"] = section_name
-            conn.execute(
-                f"""INSERT INTO equiv_bha_groups (run_id, {', '.join(_EG_COLUMNS)})
-                    VALUES (?, {', '.join('?' for _ in _EG_COLUMNS)})""",
-                (run_id, *[g_copy.get(c) for c in _EG_COLUMNS]),
-            )
+        _bulk_insert(
+            conn, "equiv_bha_groups", ["run_id", *_EG_COLUMNS],
+            [(run_id, *[section_name if c == "section_name" else g.get(c) for c in _EG_COLUMNS])
+             for g in groups],
+        )
     print(f"  DB: Saved {len(groups)} equiv BHA groups for {section_name}")
 
 
@@ -867,6 +1158,13 @@ def get_equiv_bha_groups(run_id: int, section_name: str) -> list[dict]:
         return _rows_to_dicts(rows)
 
 
+def get_equiv_bha_groups_df(run_id: int, section_name: str,
+                            columns: list[str] | None = None) -> pd.DataFrame:
+    """get_equiv_bha_groups() as a typed DataFrame (optionally only some columns)."""
+    return _read_df("equiv_bha_groups", "run_id = ? AND section_name = ?",
+                    [run_id, section_name], columns, "num_runs DESC")
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  TTD RANKINGS
 # ═══════════════════════════════════════════════════════════════════
@@ -878,26 +1176,24 @@ def save_ttd_rankings(run_id: int, section_name: str, rankings: list[dict]):
             "DELETE FROM ttd_rankings WHERE run_id = ? AND section_name = ?",
             (run_id, section_name),
         )
-        for r in rankings:
-            conn.execute(
-                """INSERT INTO ttd_rankings
-                   (run_id, section_name, group_key, num_runs, num_wells,
-                    target_length, expected_slide_pct, ttd_hours, ttd_days,
-                    bins_with_data, bins_missing)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    run_id, section_name,
-                    r.get("group_key"),
-                    _safe_int(r.get("num_runs")),
-                    _safe_int(r.get("num_wells")),
-                    _safe_float(r.get("target_lateral_ft", r.get("target_section_ft", r.get("target_length")))),
-                    _safe_float(r.get("expected_slide_pct")),
-                    _safe_float(r.get("ttd_hours")),
-                    _safe_float(r.get("ttd_days")),
-                    _safe_int(r.get("bins_with_data", r.get("segments_with_data"))),
-                    _safe_int(r.get("bins_missing", r.get("segments_missing"))),
-                ),
-            )
+        _bulk_insert(
+            conn, "ttd_rankings",
+            ["run_id", "section_name", "group_key", "num_runs", "num_wells",
+             "target_length", "expected_slide_pct", "ttd_hours", "ttd_days",
+             "bins_with_data", "bins_missing"],
+            [(
+                run_id, section_name,
+                r.get("group_key"),
+                _safe_int(r.get("num_runs")),
+                _safe_int(r.get("num_wells")),
+                _safe_float(r.get("target_lateral_ft", r.get("target_section_ft", r.get("target_length")))),
+                _safe_float(r.get("expected_slide_pct")),
+                _safe_float(r.get("ttd_hours")),
+                _safe_float(r.get("ttd_days")),
+                _safe_int(r.get("bins_with_data", r.get("segments_with_data"))),
+                _safe_int(r.get("bins_missing", r.get("segments_missing"))),
+            ) for r in rankings],
+        )
     print(f"  DB: Saved {len(rankings)} TTD rankings for {section_name}")
 
 
@@ -913,6 +1209,13 @@ def get_ttd_rankings(run_id: int, section_name: str) -> list[dict]:
         return _rows_to_dicts(rows)
 
 
+def get_ttd_rankings_df(run_id: int, section_name: str,
+                        columns: list[str] | None = None) -> pd.DataFrame:
+    """get_ttd_rankings() as a typed DataFrame (optionally only some columns)."""
+    return _read_df("ttd_rankings", "run_id = ? AND section_name = ?",
+                    [run_id, section_name], columns, "ttd_hours")
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  BIT CATALOG
 # ═══════════════════════════════════════════════════════════════════
@@ -920,34 +1223,28 @@ def get_ttd_rankings(run_id: int, section_name: str) -> list[dict]:
 def save_bit_catalog(entries: list[dict]):
     """Save/update the bit catalog (upsert by manufacturer+model)."""
     with connection() as conn:
-        for e in entries:
-            conn.execute(
-                """INSERT INTO bit_catalog
-                   (bit_manufacturer, bit_model, bit_diameters, parsed_blades,
-                    parsed_cutter_mm, parse_confidence, parse_method,
-                    total_runs, operators, sources)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                   ON CONFLICT(bit_manufacturer, bit_model) DO UPDATE SET
-                    bit_diameters = excluded.bit_diameters,
-                    parsed_blades = excluded.parsed_blades,
-                    parsed_cutter_mm = excluded.parsed_cutter_mm,
-                    parse_confidence = excluded.parse_confidence,
-                    total_runs = excluded.total_runs,
-                    operators = excluded.operators,
-                    sources = excluded.sources""",
-                (
-                    e.get("bit_manufacturer"),
-                    e.get("bit_model"),
-                    e.get("bit_diameters"),
-                    e.get("parsed_blades"),
-                    e.get("parsed_cutter_mm"),
-                    e.get("parse_confidence"),
-                    e.get("parse_method"),
-                    _safe_int(e.get("total_runs")),
-                    e.get("operators"),
-                    e.get("sources"),
-                ),
-            )
+        _bulk_insert(
+            conn, "bit_catalog",
+            ["bit_manufacturer", "bit_model", "bit_diameters", "parsed_blades",
+             "parsed_cutter_mm", "parse_confidence", "parse_method",
+             "total_runs", "operators", "sources"],
+            [(
+                e.get("bit_manufacturer"),
+                e.get("bit_model"),
+                e.get("bit_diameters"),
+                e.get("parsed_blades"),
+                e.get("parsed_cutter_mm"),
+                e.get("parse_confidence"),
+                e.get("parse_method"),
+                _safe_int(e.get("total_runs")),
+                e.get("operators"),
+                e.get("sources"),
+            ) for e in entries],
+            upsert_on=["bit_manufacturer", "bit_model"],
+            # parse_method of an existing entry is kept
+            update_columns=["bit_diameters", "parsed_blades", "parsed_cutter_mm",
+                            "parse_confidence", "total_runs", "operators", "sources"],
+        )
     print(f"  DB: Saved {len(entries)} bit catalog entries")
 
 
@@ -1022,27 +1319,58 @@ def get_cached_well_records() -> list[dict]:
         return _rows_to_dicts(rows)
 
 
-def get_cached_wells_near(lat: float, lon: float, radius_miles: float) -> list[dict]:
-    """Return cached wells within a bounding box around the target location.
-
-    Uses a generous bounding box (1.2x radius) to avoid missing wells
-    near the corners. Actual haversine distance check is done in Python.
-    """
-    import math
-    margin = 1.2
-    lat_delta = (radius_miles * margin) / 69.0
-    lon_delta = (radius_miles * margin) / (69.0 * math.cos(math.radians(lat)))
-
-    with connection() as conn:
+def _cached_wells_in_box(conn: sqlite3.Connection, box: tuple) -> list[dict]:
+    """Located well_cache_records inside a (min_lat, max_lat, min_lon, max_lon) box."""
+    if _has_rtree:
+        rows = conn.execute(
+            """SELECT w.* FROM well_cache_rtree r
+               JOIN well_cache_records w ON w.rowid = r.id
+               WHERE r.max_lat >= ? AND r.min_lat <= ?
+                 AND r.max_lon >= ? AND r.min_lon <= ?""",
+            box,
+        ).fetchall()
+    else:
         rows = conn.execute(
             """SELECT * FROM well_cache_records
                WHERE lat BETWEEN ? AND ?
-                 AND lon BETWEEN ? AND ?
-                 AND lat IS NOT NULL AND lon IS NOT NULL""",
-            (lat - lat_delta, lat + lat_delta,
-             lon - lon_delta, lon + lon_delta),
+                 AND lon BETWEEN ? AND ?""",
+            box,
         ).fetchall()
-        return _rows_to_dicts(rows)
+    return _rows_to_dicts(rows)
+
+
+def _with_distances(recs: list[dict], lat: float, lon: float,
+                    radius_miles: float) -> list[dict]:
+    """Records nearest first, distance_miles set to the exact distance from (lat, lon).
+
+    Distances are computed for all records in one vectorized call; records
+    farther than radius_miles are dropped.
+    """
+    if not recs:
+        return []
+    lats = np.fromiter((r["lat"] for r in recs), dtype=np.float64, count=len(recs))
+    lons = np.fromiter((r["lon"] for r in recs), dtype=np.float64, count=len(recs))
+    dist = np.atleast_1d(geo.haversine_miles(lat, lon, lats, lons))
+    order = np.argsort(dist, kind="stable")
+    order = order[dist[order] <= radius_miles]
+    out = []
+    for i, d in zip(order.tolist(), dist[order].tolist()):
+        rec = recs[i]
+        rec["distance_miles"] = d
+        out.append(rec)
+    return out
+
+
+def get_cached_wells_near(lat: float, lon: float, radius_miles: float) -> list[dict]:
+    """Return cached wells within radius_miles of a location, nearest first.
+
+    Candidates come from the well_cache_rtree spatial index (bounding box
+    of the search circle); the exact haversine check is vectorized.
+    distance_miles in each record is the unrounded distance from (lat, lon).
+    """
+    with connection() as conn:
+        recs = _cached_wells_in_box(conn, geo.bounding_box(lat, lon, radius_miles))
+    return _with_distances(recs, lat, lon, radius_miles)
 
 
 def get_cached_well_asset_ids() -> set[str]:
@@ -1086,25 +1414,25 @@ def save_well_cache_records(records: list[dict]):
     """
     if not records:
         return
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    float_cols = [c in _WCR_FLOAT_COLS for c in _WELL_CACHE_COLUMNS]
+    rows = []
+    for r in records:
+        vals = []
+        for c, is_float in zip(_WELL_CACHE_COLUMNS, float_cols):
+            v = r.get(c)
+            if is_float:
+                v = _safe_float(v)
+            elif v == "N/A":
+                v = None
+            vals.append(v)
+        vals.append(now_str)
+        rows.append(tuple(vals))
     with connection() as conn:
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cols = _WELL_CACHE_COLUMNS + ["fetched_at"]
-        placeholders = ", ".join("?" for _ in cols)
-        col_names = ", ".join(cols)
-        for r in records:
-            vals = []
-            for c in _WELL_CACHE_COLUMNS:
-                v = r.get(c)
-                if c in _WCR_FLOAT_COLS:
-                    v = _safe_float(v)
-                elif v == "N/A":
-                    v = None
-                vals.append(v)
-            vals.append(now_str)
-            conn.execute(
-                f"INSERT OR REPLACE INTO well_cache_records ({col_names}) VALUES ({placeholders})",
-                vals,
-            )
+        # Upsert on the asset_id primary key: every column is overwritten,
+        # as INSERT OR REPLACE did, without a delete + reinsert per row
+        _bulk_insert(conn, "well_cache_records", _WELL_CACHE_COLUMNS + ["fetched_at"],
+                     rows, upsert_on=["asset_id"])
     print(f"  DB cache: Saved {len(records)} well cache records")
 
 
@@ -1141,6 +1469,126 @@ def _run_prefix(run_id: int | None) -> str:
     return f"run{run_id}_"
 
 
+# ── Partitioned dataset ──
+#
+# Per-run section data lives in one Hive-partitioned dataset:
+#
+#   DATASET_DIR/kind=rop_curves_by_group/run_id=12/section=Lateral/mode=lateral/part-<ns>.parquet
+#
+# Saving a section writes a new part file and then removes the partition's
+# older parts. Parts are written under a hidden temp name and named at
+# commit time, so the newest part is the latest committed save; every
+# reader uses only that part, and never sees a half-written file. Older
+# parts left behind (by a save racing another, or a crash before cleanup)
+# and stale temp files are removed by compact_dataset(). Flat files from
+# before the dataset (run12_rop_curves_by_group_Lateral_vertical.parquet,
+# and unscoped ones) are still read when a partition does not exist.
+
+DATASET_KINDS = ("rop_1ft", "rop_curves_per_run", "rop_curves_by_group")
+PARQUET_KEEP_RUNS = 10  # prune_dataset() default: newest unreferenced run_ids kept
+PARQUET_STALE_TMP_HOURS = 24  # compact_dataset() removes older temp parts
+
+_HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"  # run_id partition of unscoped data
+_DATASET_PARTITIONING = ds.partitioning(
+    pa.schema([("run_id", pa.int64()), ("section", pa.string()), ("mode", pa.string())]),
+    flavor="hive",
+)
+
+
+def _partition_dir(kind: str, run_id: int | None, section_name: str, mode: str) -> str:
+    """Directory of one (kind, run_id, section, mode) partition."""
+    if kind not in DATASET_KINDS:
+        raise ValueError(f"Unknown dataset kind: {kind}")
+    rid = _HIVE_NULL if run_id is None else str(int(run_id))
+    return os.path.join(DATASET_DIR, f"kind={kind}", f"run_id={rid}",
+                        f"section={quote(section_name, safe='')}", f"mode={mode}")
+
+
+def _partition_parts(part_dir: str) -> list[str]:
+    """Committed part files of a partition, oldest first (names sort by commit time)."""
+    try:
+        names = os.listdir(part_dir)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(part_dir, n) for n in sorted(names)
+            if n.startswith("part-") and n.endswith(".parquet")]
+
+
+def _new_part_path(part_dir: str) -> str:
+    """Path for a new part file in a partition (creates the directory)."""
+    os.makedirs(part_dir, exist_ok=True)
+    return os.path.join(part_dir, f"part-{time.time_ns()}-{os.getpid()}.parquet")
+
+
+def _temp_part_path(path: str) -> str:
+    """Hidden temp name next to path; dataset discovery skips dot files."""
+    return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+
+
+def _drop_older_parts(path: str):
+    """Remove the parts of path's partition written before it."""
+    for old in _partition_parts(os.path.dirname(path)):
+        if old < path:
+            os.remove(old)
+
+
+def _save_partition(kind: str, section_name: str, mode: str, run_id: int | None,
+                    df: pd.DataFrame) -> str:
+    """Replace a partition's data with df. Returns the new part's path."""
+    path = _new_part_path(_partition_dir(kind, run_id, section_name, mode))
+    tmp = _temp_part_path(path)
+    df.to_parquet(tmp, index=False, compression="snappy")
+    os.replace(tmp, path)
+    _drop_older_parts(path)
+    return path
+
+
+def _find_section_parquet(kind: str, legacy_name: str, section_name: str, mode: str,
+                          run_id: int | None) -> str | None:
+    """Newest part of a section's partition, else its flat file, run-scoped
+    first and then unscoped (migrated unscoped data lives in the run_id-less
+    partition); None if nothing exists. legacy_name is the flat name
+    without prefix."""
+    rid = _resolve_run_id(run_id)
+    candidates = [(_partition_dir(kind, rid, section_name, mode),
+                   _parquet_path(f"{_run_prefix(rid)}{legacy_name}"))]
+    if rid is not None:
+        candidates.append((_partition_dir(kind, None, section_name, mode),
+                           _parquet_path(legacy_name)))
+    for part_dir, flat in candidates:
+        parts = _partition_parts(part_dir)
+        if parts:
+            return parts[-1]
+        if os.path.exists(flat):
+            return flat
+    return None
+
+
+def _read_section_parquet(path: str, columns: list[str] | None = None,
+                          filters: list | None = None) -> pd.DataFrame:
+    """Read a _find_section_parquet() result; columns it lacks are skipped."""
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    return pd.read_parquet(path, columns=columns, filters=filters)
+
+
+def _unified_schema(paths: list[str]) -> pa.Schema:
+    """One schema covering the given Parquet files.
+
+    Dictionary-encoded columns are read as their value type, so files
+    written by the 1ft streaming writer and by DataFrame.to_parquet agree.
+    """
+    schemas = []
+    for path in paths:
+        schema = pq.read_schema(path)
+        schemas.append(pa.schema([
+            pa.field(f.name, f.type.value_type if pa.types.is_dictionary(f.type) else f.type)
+            for f in schema
+        ]))
+    return pa.unify_schemas(schemas, promote_options="permissive")
+
+
 def _resolve_run_id(run_id: int | None) -> int | None:
     """If run_id is None, try to resolve from latest run."""
     if run_id is not None:
@@ -1160,51 +1608,410 @@ def save_1ft_data(section_name: str, df: pd.DataFrame, mode: str = "lateral",
     Args:
         section_name: Safe section name (e.g. "Production_Vertical")
         df: DataFrame with 1ft data
-        mode: "lateral" or "vertical" (affects filename)
-        run_id: Analysis run ID (included in filename to prevent cross-well contamination)
+        mode: "lateral" or "vertical" (mode partition)
+        run_id: Analysis run ID (run_id partition, prevents cross-well contamination)
     """
-    rid = _resolve_run_id(run_id)
-    suffix = "_vertical" if mode == "vertical" else ""
-    path = _parquet_path(f"{_run_prefix(rid)}rop_1ft_{section_name}{suffix}")
-    df.to_parquet(path, index=False, compression="snappy")
+    path = _save_partition("rop_1ft", section_name, mode, _resolve_run_id(run_id), df)
     size_mb = os.path.getsize(path) / 1024 / 1024
-    print(f"  Parquet: Saved {len(df)} rows to {os.path.basename(path)} "
+    print(f"  Parquet: Saved {len(df)} rows to {os.path.relpath(path, DATA_DIR)} "
           f"({size_mb:.1f} MB)")
 
 
+def find_1ft_data(section_name: str, mode: str = "lateral",
+                  run_id: int | None = None) -> str | None:
+    """Path of a section's 1ft Parquet (dataset partition, else flat file), or None."""
+    suffix = "_vertical" if mode == "vertical" else ""
+    return _find_section_parquet("rop_1ft", f"rop_1ft_{section_name}{suffix}",
+                                 section_name, mode, run_id)
+
+
 def load_1ft_data(section_name: str, mode: str = "lateral",
                   columns: list[str] | None = None,
-                  run_id: int | None = None) -> pd.DataFrame:
+                  run_id: int | None = None,
+                  filters: list | None = None) -> pd.DataFrame:
     """Load 1ft data from Parquet.
 
     Args:
         section_name: Safe section name
         mode: "lateral" or "vertical"
-        columns: Optional list of columns to load (for speed)
+        columns: Optional list of columns to load (for speed); columns the
+            file does not have are skipped
         run_id: Analysis run ID
+        filters: Optional pyarrow row filters, e.g.
+            [("state", "in", ["Rotary Drilling", "Slide Drilling"])];
+            applied while reading so non-matching row groups are skipped
     """
-    rid = _resolve_run_id(run_id)
-    suffix = "_vertical" if mode == "vertical" else ""
-    path = _parquet_path(f"{_run_prefix(rid)}rop_1ft_{section_name}{suffix}")
-    if not os.path.exists(path):
-        # Fallback to legacy (unscoped) filename
-        legacy = _parquet_path(f"rop_1ft_{section_name}{suffix}")
-        if os.path.exists(legacy):
-            return pd.read_parquet(legacy, columns=columns)
+    path = find_1ft_data(section_name, mode, run_id)
+    if path is None:
         return pd.DataFrame()
-    return pd.read_parquet(path, columns=columns)
+    return _read_section_parquet(path, columns, filters)
+
+
+# Typed layout for streamed 1ft data: float32 numerics, dictionary-encoded
+# (categorical) strings -- metadata columns repeat for every foot of a run.
+_1FT_STRING_COLUMNS = [
+    "asset_id", "well_name", "operator", "bha_number", "equiv_bha_key",
+    "has_agitator", "bit_manufacturer", "bit_model", "motor_od",
+    "motor_model", "motor_stages", "motor_lobe_config",
+]
+
+
+def _1ft_arrow_schema(mode: str) -> pa.Schema:
+    """Arrow schema for rop_1ft data in the column order pull_1ft_for_runs writes."""
+    cat = pa.dictionary(pa.int32(), pa.string())
+    fields = [pa.field(c, cat) for c in _1FT_STRING_COLUMNS]
+    fields += [
+        pa.field("hole_depth", pa.float32()),
+        pa.field("distance_from_run_start", pa.float32()),
+        pa.field("state", cat),
+        pa.field("rop_ft_hr", pa.float32()),
+        pa.field("tvd", pa.float32()),
+        pa.field("drillstring_id", cat),
+    ]
+    if mode == "vertical":
+        fields += [
+            pa.field("formation_name", cat),
+            pa.field("formation_pct", pa.float32()),
+            pa.field("formation_segment", pa.int16()),
+        ]
+    else:
+        fields.append(pa.field("distance_from_lateral_start", pa.float32()))
+    return pa.schema(fields)
+
+
+def _1ft_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """Coerce a processed 1ft frame (fresh or CSV-cached strings) to schema."""
+    arrays = []
+    for field in schema:
+        col = df[field.name] if field.name in df.columns else pd.Series([None] * len(df))
+        if pa.types.is_dictionary(field.type):
+            values = col.astype(object).where(col.notna(), "").astype(str)
+            arrays.append(pa.array(values.to_numpy(), pa.string()).dictionary_encode())
+        else:
+            num = pd.to_numeric(col, errors="coerce")
+            arrays.append(pa.array(num.to_numpy(dtype=float), from_pandas=True)
+                          .cast(field.type, safe=False))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class OneFtParquetWriter:
+    """Stream processed 1ft rows to Parquet, one row group per well.
+
+    Writes a new part of the partition save_1ft_data() would write, so
+    load_1ft_data() reads it unchanged; older parts are removed on close.
+    Use via open_1ft_writer() as a context manager.
+    """
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.schema = _1ft_arrow_schema(mode)
+        self.rows = 0
+        self.row_groups = 0
+        self._tmp = _temp_part_path(path)
+        self._writer = pq.ParquetWriter(self._tmp, self.schema, compression="snappy")
+
+    def write(self, df: pd.DataFrame):
+        """Append one well's processed rows as a single row group."""
+        if df is None or df.empty:
+            return
+        table = _1ft_table(df, self.schema)
+        self._writer.write_table(table, row_group_size=len(table))
+        self.rows += len(table)
+        self.row_groups += 1
+
+    def close(self):
+        """Finish the file and move it into place."""
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        # Name the part at commit time, so a save that finished while this
+        # file was streaming does not outrank it
+        self.path = _new_part_path(os.path.dirname(self.path))
+        os.replace(self._tmp, self.path)
+        _drop_older_parts(self.path)
+        size_mb = os.path.getsize(self.path) / 1024 / 1024
+        print(f"  Parquet: Streamed {self.rows} rows in {self.row_groups} row groups "
+              f"to {os.path.relpath(self.path, DATA_DIR)} ({size_mb:.1f} MB)")
+
+    def abort(self):
+        """Discard a partially written file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def open_1ft_writer(section_name: str, mode: str = "lateral",
+                    run_id: int | None = None) -> OneFtParquetWriter:
+    """Open a streaming writer for a section's 1ft data (see OneFtParquetWriter)."""
+    part_dir = _partition_dir("rop_1ft", _resolve_run_id(run_id), section_name, mode)
+    return OneFtParquetWriter(_new_part_path(part_dir), mode)
 
 
 def has_1ft_data(section_name: str, mode: str = "lateral",
                  run_id: int | None = None) -> bool:
     """Check if 1ft Parquet file exists."""
-    rid = _resolve_run_id(run_id)
-    suffix = "_vertical" if mode == "vertical" else ""
-    path = _parquet_path(f"{_run_prefix(rid)}rop_1ft_{section_name}{suffix}")
-    if os.path.exists(path):
-        return True
-    # Fallback to legacy
-    return os.path.exists(_parquet_path(f"rop_1ft_{section_name}{suffix}"))
+    return find_1ft_data(section_name, mode, run_id) is not None
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  PARQUET - RAW WITS.SUMMARY-1FT STORE (per asset, depth-indexed)
+# ═══════════════════════════════════════════════════════════════════
+
+# Flat columns kept for each raw 1ft record (API field -> store column)
+WITS_1FT_COLUMNS = [
+    "hole_depth", "state_max", "timestamp_max", "timestamp_min",
+    "true_vertical_depth_mean", "drillstring",
+]
+
+# Fetched intervals older than this are ignored (active wells keep drilling)
+WITS_1FT_MAX_AGE_DAYS = 30
+
+
+_wits_1ft_locks = {}
+_wits_1ft_locks_guard = threading.Lock()
+
+
+def _wits_1ft_path(asset_id: str) -> str:
+    return _parquet_path(f"wits_1ft_{asset_id}")
+
+
+def _wits_1ft_lock(asset_id: str) -> threading.Lock:
+    """Per-asset lock serializing this process's rewrites of one store file."""
+    with _wits_1ft_locks_guard:
+        return _wits_1ft_locks.setdefault(str(asset_id), threading.Lock())
+
+
+def _merge_intervals(intervals: list[tuple]) -> list[tuple]:
+    """Merge overlapping/touching (min, max, fetched_at) intervals.
+
+    The merged interval keeps the oldest fetched_at so TTL stays conservative;
+    save_1ft_records() drops expired intervals first, so a refetch is fresh.
+    """
+    merged = []
+    for lo, hi, ts in sorted(intervals):
+        if merged and lo <= merged[-1][1]:
+            m_lo, m_hi, m_ts = merged[-1]
+            merged[-1] = (m_lo, max(m_hi, hi), min(m_ts, ts))
+        else:
+            merged.append((lo, hi, ts))
+    return merged
+
+
+def get_1ft_fetched_intervals(asset_id: str,
+                              max_age_days: float | None = WITS_1FT_MAX_AGE_DAYS
+                              ) -> list[tuple[float, float]]:
+    """Return merged (min_depth, max_depth) intervals already in the 1ft store."""
+    with connection() as conn:
+        if max_age_days is None:
+            rows = conn.execute(
+                """SELECT min_depth, max_depth, fetched_at FROM wits_1ft_intervals
+                   WHERE asset_id = ?""",
+                (str(asset_id),),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                """SELECT min_depth, max_depth, fetched_at FROM wits_1ft_intervals
+                   WHERE asset_id = ? AND fetched_at >= datetime('now', 'localtime', ?)""",
+                (str(asset_id), f"-{max_age_days} days"),
+            ).fetchall()
+    merged = _merge_intervals(
+        [(r["min_depth"], r["max_depth"], r["fetched_at"]) for r in rows])
+    return [(lo, hi) for lo, hi, _ in merged]
+
+
+def get_1ft_missing_intervals(asset_id: str, min_depth: float, max_depth: float,
+                              max_age_days: float | None = WITS_1FT_MAX_AGE_DAYS
+                              ) -> list[tuple[float, float]]:
+    """Return the sub-ranges of [min_depth, max_depth] not yet in the 1ft store."""
+    intervals = get_1ft_fetched_intervals(asset_id, max_age_days)
+    if max_depth <= min_depth:
+        covered = any(lo <= min_depth <= hi for lo, hi in intervals)
+        return [] if covered else [(min_depth, max_depth)]
+
+    gaps = []
+    cursor = min_depth
+    for lo, hi in intervals:
+        if hi < cursor:
+            continue
+        if lo > max_depth:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < max_depth:
+        gaps.append((cursor, max_depth))
+    return gaps
+
+
+def save_1ft_records(asset_id: str, df: pd.DataFrame,
+                     min_depth: float, max_depth: float):
+    """Merge fetched 1ft records into the asset's store and mark the interval.
+
+    Only call this for a depth range that was fetched completely; records
+    already in the store (same hole_depth and timestamps) are de-duplicated.
+    Intervals older than WITS_1FT_MAX_AGE_DAYS are dropped before the new
+    one is merged in, so a refetched range counts as fresh again.
+
+    The read-merge-rewrite runs under a per-asset lock and inside an
+    IMMEDIATE transaction (SQLite's write lock), so concurrent pipelines
+    saving the same asset take turns instead of overwriting each other.
+    """
+    path = _wits_1ft_path(asset_id)
+    df = df.reindex(columns=WITS_1FT_COLUMNS)
+    with _wits_1ft_lock(asset_id), connection() as conn:
+        if not _local.depth:
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+        if os.path.exists(path):
+            df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+        df = (df.drop_duplicates(subset=["hole_depth", "timestamp_min", "timestamp_max"],
+                                 keep="last")
+                .sort_values("hole_depth", kind="mergesort")
+                .reset_index(drop=True))
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            df.to_parquet(tmp, index=False, compression="snappy")
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        rows = conn.execute(
+            """SELECT min_depth, max_depth, fetched_at FROM wits_1ft_intervals
+               WHERE asset_id = ? AND fetched_at >= datetime('now', 'localtime', ?)""",
+            (str(asset_id), f"-{WITS_1FT_MAX_AGE_DAYS} days"),
+        ).fetchall()
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        merged = _merge_intervals(
+            [(r["min_depth"], r["max_depth"], r["fetched_at"]) for r in rows]
+            + [(float(min_depth), float(max_depth), now_str)])
+        conn.execute("DELETE FROM wits_1ft_intervals WHERE asset_id = ?",
+                     (str(asset_id),))
+        conn.executemany(
+            """INSERT INTO wits_1ft_intervals (asset_id, min_depth, max_depth, fetched_at)
+               VALUES (?, ?, ?, ?)""",
+            [(str(asset_id), lo, hi, ts) for lo, hi, ts in merged],
+        )
+
+
+def load_1ft_records(asset_id: str, min_depth: float | None = None,
+                     max_depth: float | None = None) -> pd.DataFrame:
+    """Load stored raw 1ft records for an asset, optionally within a depth range."""
+    path = _wits_1ft_path(asset_id)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=WITS_1FT_COLUMNS)
+    filters = []
+    if min_depth is not None:
+        filters.append(("hole_depth", ">=", min_depth))
+    if max_depth is not None:
+        filters.append(("hole_depth", "<=", max_depth))
+    return pd.read_parquet(path, filters=filters or None)
+
+
+def clear_1ft_store(asset_id: str | None = None):
+    """Drop stored 1ft records and intervals for one asset (or all)."""
+    with connection() as conn:
+        if asset_id is None:
+            rows = conn.execute(
+                "SELECT DISTINCT asset_id FROM wits_1ft_intervals").fetchall()
+            asset_ids = [r["asset_id"] for r in rows]
+            conn.execute("DELETE FROM wits_1ft_intervals")
+        else:
+            asset_ids = [str(asset_id)]
+            conn.execute("DELETE FROM wits_1ft_intervals WHERE asset_id = ?",
+                         (str(asset_id),))
+    for aid in asset_ids:
+        path = _wits_1ft_path(aid)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  1FT PULL CHECKPOINTS (resume an interrupted pull_1ft_for_runs.py)
+# ═══════════════════════════════════════════════════════════════════
+
+def _checkpoint_1ft_path(job_key: str, asset_id: str) -> str:
+    return _parquet_path(f"ckpt_1ft_{job_key}_{asset_id}")
+
+
+def save_1ft_checkpoint(job_key: str, asset_id: str, df: pd.DataFrame,
+                        min_depth: float, max_depth: float, spool: bool = True):
+    """Journal a well as completed, spooling its fetched 1ft records.
+
+    The spool file is moved into place before the journal row is committed,
+    so a journalled, spooled well always has its records on disk. With
+    spool=False only the journal row is written: the records are already
+    in the wits_1ft store (save_1ft_records) and are resumed from there.
+    """
+    if spool:
+        path = _checkpoint_1ft_path(job_key, asset_id)
+        tmp = path + ".tmp"
+        df.to_parquet(tmp, index=False, compression="snappy")
+        os.replace(tmp, path)
+    depths = pd.to_numeric(df["hole_depth"], errors="coerce") if len(df) else None
+    with connection() as conn:
+        conn.execute(
+            """INSERT OR REPLACE INTO pull_1ft_checkpoints
+               (job_key, asset_id, min_depth, max_depth, first_depth, last_depth,
+                record_count, completed_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (job_key, str(asset_id), min_depth, max_depth,
+             _safe_float(depths.min()) if depths is not None else None,
+             _safe_float(depths.max()) if depths is not None else None,
+             len(df), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+
+
+def get_1ft_checkpoints(job_key: str) -> dict[str, dict]:
+    """Return {asset_id: journal row} for completed wells of a pull job.
+
+    Each row's "spooled" is True when the well's spool file exists (False
+    for journal-only checkpoints, or a spool that has gone missing).
+    """
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT * FROM pull_1ft_checkpoints WHERE job_key = ?",
+            (job_key,),
+        ).fetchall()
+    return {
+        r["asset_id"]: {**dict(r),
+                        "spooled": os.path.exists(_checkpoint_1ft_path(job_key, r["asset_id"]))}
+        for r in rows
+    }
+
+
+def load_1ft_checkpoint(job_key: str, asset_id: str) -> pd.DataFrame:
+    """Load a completed well's spooled 1ft records."""
+    return pd.read_parquet(_checkpoint_1ft_path(job_key, asset_id))
+
+
+def clear_1ft_checkpoints(job_key: str):
+    """Drop a pull job's journal and spool files (after success or on restart)."""
+    with connection() as conn:
+        rows = conn.execute(
+            "SELECT asset_id FROM pull_1ft_checkpoints WHERE job_key = ?",
+            (job_key,),
+        ).fetchall()
+        conn.execute("DELETE FROM pull_1ft_checkpoints WHERE job_key = ?",
+                     (job_key,))
+    for r in rows:
+        path = _checkpoint_1ft_path(job_key, r["asset_id"])
+        if os.path.exists(path):
+            os.remove(path)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -1214,51 +2021,194 @@ def has_1ft_data(section_name: str, mode: str = "lateral",
 def save_rop_curves_per_run(section_name: str, df: pd.DataFrame,
                              mode: str = "lateral", run_id: int | None = None):
     """Save per-run ROP curves as Parquet, scoped by run_id."""
-    rid = _resolve_run_id(run_id)
-    suffix = "_vertical" if mode == "vertical" else ""
-    path = _parquet_path(f"{_run_prefix(rid)}rop_curves_per_run_{section_name}{suffix}")
-    df.to_parquet(path, index=False, compression="snappy")
-    print(f"  Parquet: Saved {len(df)} per-run curve rows to {os.path.basename(path)}")
+    path = _save_partition("rop_curves_per_run", section_name, mode,
+                           _resolve_run_id(run_id), df)
+    print(f"  Parquet: Saved {len(df)} per-run curve rows to {os.path.relpath(path, DATA_DIR)}")
 
 
 def save_rop_curves_by_group(section_name: str, df: pd.DataFrame,
                               mode: str = "lateral", run_id: int | None = None):
     """Save group-level P10/P50/P90 curves as Parquet, scoped by run_id."""
-    rid = _resolve_run_id(run_id)
+    path = _save_partition("rop_curves_by_group", section_name, mode,
+                           _resolve_run_id(run_id), df)
+    print(f"  Parquet: Saved {len(df)} group curve rows to {os.path.relpath(path, DATA_DIR)}")
+
+
+def find_rop_curves(section_name: str, kind: str = "by_group", mode: str = "lateral",
+                    run_id: int | None = None) -> str | None:
+    """Path of a section's saved ROP curves (dataset partition, else flat file), or None.
+
+    kind is "per_run" or "by_group".
+    """
     suffix = "_vertical" if mode == "vertical" else ""
-    path = _parquet_path(f"{_run_prefix(rid)}rop_curves_by_group_{section_name}{suffix}")
-    df.to_parquet(path, index=False, compression="snappy")
-    print(f"  Parquet: Saved {len(df)} group curve rows to {os.path.basename(path)}")
+    return _find_section_parquet(f"rop_curves_{kind}", f"rop_curves_{kind}_{section_name}{suffix}",
+                                 section_name, mode, run_id)
 
 
 def load_rop_curves_per_run(section_name: str, mode: str = "lateral",
                              columns: list[str] | None = None,
                              run_id: int | None = None) -> pd.DataFrame:
     """Load per-run ROP curves, scoped by run_id."""
-    rid = _resolve_run_id(run_id)
-    suffix = "_vertical" if mode == "vertical" else ""
-    path = _parquet_path(f"{_run_prefix(rid)}rop_curves_per_run_{section_name}{suffix}")
-    if not os.path.exists(path):
-        legacy = _parquet_path(f"rop_curves_per_run_{section_name}{suffix}")
-        if os.path.exists(legacy):
-            return pd.read_parquet(legacy, columns=columns)
+    path = find_rop_curves(section_name, "per_run", mode, run_id)
+    if path is None:
         return pd.DataFrame()
-    return pd.read_parquet(path, columns=columns)
+    return _read_section_parquet(path, columns)
 
 
 def load_rop_curves_by_group(section_name: str, mode: str = "lateral",
                               columns: list[str] | None = None,
                               run_id: int | None = None) -> pd.DataFrame:
     """Load group-level ROP curves, scoped by run_id."""
-    rid = _resolve_run_id(run_id)
-    suffix = "_vertical" if mode == "vertical" else ""
-    path = _parquet_path(f"{_run_prefix(rid)}rop_curves_by_group_{section_name}{suffix}")
-    if not os.path.exists(path):
-        legacy = _parquet_path(f"rop_curves_by_group_{section_name}{suffix}")
-        if os.path.exists(legacy):
-            return pd.read_parquet(legacy, columns=columns)
+    path = find_rop_curves(section_name, "by_group", mode, run_id)
+    if path is None:
         return pd.DataFrame()
-    return pd.read_parquet(path, columns=columns)
+    return _read_section_parquet(path, columns)
+
+
+# ═══════════════════════════════════════════════════════════════════
+#  PARQUET - DATASET QUERIES & MAINTENANCE
+# ═══════════════════════════════════════════════════════════════════
+
+def _dataset_files(kind: str) -> list[str]:
+    """The current (newest) part of every partition of one dataset kind."""
+    if kind not in DATASET_KINDS:
+        raise ValueError(f"Unknown dataset kind: {kind}")
+    root = os.path.join(DATASET_DIR, f"kind={kind}")
+    files = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames.sort()
+        files.extend(_partition_parts(dirpath)[-1:])
+    return files
+
+
+def scan_dataset(kind: str, filters: list | None = None,
+                 columns: list[str] | None = None,
+                 run_id: int | None = None, section_name: str | None = None,
+                 mode: str | None = None) -> pd.DataFrame:
+    """Rows of one dataset kind across runs / sections, in one filtered scan.
+
+    Args:
+        kind: "rop_1ft", "rop_curves_per_run" or "rop_curves_by_group"
+        filters: pyarrow row filters as for load_1ft_data, on data or
+            partition columns, e.g. [("equiv_bha_key", "==", key)]
+        columns: Columns to return (data and/or partition columns);
+            default all, with run_id, section and mode last
+        run_id / section_name / mode: Shorthand partition filters
+            (None = all); only matching partitions are opened
+
+    Flat pre-dataset files are not included (see migrate_flat_parquet).
+    """
+    files = _dataset_files(kind)
+    if not files:
+        return pd.DataFrame(columns=columns or [])
+    root = os.path.join(DATASET_DIR, f"kind={kind}")
+    schema = _unified_schema(files)
+    for field in _DATASET_PARTITIONING.schema:
+        if field.name not in schema.names:
+            schema = schema.append(field)
+    dataset = ds.dataset(files, schema=schema, format="parquet",
+                         partitioning=_DATASET_PARTITIONING, partition_base_dir=root)
+    expr = pq.filters_to_expression(filters) if filters else None
+    for name, value in (("run_id", run_id), ("section", section_name), ("mode", mode)):
+        if value is not None:
+            cond = ds.field(name) == value
+            expr = cond if expr is None else expr & cond
+    df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+    if "run_id" in df.columns:
+        df["run_id"] = df["run_id"].astype("Int64")  # NA = unscoped partition
+    return df
+
+
+def compact_dataset(kind: str | None = None) -> int:
+    """Remove superseded parts and stale temp files. Returns files removed.
+
+    Readers only use a partition's newest part, so any older part is dead
+    weight; temp parts untouched for PARQUET_STALE_TMP_HOURS belong to
+    writers that crashed (younger ones may still be streaming).
+    """
+    removed = 0
+    stale_before = time.time() - PARQUET_STALE_TMP_HOURS * 3600
+    for k in ([kind] if kind else DATASET_KINDS):
+        root = os.path.join(DATASET_DIR, f"kind={k}")
+        for dirpath, _, names in os.walk(root):
+            parts = _partition_parts(dirpath)
+            stale = [os.path.join(dirpath, n) for n in names
+                     if n.startswith(".part-") and n.endswith(".tmp")
+                     and os.path.getmtime(os.path.join(dirpath, n)) < stale_before]
+            for path in parts[:-1] + stale:
+                os.remove(path)
+                removed += 1
+    if removed:
+        print(f"  Parquet: Compacted dataset ({removed} superseded / stale files removed)")
+    return removed
+
+
+def prune_dataset(keep_runs: int = PARQUET_KEEP_RUNS, kind: str | None = None) -> list[int]:
+    """Retention: delete the data of run_ids no analysis_runs row references.
+
+    Runs are reused per target well (get_or_create_run), so an old run_id
+    can still back /results and what-if TTD; every run_id in analysis_runs
+    is kept whatever its age. Of the unreferenced ones, the keep_runs
+    highest of each kind are kept too. Unscoped (run_id-less) partitions
+    are kept. Returns the pruned run_ids.
+    """
+    with connection() as conn:
+        referenced = {row[0] for row in conn.execute("SELECT id FROM analysis_runs")}
+    pruned = set()
+    for k in ([kind] if kind else DATASET_KINDS):
+        root = os.path.join(DATASET_DIR, f"kind={k}")
+        if not os.path.isdir(root):
+            continue
+        runs = sorted(int(d.split("=", 1)[1]) for d in os.listdir(root)
+                      if d.startswith("run_id=") and d.split("=", 1)[1].isdigit())
+        orphans = [rid for rid in runs if rid not in referenced]
+        for rid in orphans[:max(len(orphans) - keep_runs, 0)]:
+            shutil.rmtree(os.path.join(root, f"run_id={rid}"))
+            pruned.add(rid)
+    if pruned:
+        print(f"  Parquet: Pruned {len(pruned)} runs with no analysis_runs record "
+              f"(kept newest {keep_runs} of those)")
+    return sorted(pruned)
+
+
+_FLAT_PARQUET_RE = re.compile(
+    r"^(?:run(\d+)_)?(rop_1ft|rop_curves_per_run|rop_curves_by_group)_(.+?)(_vertical)?\.parquet$")
+
+
+def migrate_flat_parquet() -> int:
+    """Move flat per-section Parquet files into the dataset. Returns files moved.
+
+    run12_rop_curves_by_group_Lateral_vertical.parquet becomes a part of
+    kind=rop_curves_by_group/run_id=12/section=Lateral/mode=vertical (a
+    flat file without a run prefix goes to the unscoped run_id partition).
+    A partition that already has data keeps it and the flat file stays.
+    """
+    moved = 0
+    for name in sorted(os.listdir(DATA_DIR)):
+        m = _FLAT_PARQUET_RE.match(name)
+        if not m:
+            continue
+        rid, kind, section_name, vertical = m.groups()
+        part_dir = _partition_dir(kind, int(rid) if rid else None, section_name,
+                                  "vertical" if vertical else "lateral")
+        if _partition_parts(part_dir):
+            continue
+        os.replace(os.path.join(DATA_DIR, name), _new_part_path(part_dir))
+        moved += 1
+    if moved:
+        print(f"  Parquet: Moved {moved} flat files into the dataset")
+    return moved
+
+
+def maintain_dataset(keep_runs: int = 0):
+    """migrate_flat_parquet(), compact_dataset() and, if keep_runs > 0, prune_dataset().
+
+    Pruning is opt-in: with the default keep_runs=0 no run data is deleted.
+    """
+    migrate_flat_parquet()
+    compact_dataset()
+    if keep_runs > 0:
+        prune_dataset(keep_runs)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -1312,10 +2262,9 @@ def export_csv(data, name: str, quiet: bool = False):
                 w = csv.writer(f)
                 w.writerows(data)
     elif isinstance(data, str):
-        conn = _get_conn()
-        df = pd.read_sql_query(f"SELECT * FROM {data}", conn)
+        with connection() as conn:
+            df = pd.read_sql_query(f"SELECT * FROM {data}", conn)
         df.to_csv(path, index=False)
-        conn.close()
     else:
         raise TypeError(f"Cannot export {type(data)}")
 
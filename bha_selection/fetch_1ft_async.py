@@ -0,0 +1,195 @@
+"""Async (asyncio + httpx) fetch backend for wits.summary-1ft.
+
+The threaded backend in pull_1ft_for_runs.py pages each well serially with
+skip/limit, so a 40k-record well costs 4 sequential round trips while the
+worker thread idles on I/O. This backend splits every requested depth range
+into depth windows of ~one page each and fetches all windows of all wells
+concurrently, bounded by one global adaptive (AIMD) limiter.
+
+Each page is parsed (e.g. flattened to columns) as soon as it arrives and
+the raw JSON is dropped; when all ranges of a well are done, on_well() is
+called immediately so the caller can process that well while the others
+are still downloading. on_well() runs in a worker thread (one well at a
+time), so its CPU / disk work does not stall the fetches, and a failure in
+one well -- fetching or on_well() -- is logged and does not stop the rest.
+
+Retry semantics match the corva_client session: up to 3 retries on
+429/500/502/503/504 and connection errors, exponential backoff
+(backoff_factor=1), honouring Retry-After when the server sends it.
+
+Usage (from pull_1ft_for_runs.py):
+    python pull_1ft_for_runs.py [bha_csv] --fetch async
+"""
+
+import asyncio
+import json
+import math
+
+import httpx
+
+from adaptive_limiter import AsyncAdaptiveLimiter
+from corva_client import DATA_API, HEADERS
+
+ENDPOINT_1FT = "/api/v1/data/corva/wits.summary-1ft/"
+
+# --- Retry (mirrors the urllib3 Retry in corva_client) ---
+RETRY_TOTAL = 3
+BACKOFF_FACTOR = 1
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_CONCURRENCY = 20     # starting limit on in-flight page requests
+MAX_CONCURRENCY = 48         # ceiling the adaptive limiter may ramp up to
+REQUEST_TIMEOUT = 90
+
+
+async def _get_page(client, limiter, params, stats):
+    """GET one page with retry/backoff. Returns parsed JSON or None on failure."""
+    for attempt in range(RETRY_TOTAL + 1):
+        retry_after = None
+        async with limiter.slot() as slot:
+            try:
+                r = await client.get(ENDPOINT_1FT, params=params)
+                stats["requests"] += 1
+                slot.observe(r.status_code)
+                if r.status_code not in RETRY_STATUSES:
+                    r.raise_for_status()
+                    return r.json()
+                retry_after = r.headers.get("Retry-After")
+            except (httpx.HTTPStatusError, ValueError):
+                # Non-retryable status or an undecodable body
+                stats["failed"] += 1
+                return None
+            except httpx.TransportError:
+                slot.throttle()
+        if attempt == RETRY_TOTAL:
+            break
+        stats["retries"] += 1
+        try:
+            wait = float(retry_after) if retry_after else None
+        except ValueError:
+            wait = None
+        if wait is None:
+            wait = BACKOFF_FACTOR * (2 ** attempt)
+        await asyncio.sleep(wait)
+    stats["failed"] += 1
+    return None
+
+
+async def _fetch_window(client, limiter, asset_id, lo, hi, last, fields,
+                        page_size, parse_page, stats):
+    """Page through one depth window. Returns (parsed chunks, complete)."""
+    upper = "$lte" if last else "$lt"
+    query = {
+        "asset_id": int(asset_id),
+        "data.hole_depth": {"$gte": lo, upper: hi},
+    }
+    chunks = []
+    skip = 0
+    while True:
+        records = await _get_page(client, limiter, {
+            "limit": page_size,
+            "skip": skip,
+            "sort": json.dumps({"data.hole_depth": 1}),
+            "query": json.dumps(query),
+            "fields": fields,
+        }, stats)
+        if records is None:
+            return chunks, False
+        if not records:
+            break
+        chunks.append(parse_page(records))
+        if len(records) < page_size:
+            break
+        skip += page_size
+    return chunks, True
+
+
+def _depth_windows(lo, hi, window_ft):
+    """Split [lo, hi] into consecutive windows of at most window_ft."""
+    n = max(1, math.ceil((hi - lo) / window_ft))
+    step = (hi - lo) / n
+    bounds = [lo + i * step for i in range(n)] + [hi]
+    return [(bounds[i], bounds[i + 1], i == n - 1) for i in range(n)]
+
+
+async def _fetch_range(client, limiter, asset_id, lo, hi, fields, page_size,
+                       window_ft, parse_page, stats):
+    windows = _depth_windows(lo, hi, window_ft)
+    results = await asyncio.gather(*[
+        _fetch_window(client, limiter, asset_id, w_lo, w_hi, last, fields,
+                      page_size, parse_page, stats)
+        for w_lo, w_hi, last in windows
+    ])
+    chunks = [c for window_chunks, _ in results for c in window_chunks]
+    complete = all(ok for _, ok in results)
+    return chunks, complete
+
+
+async def _fetch_well(client, limiter, asset_id, ranges, fields, page_size,
+                      window_ft, parse_page, on_well, on_well_lock, stats):
+    """Fetch one well's ranges and hand them to on_well; never raises."""
+    try:
+        results = await asyncio.gather(*[
+            _fetch_range(client, limiter, asset_id, lo, hi, fields, page_size,
+                         window_ft, parse_page, stats)
+            for lo, hi in ranges
+        ])
+    except Exception as e:
+        print(f"  ERROR fetching well {asset_id}: {e}")
+        results = [([], False) for _ in ranges]
+    try:
+        async with on_well_lock:
+            await asyncio.to_thread(on_well, asset_id, [
+                (lo, hi, chunks, complete)
+                for (lo, hi), (chunks, complete) in zip(ranges, results)
+            ])
+    except Exception as e:
+        print(f"  ERROR processing well {asset_id}: {e}")
+
+
+async def _fetch_all(ranges_by_well, fields, page_size, window_ft,
+                     limiter, parse_page, on_well, stats):
+    limits = httpx.Limits(max_connections=limiter.max_limit,
+                          max_keepalive_connections=limiter.max_limit)
+    on_well_lock = asyncio.Lock()
+    async with httpx.AsyncClient(base_url=DATA_API, headers=HEADERS,
+                                 timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        await asyncio.gather(*[
+            _fetch_well(client, limiter, aid, ranges, fields, page_size,
+                        window_ft, parse_page, on_well, on_well_lock, stats)
+            for aid, ranges in ranges_by_well.items()
+        ], return_exceptions=True)
+
+
+def fetch_1ft_ranges(ranges_by_well, fields, parse_page, on_well,
+                     page_size=10000, window_ft=None, limiter=None):
+    """Fetch wits.summary-1ft depth ranges for many wells concurrently.
+
+    Args:
+        ranges_by_well: {asset_id: [(min_depth, max_depth), ...]}
+        fields: Comma-separated fields projection for the API
+        parse_page: Callable applied to each page's raw records (list of
+            dicts); its return value is what on_well receives
+        on_well: Called as on_well(asset_id, [(lo, hi, chunks, complete), ...])
+            in a worker thread, one call at a time, as soon as all ranges
+            of a well finish. chunks are parse_page() results in depth
+            order; complete is False if any page of that range failed after
+            retries (or the well's fetch raised). Exceptions are logged per
+            well.
+        page_size: Records per request (limit)
+        window_ft: Depth-window width; defaults to page_size (1 record/ft)
+        limiter: AsyncAdaptiveLimiter shared by every page request (one is
+            created from DEFAULT_CONCURRENCY / MAX_CONCURRENCY if omitted)
+
+    Returns stats dict: requests, retries, failed.
+    """
+    stats = {"requests": 0, "retries": 0, "failed": 0}
+    if not ranges_by_well:
+        return stats
+    if limiter is None:
+        limiter = AsyncAdaptiveLimiter(initial=DEFAULT_CONCURRENCY,
+                                       max_limit=MAX_CONCURRENCY)
+    asyncio.run(_fetch_all(ranges_by_well, fields, page_size,
+                           window_ft or page_size, limiter,
+                           parse_page, on_well, stats))
+    return stats
@@ -258,20 +258,12 @@ def main():
         # DB fallback when --formations CSV not provided
         try:
             asset_ids = {str(r.get("asset_id", "")).strip() for r in all_bhas if r.get("asset_id")}
-            for aid in asset_ids:
-                tops = db.get_formation_tops(aid)
-                if tops:
-                    fm_tops_by_asset[aid] = [
-                        {
-                            "formation_name": t.get("formation_name", ""),
-                            "md_top": t.get("md_top"),
-                            "tvd_top": t.get("tvd_top"),
-                            "md_thickness": t.get("md_thickness"),
-                            "tvd_thickness": t.get("tvd_thickness"),
-                        }
-                        for t in tops
-                    ]
-                    fm_tops_by_asset[aid].sort(key=lambda x: x["md_top"] or 0)
+            tops = db.get_formation_tops_df(sorted(asset_ids), columns=[
+                "asset_id", "formation_name", "md_top", "tvd_top", "md_thickness", "tvd_thickness"])
+            tops = tops.astype(object).where(tops.notna(), None)
+            for aid, group in tops.groupby("asset_id", sort=False):
+                fm_tops_by_asset[aid] = group.drop(columns="asset_id").to_dict("records")
+                fm_tops_by_asset[aid].sort(key=lambda x: x["md_top"] or 0)
         except Exception as e:
             print(f"  DB formation tops fallback warning: {e}")
 
@@ -352,13 +344,14 @@ def main():
                     bha_copy["hole_size_filter"] = hs
                     section_bhas.append(bha_copy)
                 # Prevent duplicate accumulation across repeated runs for
-                # the same section within the same analysis run.
-                with db.connection() as conn:
+                # the same section within the same analysis run; the delete
+                # and insert commit together.
+                with db.transaction() as conn:
                     conn.execute(
                         "DELETE FROM bha_runs WHERE run_id = ? AND section_name = ?",
                         (target_run_id, safe_name),
                     )
-                db.save_bha_runs(target_run_id, section_bhas, replace=False)
+                    db.save_bha_runs(target_run_id, section_bhas, replace=False)
         except Exception as e:
             print(f"    DB save warning: {e}")
 
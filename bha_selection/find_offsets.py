@@ -2,18 +2,15 @@
 
 Uses the well_cache dataset with geospatial queries for fast lookups.
 """
-import requests
-import json
 import math
-from dotenv import load_dotenv
-import os
 
-load_dotenv()
+import corva_client
 
-API_KEY = os.getenv("CORVA_API_KEY")
-DATA_API = "https://data.corva.ai"
-PLATFORM_API = "https://api.corva.ai"
-HEADERS = {"Authorization": f"API {API_KEY}"}
+WELL_CACHE_FIELDS = (
+    "asset_id,well_id,company_id,location,"
+    "corva#data-well-sections,corva#wits,"
+    "corva#data-drillstring,corva#data-mud"
+)
 
 
 def haversine_miles(lat1, lon1, lat2, lon2):
@@ -28,15 +25,8 @@ def haversine_miles(lat1, lon1, lat2, lon2):
 
 def get_well_cache(asset_id):
     """Get well details from well_cache dataset."""
-    r = requests.get(
-        f"{DATA_API}/api/v1/data/corva/well_cache/",
-        headers=HEADERS,
-        params={
-            "limit": 1,
-            "sort": json.dumps({"timestamp": -1}),
-            "query": json.dumps({"asset_id": asset_id}),
-        },
-    )
+    r = corva_client.get_data("well_cache", {"asset_id": asset_id},
+                              sort={"timestamp": -1}, limit=1)
     r.raise_for_status()
     data = r.json()
     return data[0] if data else None
@@ -45,25 +35,11 @@ def get_well_cache(asset_id):
 def get_company_asset_ids(company_id):
     """Get all well asset IDs for a company via the v2 Assets API."""
     all_ids = []
-    page = 1
-    while True:
-        r = requests.get(
-            f"{PLATFORM_API}/v2/assets",
-            headers=HEADERS,
-            params={"limit": 100, "page": page, "types[]": "well", "company_id": company_id},
-        )
-        if r.status_code != 200:
-            print(f"  Assets API error: {r.status_code}")
-            break
-        data = r.json().get("data", [])
-        if not data:
-            break
+    for page, data in corva_client.iter_asset_pages(
+            {"types[]": "well", "company_id": company_id}):
         all_ids.extend(int(a["id"]) for a in data)
-        if len(data) < 100:
-            break
-        page += 1
-        if page % 10 == 0:
-            print(f"  ... {len(all_ids)} asset IDs so far (page {page})")
+        if (page + 1) % 10 == 0:
+            print(f"  ... {len(all_ids)} asset IDs so far (page {page + 1})")
     return all_ids
 
 
@@ -80,20 +56,9 @@ def get_company_wells(company_id):
     batch_size = 50
     for i in range(0, len(asset_ids), batch_size):
         batch = asset_ids[i: i + batch_size]
-        r = requests.get(
-            f"{DATA_API}/api/v1/data/corva/well_cache/",
-            headers=HEADERS,
-            params={
-                "limit": batch_size,
-                "sort": json.dumps({"timestamp": -1}),
-                "query": json.dumps({"asset_id": {"$in": batch}}),
-                "fields": (
-                    "asset_id,well_id,company_id,location,"
-                    "corva#data-well-sections,corva#wits,"
-                    "corva#data-drillstring,corva#data-mud"
-                ),
-            },
-        )
+        r = corva_client.get_data("well_cache", {"asset_id": {"$in": batch}},
+                                  sort={"timestamp": -1}, fields=WELL_CACHE_FIELDS,
+                                  limit=batch_size)
         if r.status_code == 200:
             results = r.json()
             all_wells.extend(results)
@@ -123,20 +88,8 @@ def find_nearby_wells_geo(target_lat, target_lon, radius_miles, company_id, excl
     }
 
     print(f"  Trying geospatial query (company_id={company_id}, radius={radius_miles} mi)...")
-    r = requests.get(
-        f"{DATA_API}/api/v1/data/corva/well_cache/",
-        headers=HEADERS,
-        params={
-            "limit": 500,
-            "sort": json.dumps({"timestamp": -1}),
-            "query": json.dumps(geo_query),
-            "fields": (
-                "asset_id,well_id,company_id,location,"
-                "corva#data-well-sections,corva#wits,"
-                "corva#data-drillstring,corva#data-mud"
-            ),
-        },
-    )
+    r = corva_client.get_data("well_cache", geo_query, sort={"timestamp": -1},
+                              fields=WELL_CACHE_FIELDS, limit=500)
 
     if r.status_code == 200:
         wells = r.json()
@@ -162,20 +115,8 @@ def find_nearby_wells_fallback(target_lat, target_lon, radius_miles, company_id,
     }
 
     print(f"  Using bounding box query...")
-    r = requests.get(
-        f"{DATA_API}/api/v1/data/corva/well_cache/",
-        headers=HEADERS,
-        params={
-            "limit": 500,
-            "sort": json.dumps({"timestamp": -1}),
-            "query": json.dumps(bbox_query),
-            "fields": (
-                "asset_id,well_id,company_id,location,"
-                "corva#data-well-sections,corva#wits,"
-                "corva#data-drillstring,corva#data-mud"
-            ),
-        },
-    )
+    r = corva_client.get_data("well_cache", bbox_query, sort={"timestamp": -1},
+                              fields=WELL_CACHE_FIELDS, limit=500)
 
     if r.status_code == 200:
         wells = r.json()
@@ -310,3 +251,4 @@ if __name__ == "__main__":
     max_offsets = int(sys.argv[3]) if len(sys.argv) > 3 else 500
 
     offsets = find_offsets(target_asset_id=asset_id, radius_miles=radius, max_results=max_offsets)
+    corva_client.print_metrics()
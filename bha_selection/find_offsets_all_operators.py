@@ -8,7 +8,6 @@ Usage:
 import csv
 import requests
 import json
-import math
 import sys
 import time
 from datetime import datetime, timezone
@@ -17,6 +16,8 @@ import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import db
+from adaptive_limiter import AdaptiveLimiter
+from geo import haversine_miles
 
 load_dotenv()
 
@@ -25,14 +26,10 @@ DATA_API = "https://data.corva.ai"
 PLATFORM_API = "https://api.corva.ai"
 HEADERS = {"Authorization": f"API {API_KEY}"}
 
+FETCH_WORKERS = 8          # starting concurrency for well_cache batches
+FETCH_WORKERS_MAX = 32     # ceiling for the adaptive limiter / thread pool
 
-def haversine_miles(lat1, lon1, lat2, lon2):
-    R = 3958.8
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    return 2 * R * math.asin(math.sqrt(a))
+_limiter = AdaptiveLimiter(initial=FETCH_WORKERS, max_limit=FETCH_WORKERS_MAX)
 
 
 def epoch_to_date(epoch):
@@ -108,17 +105,19 @@ def fetch_well_cache_batch(batch):
         "corva#data-casing"
     )
     try:
-        r = requests.get(
-            f"{DATA_API}/api/v1/data/corva/well_cache/",
-            headers=HEADERS,
-            params={
-                "limit": len(batch),
-                "sort": json.dumps({"timestamp": -1}),
-                "query": json.dumps({"asset_id": {"$in": batch}}),
-                "fields": fields,
-            },
-            timeout=30,
-        )
+        with _limiter.slot() as slot:
+            r = requests.get(
+                f"{DATA_API}/api/v1/data/corva/well_cache/",
+                headers=HEADERS,
+                params={
+                    "limit": len(batch),
+                    "sort": json.dumps({"timestamp": -1}),
+                    "query": json.dumps({"asset_id": {"$in": batch}}),
+                    "fields": fields,
+                },
+                timeout=30,
+            )
+            slot.observe(r.status_code)
         if r.status_code == 200:
             return r.json()
     except Exception:
@@ -140,7 +139,7 @@ def _fetch_and_extract_missing(asset_ids, target_lat, target_lon):
     start = time.time()
 
     completed = 0
-    with ThreadPoolExecutor(max_workers=8) as executor:
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS_MAX) as executor:
         futures = {executor.submit(fetch_well_cache_batch, batch): i
                    for i, batch in enumerate(batches)}
         for future in as_completed(futures):
@@ -155,37 +154,37 @@ def _fetch_and_extract_missing(asset_ids, target_lat, target_lon):
                 rate = completed / elapsed if elapsed > 0 else 0
                 eta = (total_batches - completed) / rate if rate > 0 else 0
                 print(f"    {completed}/{total_batches} batches, "
-                      f"{len(all_wells)} wells extracted, ETA: {eta:.0f}s")
+                      f"{len(all_wells)} wells extracted, ETA: {eta:.0f}s | "
+                      f"{_limiter.status()}")
 
     elapsed = time.time() - start
-    print(f"  Fetched & extracted {len(all_wells)} wells in {elapsed:.1f}s")
+    print(f"  Fetched & extracted {len(all_wells)} wells in {elapsed:.1f}s "
+          f"({_limiter.status()})")
     return all_wells
 
 
+def _nearby_cached(target_lat, target_lon, radius_miles):
+    """Cached wells within the radius, nearest first, distance rounded to 0.1 mi."""
+    nearby = db.get_cached_wells_near(target_lat, target_lon, radius_miles)
+    for rec in nearby:
+        rec["distance_miles"] = round(rec["distance_miles"], 1)
+    return nearby
+
+
 def get_nearby_wells(target_lat, target_lon, radius_miles):
-    """Get well info near the target, using SQLite bounding-box query.
+    """Get well info near the target, using the SQLite spatial index.
 
     Fast path: loads only wells within the search radius from the SQLite
-    cache (indexed by lat/lon). If the cache has wells, this skips ALL
-    Corva API calls -- just a SQLite query + haversine math.
+    cache (R*Tree over lat/lon, vectorized haversine). If the cache has
+    wells, this skips ALL Corva API calls -- just one SQLite query.
 
     If the cache is empty, falls back to the full API pull (get all
     asset IDs, fetch well_cache from Corva, save to SQLite).
     """
-    # Fast path: bounding-box query on SQLite cache
-    nearby = db.get_cached_wells_near(target_lat, target_lon, radius_miles)
+    # Fast path: spatial index query on SQLite cache
+    result = _nearby_cached(target_lat, target_lon, radius_miles)
 
-    if nearby:
-        # Recalculate exact distance from current target well
-        result = []
-        for rec in nearby:
-            lat = rec.get("lat")
-            lon = rec.get("lon")
-            if lat is not None and lon is not None:
-                rec["distance_miles"] = round(
-                    haversine_miles(target_lat, target_lon, float(lat), float(lon)), 1
-                )
-                result.append(rec)
+    if result:
         print(f"  SQLite fast path: {len(result)} wells within ~{radius_miles} mi "
               f"(from {db.count_well_cache_records()} total cached)")
         return result
@@ -210,16 +209,7 @@ def _full_api_pull(target_lat, target_lon, radius_miles):
             db.save_well_cache_records(new_infos)
 
     # Now use the fast path
-    nearby = db.get_cached_wells_near(target_lat, target_lon, radius_miles)
-    result = []
-    for rec in nearby:
-        lat = rec.get("lat")
-        lon = rec.get("lon")
-        if lat is not None and lon is not None:
-            rec["distance_miles"] = round(
-                haversine_miles(target_lat, target_lon, float(lat), float(lon)), 1
-            )
-            result.append(rec)
+    result = _nearby_cached(target_lat, target_lon, radius_miles)
 
     print(f"  Total nearby well records: {len(result)}")
     return result
@@ -339,7 +329,7 @@ def find_offsets_all_operators(target_asset_id, radius_miles=100, max_results=50
     print(f"  Rig:              {target.get('rig', {}).get('name', 'N/A')}")
     print(f"  Location:         lat={target_lat}, lon={target_lon}")
 
-    # Step 2: Get nearby wells (SQLite bounding-box, or full API pull if cache empty)
+    # Step 2: Get nearby wells (SQLite spatial index, or full API pull if cache empty)
     print(f"\nStep 2: Loading nearby wells...")
     t0 = time.time()
     all_infos = get_nearby_wells(target_lat, target_lon, radius_miles)
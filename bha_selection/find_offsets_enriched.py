@@ -4,25 +4,17 @@ Usage:
     python find_offsets_enriched.py <asset_id> [radius_miles] [max_results]
     python find_offsets_enriched.py 18840303 500 500
     python find_offsets_enriched.py 18840303 500 500 --export-csv
+    python find_offsets_enriched.py 18840303 500 500 --refresh-cache   # re-download cached well_cache responses
 """
 import csv
-import requests
-import json
 import math
+import os
 import sys
 from datetime import datetime, timezone
-from dotenv import load_dotenv
-import os
 
+import corva_client
 import db
 
-load_dotenv()
-
-API_KEY = os.getenv("CORVA_API_KEY")
-DATA_API = "https://data.corva.ai"
-PLATFORM_API = "https://api.corva.ai"
-HEADERS = {"Authorization": f"API {API_KEY}"}
-
 
 def haversine_miles(lat1, lon1, lat2, lon2):
     """Calculate distance between two lat/lon points in miles."""
@@ -46,15 +38,8 @@ def epoch_to_date(epoch):
 
 def get_well_cache(asset_id):
     """Get full well_cache record for a single asset."""
-    r = requests.get(
-        f"{DATA_API}/api/v1/data/corva/well_cache/",
-        headers=HEADERS,
-        params={
-            "limit": 1,
-            "sort": json.dumps({"timestamp": -1}),
-            "query": json.dumps({"asset_id": asset_id}),
-        },
-    )
+    r = corva_client.get_data("well_cache", {"asset_id": asset_id},
+                              sort={"timestamp": -1}, limit=1, cache=True)
     r.raise_for_status()
     data = r.json()
     return data[0] if data else None
@@ -63,22 +48,9 @@ def get_well_cache(asset_id):
 def get_company_asset_ids(company_id):
     """Get all well asset IDs for a company via v2 Assets API."""
     all_ids = []
-    page = 1
-    while True:
-        r = requests.get(
-            f"{PLATFORM_API}/v2/assets",
-            headers=HEADERS,
-            params={"limit": 100, "page": page, "types[]": "well", "company_id": company_id},
-        )
-        if r.status_code != 200:
-            break
-        data = r.json().get("data", [])
-        if not data:
-            break
+    for _, data in corva_client.iter_asset_pages(
+            {"types[]": "well", "company_id": company_id}):
         all_ids.extend(int(a["id"]) for a in data)
-        if len(data) < 100:
-            break
-        page += 1
     return all_ids
 
 
@@ -95,16 +67,9 @@ def get_well_cache_batch(asset_ids):
     )
     for i in range(0, len(asset_ids), batch_size):
         batch = asset_ids[i: i + batch_size]
-        r = requests.get(
-            f"{DATA_API}/api/v1/data/corva/well_cache/",
-            headers=HEADERS,
-            params={
-                "limit": batch_size,
-                "sort": json.dumps({"timestamp": -1}),
-                "query": json.dumps({"asset_id": {"$in": batch}}),
-                "fields": fields,
-            },
-        )
+        r = corva_client.get_data("well_cache", {"asset_id": {"$in": batch}},
+                                  sort={"timestamp": -1}, fields=fields,
+                                  limit=batch_size, cache=True)
         if r.status_code == 200:
             all_wells.extend(r.json())
         if (i // batch_size + 1) % 5 == 0:
@@ -365,7 +330,12 @@ def find_offsets_enriched(target_asset_id, radius_miles=500, max_results=500,
 
 if __name__ == "__main__":
     export_csv_flag = "--export-csv" in sys.argv
-    sys.argv = [a for a in sys.argv if a != "--export-csv"]
+    sys.argv = corva_client.apply_cache_flags([a for a in sys.argv if a != "--export-csv"])
+    if corva_client.CACHE_MODE == "offline":
+        # The company well list (v2 assets) is never cached, so this can't work offline
+        print("ERROR: --offline is not supported here: the company well list is always "
+              "fetched live. Use --refresh-cache or the default cache mode.")
+        sys.exit(1)
 
     # Parse --spud-after YYYY-MM-DD
     spud_after = None
@@ -383,10 +353,15 @@ if __name__ == "__main__":
     radius = float(filtered_args[1]) if len(filtered_args) > 1 else 500
     max_results = int(filtered_args[2]) if len(filtered_args) > 2 else 500
 
-    find_offsets_enriched(
-        target_asset_id=asset_id,
-        radius_miles=radius,
-        max_results=max_results,
-        export_csv_flag=export_csv_flag,
-        spud_after=spud_after,
-    )
+    try:
+        find_offsets_enriched(
+            target_asset_id=asset_id,
+            radius_miles=radius,
+            max_results=max_results,
+            export_csv_flag=export_csv_flag,
+            spud_after=spud_after,
+        )
+    except corva_client.OfflineCacheMiss as e:
+        print(f"ERROR: offline cache miss: {e}")
+        sys.exit(1)
+    corva_client.print_metrics()
@@ -0,0 +1,119 @@
+"""Precomputed per-well formation boundaries for batched TVD lookups.
+
+map_foot_to_formation() in pull_1ft_for_runs.py scans a well's formation
+tops for every foot and recomputes each formation's bottom on every call.
+This module builds the boundary arrays once per well and maps a whole
+TVD column in a single np.searchsorted pass, with the same semantics:
+
+  - a formation spans [tvd_top, next tvd_top); the last formation ends at
+    tvd_top + tvd_thickness (or +1000 ft when the thickness is unknown)
+  - feet that fall in no interval are assigned to the last formation at
+    100% / segment 90
+  - feet with no TVD (or wells with no tops) are unmapped
+
+Tops lists are the dicts produced by load_formation_tops() /
+load_formation_tops_by_asset(), sorted by md_top.
+
+Usage:
+    index = build_formation_index(formation_tops_by_asset[asset_id])
+    names, pcts, segments = map_tvds_to_formations(index, tvd_array)
+"""
+
+import numpy as np
+
+# Default thickness assumed for the deepest formation when tvd_thickness is missing
+LAST_FORMATION_FALLBACK_FT = 1000
+
+
+def _as_float(value):
+    return np.nan if value is None else float(value)
+
+
+def build_formation_index(formation_tops):
+    """Build boundary arrays for one well's formation tops.
+
+    Returns a dict of NumPy arrays (names, tvd_top, tvd_bottom) plus a
+    tvd_monotonic flag, or None when the well has no tops.
+    """
+    if not formation_tops:
+        return None
+
+    names = np.array([t["formation_name"] for t in formation_tops], dtype=object)
+    tvd_top = np.array([_as_float(t.get("tvd_top")) for t in formation_tops])
+
+    # Bottom of each formation = top of the next one; the last one uses its
+    # own thickness or the fallback.
+    tvd_bottom = np.empty_like(tvd_top)
+    tvd_bottom[:-1] = tvd_top[1:]
+    last_thk = formation_tops[-1].get("tvd_thickness")
+    tvd_bottom[-1] = tvd_top[-1] + (
+        last_thk if last_thk is not None else LAST_FORMATION_FALLBACK_FT)
+
+    return {
+        "names": names,
+        "tvd_top": tvd_top,
+        "tvd_bottom": tvd_bottom,
+        # Tops sorted by MD are normally also sorted by TVD; when they are
+        # not, the lookup falls back to a first-match scan over formations.
+        "tvd_monotonic": bool(not np.isnan(tvd_top).any()
+                              and np.all(np.diff(tvd_top) >= 0)),
+    }
+
+
+def build_formation_indexes(formation_tops_by_asset):
+    """Build a formation index for every well in a tops-by-asset dict."""
+    indexes = {}
+    for aid, tops in (formation_tops_by_asset or {}).items():
+        index = build_formation_index(tops)
+        if index is not None:
+            indexes[aid] = index
+    return indexes
+
+
+def map_tvds_to_formations(index, tvds, segment_pct=10):
+    """Map an array of TVDs to (formation_name, formation_pct, segment).
+
+    Batched equivalent of map_foot_to_formation(). Returns three arrays of
+    len(tvds): names (object, None when unmapped), pct (float, NaN when
+    unmapped, rounded to 0.1) and segment (float, NaN when unmapped).
+    """
+    tvds = np.asarray(tvds, dtype=float)
+    n = len(tvds)
+    names = np.full(n, None, dtype=object)
+    pcts = np.full(n, np.nan)
+    segments = np.full(n, np.nan)
+    if index is None or n == 0:
+        return names, pcts, segments
+
+    tops = index["tvd_top"]
+    bottoms = index["tvd_bottom"]
+    has_tvd = ~np.isnan(tvds)
+
+    if index["tvd_monotonic"]:
+        # Intervals are contiguous: the candidate is the last top <= tvd
+        idx = np.searchsorted(tops, tvds, side="right") - 1
+        idx_c = np.clip(idx, 0, len(tops) - 1)
+        matched = has_tvd & (idx >= 0) & (tvds < bottoms[idx_c])
+    else:
+        inside = (tops[None, :] <= tvds[:, None]) & (tvds[:, None] < bottoms[None, :])
+        matched = inside.any(axis=1)
+        idx_c = inside.argmax(axis=1)
+
+    top = tops[idx_c]
+    thickness = bottoms[idx_c] - top
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.clip((tvds - top) / thickness * 100.0, 0.0, 99.99)
+    pct = np.where(thickness > 0, pct, 0.0)
+
+    names[matched] = index["names"][idx_c[matched]]
+    pcts[matched] = [round(v, 1) for v in pct[matched].tolist()]  # as round() in the dict path
+    segments[matched] = (pct[matched] // segment_pct) * segment_pct
+
+    # Feet outside every interval are assigned to the last formation
+    below = has_tvd & ~matched
+    names[below] = index["names"][-1]
+    pcts[below] = 100.0
+    segments[below] = 90
+
+    return names, pcts, segments
+
@@ -9,7 +9,8 @@ Usage:
     python full_corva_bit_scan.py --phase1       # enumerate wells only
     python full_corva_bit_scan.py --phase2       # process wells (resumes automatically)
     python full_corva_bit_scan.py --phase3       # rebuild catalog only
-    python full_corva_bit_scan.py --workers 5    # override parallel worker count (default 10)
+    python full_corva_bit_scan.py --workers 5    # starting parallel worker count (default 10)
+    python full_corva_bit_scan.py --max-workers 60  # ceiling the adaptive limiter may ramp to (default 40)
     python full_corva_bit_scan.py --export-csv   # also export to exports/full_bit_scan.csv
 """
 import csv
@@ -23,20 +24,15 @@ from dateutil.relativedelta import relativedelta
 
 import pandas as pd
 import requests
-from dotenv import load_dotenv
 
+import corva_client
 import db
+from adaptive_limiter import AdaptiveLimiter
+from corva_client import PLATFORM_API
 
 # Import parsing functions from parse_bit_motors.py (same directory)
 from parse_bit_motors import parse_bit, parse_motor_lobes
 
-load_dotenv()
-
-API_KEY = os.getenv("CORVA_API_KEY")
-DATA_API = "https://data.corva.ai"
-PLATFORM_API = "https://api.corva.ai"
-HEADERS = {"Authorization": f"API {API_KEY}"}
-
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 WELL_IDS_FILE = os.path.join(SCRIPT_DIR, "all_well_ids.json")
 PROGRESS_FILE = os.path.join(SCRIPT_DIR, "scan_progress.json")
@@ -44,6 +40,11 @@ OUTPUT_CSV = os.path.join(SCRIPT_DIR, "full_bit_scan.csv")
 
 BATCH_SIZE = 500
 MONTHS_BACK = 18
+DEFAULT_WORKERS = 10       # starting concurrency for Phase 2
+DEFAULT_MAX_WORKERS = 40   # ceiling for the adaptive limiter / thread pool
+
+# Set by run_phase2(); fetch_drillstrings_with_filter() requests take a slot from it
+_limiter = None
 
 CSV_FIELDNAMES = [
     "asset_id", "well_name", "well_status", "well_state",
@@ -97,9 +98,8 @@ def enumerate_wells():
 
     while True:
         try:
-            r = requests.get(
+            r = corva_client.get(
                 f"{PLATFORM_API}/v2/assets",
-                headers=HEADERS,
                 params={"limit": 100, "page": page, "types[]": "well"},
                 timeout=30,
             )
@@ -193,19 +193,11 @@ def fetch_drillstrings_with_filter(asset_id, cutoff_epoch, max_retries=3):
 
     while True:
         try:
-            r = requests.get(
-                f"{DATA_API}/api/v1/data/corva/data.drillstring/",
-                headers=HEADERS,
-                params={
-                    "limit": batch,
-                    "skip": skip,
-                    "sort": json.dumps({"timestamp": 1}),
-                    "query": json.dumps({
-                        "asset_id": int(asset_id),
-                        "timestamp": {"$gte": cutoff_epoch},
-                    }),
-                },
-                timeout=30,
+            r = corva_client.get_data(
+                "data.drillstring",
+                {"asset_id": int(asset_id), "timestamp": {"$gte": cutoff_epoch}},
+                sort={"timestamp": 1}, limit=batch, skip=skip,
+                limiter=_limiter,
             )
         except requests.exceptions.RequestException:
             retries += 1
@@ -365,8 +357,18 @@ def append_to_csv(rows):
             writer.writerows(rows)
 
 
-def run_phase2(max_workers=10, export_csv=False):
-    """Main Phase 2 loop: batch-process wells with resume."""
+def run_phase2(max_workers=DEFAULT_WORKERS, export_csv=False,
+               max_workers_ceiling=DEFAULT_MAX_WORKERS):
+    """Main Phase 2 loop: batch-process wells with resume.
+
+    max_workers is the starting concurrency; an AIMD limiter raises it
+    towards max_workers_ceiling while the API stays healthy and halves it
+    on 429 / 5xx.
+    """
+    global _limiter
+    max_workers_ceiling = max(max_workers, max_workers_ceiling)
+    _limiter = AdaptiveLimiter(initial=max_workers, max_limit=max_workers_ceiling)
+
     print(f"\n{'=' * 80}")
     print(f"  PHASE 2: BATCH DRILLSTRING FETCH & PARSE")
     print(f"{'=' * 80}\n")
@@ -374,7 +376,7 @@ def run_phase2(max_workers=10, export_csv=False):
     cutoff_epoch = get_cutoff_epoch()
     cutoff_date = datetime.fromtimestamp(cutoff_epoch, tz=timezone.utc).strftime("%Y-%m-%d")
     print(f"  Timestamp cutoff: {cutoff_date} (epoch {cutoff_epoch})")
-    print(f"  Parallel workers: {max_workers}")
+    print(f"  Parallel workers: {max_workers} (adaptive, max {max_workers_ceiling})")
 
     wells = load_well_ids()
     progress = load_progress()
@@ -421,7 +423,7 @@ def run_phase2(max_workers=10, export_csv=False):
 
         print(f"  --- Batch {batch_num} ({len(batch)} wells) ---")
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=max_workers_ceiling) as executor:
             futures = {
                 executor.submit(process_single_well, w, cutoff_epoch): w
                 for w in batch
@@ -447,7 +449,7 @@ def run_phase2(max_workers=10, export_csv=False):
                 if completed % 100 == 0:
                     elapsed = time.time() - batch_t0
                     print(f"    {completed}/{len(batch)} wells, "
-                          f"{len(batch_bhas)} BHAs, {elapsed:.0f}s")
+                          f"{len(batch_bhas)} BHAs, {elapsed:.0f}s | {_limiter.status()}")
 
         # Append results to CSV
         if batch_bhas:
@@ -479,7 +481,7 @@ def run_phase2(max_workers=10, export_csv=False):
                 conf_counts["unknown"] += 1
 
         print(f"    Batch {batch_num} done: {len(batch_bhas)} BHAs from "
-              f"{batch_wells_with_bhas} wells in {batch_elapsed:.1f}s")
+              f"{batch_wells_with_bhas} wells in {batch_elapsed:.1f}s | {_limiter.status()}")
         print(f"    Parse confidence: high={conf_counts['high']} check={conf_counts['check']} "
               f"unknown={conf_counts['unknown']} skip={conf_counts['skip']}")
         print(f"    Cumulative: {cumulative_bhas} BHAs, {processed_count}/{len(wells)} wells")
@@ -647,14 +649,21 @@ def run_phase3():
 def main():
     args = sys.argv[1:]
 
-    # Parse --workers flag
-    max_workers = 10
+    # Parse --workers / --max-workers flags
+    max_workers = DEFAULT_WORKERS
     if "--workers" in args:
         idx = args.index("--workers")
         if idx + 1 < len(args):
             max_workers = int(args[idx + 1])
             args = [a for i, a in enumerate(args) if i != idx and i != idx + 1]
 
+    max_workers_ceiling = DEFAULT_MAX_WORKERS
+    if "--max-workers" in args:
+        idx = args.index("--max-workers")
+        if idx + 1 < len(args):
+            max_workers_ceiling = int(args[idx + 1])
+            args = [a for i, a in enumerate(args) if i != idx and i != idx + 1]
+
     export_csv = "--export-csv" in args
     if export_csv:
         args = [a for a in args if a != "--export-csv"]
@@ -665,11 +674,14 @@ def main():
         enumerate_wells()
 
     if run_all or "--phase2" in args:
-        run_phase2(max_workers=max_workers, export_csv=export_csv)
+        run_phase2(max_workers=max_workers, export_csv=export_csv,
+                   max_workers_ceiling=max_workers_ceiling)
 
     if run_all or "--phase3" in args:
         run_phase3()
 
+    corva_client.print_metrics()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,46 @@
+"""Great-circle distance helpers for offset well searches.
+
+haversine_miles() takes scalars or NumPy arrays (broadcast like any ufunc),
+so a target can be measured against every candidate well in one call.
+bounding_box() gives the lat/lon box that is guaranteed to contain a
+search circle, for index lookups before the exact distance check.
+
+Usage:
+    d = haversine_miles(31.9, -102.1, lats, lons)      # array of miles
+    lat0, lat1, lon0, lon1 = bounding_box(31.9, -102.1, 15.0)
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles (float for scalars, array otherwise)."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    d = 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return float(d) if np.ndim(d) == 0 else d
+
+
+def bounding_box(lat, lon, radius_miles):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a radius around a point.
+
+    The longitude half-width is the exact extent of the circle at this
+    latitude, asin(sin(d) / cos(lat)). Near a pole, or where the box would
+    cross the antimeridian, the full longitude range is returned instead.
+    """
+    d = radius_miles / EARTH_RADIUS_MILES
+    dlat = math.degrees(d)
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    cos_lat = math.cos(math.radians(lat))
+    if min_lat <= -90.0 or max_lat >= 90.0 or math.sin(d) >= cos_lat:
+        return min_lat, max_lat, -180.0, 180.0
+    dlon = math.degrees(math.asin(math.sin(d) / cos_lat))
+    if lon - dlon < -180.0 or lon + dlon > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lon - dlon, lon + dlon
@@ -0,0 +1,752 @@
+"""Local stand-in for the Corva data and platform APIs.
+
+Serves synthetic (or recorded) payloads for the endpoints the pipeline
+uses, so every fetch path can be exercised and benchmarked with no
+network access:
+
+  GET /api/v1/data/corva/<dataset>/   wits.summary-1ft, data.drillstring,
+                                      data.well-sections, data.formations,
+                                      well_cache
+  GET /v2/assets                      page/limit pager (types[], company_id)
+  GET /v2/assets/<id>                 single asset
+  GET /_stats                         request counts by endpoint / status
+
+Data API requests honour query (equality, $in, $nin, $ne, $gt/$gte/$lt/$lte,
+$exists, $and/$or on dotted paths), sort, fields, skip and limit. Other
+operators (e.g. $geoWithin) get a 400, as an unsupported query would.
+
+Synthetic wells are generated deterministically from --seed: a vertical /
+curve / lateral well plan, formation tops, a few BHA runs with bit and
+motor components, and 1 ft summary records whose ROP varies by run and
+formation. 80% of wells are completed months ago, the rest are drilling.
+With --recorded DIR the server instead replays responses captured in the
+corva_client response cache (data/http_cache) and/or <dataset>.json files.
+
+Fault injection: fixed + jittered latency, latency per 1k records
+returned, random 429 (with Retry-After) and 5xx, and a concurrency cap
+above which requests get 429 -- enough to drive the adaptive limiter.
+
+Usage:
+    python mock_corva_server.py                                # 50 wells on :8765
+    python mock_corva_server.py --wells 200 --port 9000
+    python mock_corva_server.py --latency-ms 80 --jitter-ms 40 --ms-per-1k 15
+    python mock_corva_server.py --throttle-rate 0.05 --error-rate 0.01
+    python mock_corva_server.py --max-concurrent 16            # 429 beyond 16 in flight
+    python mock_corva_server.py --recorded data/http_cache
+
+Point the scripts at it (corva_client reads these at import; use export
+instead of set outside Windows):
+    set CORVA_DATA_API=http://127.0.0.1:8765
+    set CORVA_PLATFORM_API=http://127.0.0.1:8765
+    python pull_lateral_bhas.py offset_wells.csv --no-cache
+
+From Python (benchmarks / tests):
+    server = start_server(port=0, wells=20, latency_ms=20)
+    ... server.url ...
+    server.shutdown()
+"""
+
+import glob
+import gzip
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PORT = 8765
+DEFAULT_WELLS = 50
+FIRST_ASSET_ID = 90000001
+N_COMPANIES = 3
+ACTIVE_FRACTION = 0.2          # share of wells still drilling
+
+DATASETS = ("wits.summary-1ft", "data.drillstring", "data.well-sections",
+            "data.formations", "well_cache")
+
+BASINS = {
+    "Midland": (31.95, -101.95),
+    "Delaware": (31.75, -103.55),
+}
+FORMATION_COLUMN = [
+    # (name, lithology, thickness ft)
+    ("Rustler", "anhydrite", 400),
+    ("Salado", "salt", 1300),
+    ("Yates", "sandstone", 500),
+    ("San Andres", "dolomite", 1200),
+    ("Clear Fork", "carbonate", 1500),
+    ("Spraberry", "sandstone", 1400),
+    ("Dean", "sandstone", 300),
+    ("Wolfcamp A", "shale", 350),
+    ("Wolfcamp B", "shale", 450),
+    ("Wolfcamp C", "shale", 600),
+]
+LANDING_FORMATIONS = ["Wolfcamp A", "Wolfcamp B", "Spraberry"]
+BIT_MODELS = [("Halliburton", "MMD55M", 5, 16), ("Baker Hughes", "DD506S", 5, 16),
+              ("Ulterra", "U616M", 6, 16), ("NOV", "TKC66", 6, 13),
+              ("Taurex", "TX613", 6, 13)]
+MOTOR_MODELS = [("Scout", "Hammer 7/8 5.0", "7/8", 5.0, 0.50),
+                ("Abaco", "AbacoPower 6/7", "6/7", 6.0, 0.33),
+                ("NOV", "ERT 7/8 6.7", "7/8", 6.7, 0.29)]
+SECTION_PLAN = [
+    # (name, diameter in, rop p50 ft/hr)
+    ("Surface", 17.5, 180),
+    ("Intermediate", 12.25, 140),
+    ("Curve", 8.75, 60),
+    ("Lateral", 8.5, 110),
+]
+
+
+class UnsupportedQuery(ValueError):
+    """Query uses an operator the mock does not implement."""
+
+
+# ---------------------------------------------------------------------------
+#  Query engine (the subset of Mongo semantics the scripts use)
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+
+def resolve(doc, path):
+    """Value at a dotted path (numeric parts index lists); _MISSING if absent."""
+    cur = doc
+    for part in path.split("."):
+        if isinstance(cur, dict):
+            if part not in cur:
+                return _MISSING
+            cur = cur[part]
+        elif isinstance(cur, list) and part.isdigit() and int(part) < len(cur):
+            cur = cur[int(part)]
+        else:
+            return _MISSING
+    return cur
+
+
+def _compare(value, op, arg):
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$ne":
+        return value is _MISSING or value != arg
+    if op == "$in":
+        return value is not _MISSING and value in arg
+    if op == "$nin":
+        return value is _MISSING or value not in arg
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > arg
+        if op == "$gte":
+            return value >= arg
+        if op == "$lt":
+            return value < arg
+        if op == "$lte":
+            return value <= arg
+    except TypeError:
+        return False
+    raise UnsupportedQuery(f"operator {op} is not supported by the mock server")
+
+
+def matches(doc, query):
+    """True if doc satisfies a Mongo-style query dict."""
+    for key, cond in query.items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in cond):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+            continue
+        if key.startswith("$"):
+            raise UnsupportedQuery(f"operator {key} is not supported by the mock server")
+        value = resolve(doc, key)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            if not all(_compare(value, op, arg) for op, arg in cond.items()):
+                return False
+        elif isinstance(value, list):
+            if cond not in value:
+                return False
+        elif value is _MISSING or value != cond:
+            return False
+    return True
+
+
+def sort_records(records, sort):
+    """Stable multi-key sort; missing / null values sort first (as in Mongo)."""
+    for path, direction in reversed(list(sort.items())):
+        def key(doc, path=path):
+            v = resolve(doc, path)
+            if v is _MISSING or v is None:
+                return (0, 0)
+            return (1, v) if isinstance(v, (int, float)) else (2, str(v))
+        records = sorted(records, key=key, reverse=direction < 0)
+    return records
+
+
+def project(doc, fields):
+    """Keep only the comma-separated dotted fields (plus _id)."""
+    out = {}
+    if "_id" in doc:
+        out["_id"] = doc["_id"]
+    for path in fields:
+        value = resolve(doc, path)
+        if value is _MISSING:
+            continue
+        parts = path.split(".")
+        cur = out
+        for part in parts[:-1]:
+            cur = cur.setdefault(part, {})
+        cur[parts[-1]] = value
+    return out
+
+
+def endpoint_label(path):
+    """Stats label matching corva_client's: dataset name, v2/assets or the path."""
+    path = path.rstrip("/")
+    if path.startswith("/api/v1/data/"):
+        return path.rsplit("/", 1)[-1]
+    if path.startswith("/v2/assets"):
+        return "v2/assets"
+    return path.lstrip("/")
+
+
+def _asset_ids_in(query):
+    """asset_id values a query is restricted to, or None for all wells."""
+    cond = query.get("asset_id")
+    if cond is None:
+        return None
+    if isinstance(cond, dict):
+        if "$in" in cond:
+            return [int(a) for a in cond["$in"]]
+        return None
+    return [int(cond)]
+
+
+def _depth_bounds(query):
+    """(lo, hi) hole_depth bounds from a 1ft query (inclusive, +/-inf if open)."""
+    cond = query.get("data.hole_depth")
+    lo, hi = -math.inf, math.inf
+    if isinstance(cond, dict):
+        lo = cond.get("$gte", cond.get("$gt", lo))
+        hi = cond.get("$lte", cond.get("$lt", hi))
+    elif isinstance(cond, (int, float)):
+        lo = hi = cond
+    return lo, hi
+
+
+# ---------------------------------------------------------------------------
+#  Synthetic data
+# ---------------------------------------------------------------------------
+
+class SyntheticCorva:
+    """Deterministic synthetic wells (metadata eager, 1ft data lazy per well)."""
+
+    def __init__(self, n_wells=DEFAULT_WELLS, seed=0, first_asset_id=FIRST_ASSET_ID):
+        self.seed = seed
+        self.now = int(time.time())
+        self.wells = {}
+        self.by_dataset = defaultdict(dict)
+        for i in range(n_wells):
+            well = self._make_well(first_asset_id + i, i)
+            aid = well["asset_id"]
+            self.wells[aid] = well
+            self.by_dataset["well_cache"][aid] = [self._well_cache(well)]
+            self.by_dataset["data.formations"][aid] = well["formations"]
+            self.by_dataset["data.well-sections"][aid] = well["sections"]
+            self.by_dataset["data.drillstring"][aid] = well["drillstrings"]
+        self.one_ft = lru_cache(maxsize=64)(self._make_1ft)
+
+    # --- wells ---
+
+    def _make_well(self, asset_id, i):
+        rng = random.Random(self.seed * 1_000_003 + asset_id)
+        basin = list(BASINS)[i % len(BASINS)]
+        lat0, lon0 = BASINS[basin]
+        active = rng.random() < ACTIVE_FRACTION
+        landing = rng.choice(LANDING_FORMATIONS)
+
+        # Formation tops (TVD == MD above the kick-off point)
+        tops, depth = [], rng.uniform(300, 700)
+        for name, lith, thk in FORMATION_COLUMN:
+            tops.append((name, lith, round(depth, 1)))
+            depth += thk * rng.uniform(0.8, 1.2)
+        land_idx = [t[0] for t in tops].index(landing)
+        landing_tvd = tops[land_idx][2] + rng.uniform(40, 150)
+        kop = landing_tvd - rng.uniform(550, 750)
+        curve_end = kop + (landing_tvd - kop) * math.pi / 2
+        td = curve_end + rng.uniform(6000, 11000)
+
+        bounds = [0.0, rng.uniform(1200, 2200), kop, curve_end, td]
+        spud = (self.now - rng.randint(2, 15) * 86400 if active
+                else self.now - rng.randint(60, 700) * 86400)
+        if active:
+            td = bounds[3] + (td - bounds[3]) * rng.uniform(0.2, 0.8)
+            bounds[4] = td
+
+        sections, runs, t = [], [], spud
+        for s_idx, (name, diameter, rop) in enumerate(SECTION_PLAN):
+            top, bottom = bounds[s_idx], bounds[s_idx + 1]
+            sections.append({
+                "_id": f"ws-{asset_id}-{s_idx}",
+                "asset_id": asset_id,
+                "timestamp": t,
+                "data": {"name": f"{diameter}\" {name}", "diameter": diameter,
+                         "top_depth": round(top, 1), "bottom_depth": round(bottom, 1),
+                         "start_time": t},
+            })
+            n_runs = 1 if name in ("Surface", "Curve") else rng.randint(1, 3)
+            cuts = sorted(rng.uniform(top, bottom) for _ in range(n_runs - 1))
+            for lo, hi in zip([top] + cuts, cuts + [bottom]):
+                bha = len(runs) + 1
+                make, model, blades, cutter = rng.choice(BIT_MODELS)
+                m_make, m_model, lobes, stages, rpg = rng.choice(MOTOR_MODELS)
+                run_rop = rop * rng.lognormvariate(0, 0.25)
+                components = [
+                    {"family": "bit", "name": f"{diameter} {model}", "size": diameter,
+                     "bit_type": "pdc", "manufacturer": make, "model": model,
+                     "blade_count": blades, "cutter_size": cutter,
+                     "tfa": round(rng.uniform(0.8, 1.4), 3),
+                     "serial_number": f"SN{asset_id % 100000}{bha:02d}"},
+                    {"family": "pdm", "name": f"{m_make} motor", "manufacturer": m_make,
+                     "model": m_model, "outer_diameter": 6.75 if diameter < 10 else 8.0,
+                     "length": 28.5, "rpg": rpg, "bend_angle": round(rng.choice([1.5, 1.83, 2.12]), 2),
+                     "stages": stages, "lobes": lobes, "max_differential_pressure": 1200},
+                    {"family": "mwd", "name": "MWD"},
+                ]
+                if name == "Lateral" and rng.random() < 0.15:
+                    components.insert(1, {"family": "rss", "name": "Rotary Steerable"})
+                if name == "Lateral" and rng.random() < 0.5:
+                    components.append({"family": "agitator", "name": "Agitator"})
+                runs.append({
+                    "_id": f"ds-{asset_id}-{bha}",
+                    "asset_id": asset_id,
+                    "timestamp": t,
+                    "data": {"id": bha, "start_depth": round(lo, 1), "end_depth": round(hi, 1),
+                             "setting_timestamp": t, "components": components},
+                    "_rop": run_rop,
+                })
+                t += int((hi - lo) / run_rop * 3600 * 1.6) + rng.randint(6, 18) * 3600
+
+        formations = [{
+            "_id": f"fm-{asset_id}-{k}",
+            "asset_id": asset_id,
+            "timestamp": spud,
+            "data": {"formation_name": name, "md": md, "td": md, "lithology": lith},
+        } for k, (name, lith, md) in enumerate(tops)]
+
+        return {
+            "asset_id": asset_id,
+            "company_id": 1 + i % N_COMPANIES,
+            "name": f"Mock {basin} {i + 1:03d}H",
+            "basin": basin,
+            "lat": lat0 + rng.uniform(-0.4, 0.4),
+            "lon": lon0 + rng.uniform(-0.4, 0.4),
+            "landing": landing,
+            "active": active,
+            "spud": spud,
+            "last_activity": self.now if active else t,
+            "td": td,
+            "kop": kop,
+            "landing_tvd": landing_tvd,
+            "sections": sections,
+            "drillstrings": [{k: v for k, v in r.items() if k != "_rop"} for r in runs],
+            "runs": runs,
+            "formations": formations,
+        }
+
+    def _well_cache(self, well):
+        last_section = well["sections"][-1]["data"]
+        last_ds = well["drillstrings"][-1]["data"]
+        return {
+            "_id": f"wc-{well['asset_id']}",
+            "asset_id": well["asset_id"],
+            "well_id": well["asset_id"] + 1,
+            "company_id": well["company_id"],
+            "timestamp": well["last_activity"],
+            "location": {"type": "Point", "coordinates": [well["lon"], well["lat"]]},
+            "asset": {"name": well["name"], "target_formation": well["landing"],
+                      "state": "drilling" if well["active"] else "complete",
+                      "string_design": "Standard",
+                      "stats": {"drilling": {"start_time": well["spud"]}}},
+            "program": {"name": well["basin"]},
+            "rig": {"name": f"Mock Rig {well['asset_id'] % 17 + 1}"},
+            "company": {"name": f"Mock Operator {well['company_id']}"},
+            "corva#wits": {"data": {"hole_depth": round(well["td"], 1),
+                                    "state": "Rotary Drilling" if well["active"] else "In Slips"}},
+            "corva#data-well-sections": {"data": last_section},
+            "corva#data-drillstring": {"data": last_ds},
+            "corva#data-mud": {"data": {"mud_type": "oil_based", "mud_density": 9.6}},
+            "corva#data-casing": {"data": {}},
+        }
+
+    # --- 1 ft summaries ---
+
+    def _make_1ft(self, asset_id):
+        """Column arrays for one well's 1 ft records (sorted by hole_depth)."""
+        well = self.wells[asset_id]
+        rng = np.random.default_rng(self.seed * 1_000_003 + asset_id)
+        depth = np.arange(0.0, math.floor(well["td"]) + 1)
+        n = len(depth)
+
+        run_idx = np.zeros(n, dtype=int)
+        rop = np.empty(n)
+        for k, run in enumerate(well["runs"]):
+            sel = depth >= run["data"]["start_depth"]
+            run_idx[sel] = k
+        for k, run in enumerate(well["runs"]):
+            sel = run_idx == k
+            rop[sel] = run["_rop"]
+        # Formation hardness: each formation scales ROP by a fixed factor
+        fm_tops = np.array([f["data"]["td"] for f in well["formations"]])
+        fm_factor = np.random.default_rng(asset_id % 7919).uniform(0.7, 1.3, len(fm_tops))
+        tvd = self._tvd(well, depth)
+        fm_idx = np.clip(np.searchsorted(fm_tops, tvd, side="right") - 1, 0, len(fm_tops) - 1)
+        rop = rop * fm_factor[fm_idx] * rng.lognormal(0, 0.3, n)
+
+        states = rng.choice(np.array(["Rotary Drilling", "Slide Drilling", "In Slips",
+                                      "Circulating"]), size=n, p=[0.72, 0.2, 0.05, 0.03])
+        seconds = 3600.0 / np.clip(rop, 1, None)
+        ts_min = well["spud"] + np.concatenate([[0.0], np.cumsum(seconds[:-1])])
+        return {
+            "hole_depth": depth,
+            "state_max": states,
+            "timestamp_min": ts_min.astype(np.int64),
+            "timestamp_max": (ts_min + seconds).astype(np.int64),
+            "tvd": np.round(tvd, 2),
+            "drillstring": np.array([r["_id"] for r in well["runs"]], dtype=object)[run_idx],
+        }
+
+    @staticmethod
+    def _tvd(well, md):
+        """TVD along a vertical / circular-arc curve / horizontal lateral profile."""
+        kop, land = well["kop"], well["landing_tvd"]
+        radius = land - kop
+        tvd = md.copy()
+        curve = (md > kop) & (md <= kop + radius * math.pi / 2)
+        tvd[curve] = kop + radius * np.sin((md[curve] - kop) / radius)
+        tvd[md > kop + radius * math.pi / 2] = land
+        return tvd
+
+    def _1ft_records(self, asset_id, lo, hi):
+        cols = self.one_ft(asset_id)
+        depth = cols["hole_depth"]
+        i0 = np.searchsorted(depth, lo, side="left")
+        i1 = np.searchsorted(depth, hi, side="right")
+        return [{
+            "_id": f"1ft-{asset_id}-{int(depth[i])}",
+            "asset_id": asset_id,
+            "timestamp": int(cols["timestamp_max"][i]),
+            "data": {
+                "hole_depth": float(depth[i]),
+                "state_max": str(cols["state_max"][i]),
+                "timestamp_min": int(cols["timestamp_min"][i]),
+                "timestamp_max": int(cols["timestamp_max"][i]),
+                "true_vertical_depth_mean": float(cols["tvd"][i]),
+            },
+            "metadata": {"drillstring": cols["drillstring"][i]},
+        } for i in range(i0, i1)]
+
+    # --- provider interface ---
+
+    def candidates(self, dataset, query):
+        """Records that may match query (asset_id / depth pre-filtered)."""
+        asset_ids = _asset_ids_in(query)
+        if asset_ids is None:
+            asset_ids = list(self.wells)
+        if dataset == "wits.summary-1ft":
+            lo, hi = _depth_bounds(query)
+            return [rec for aid in asset_ids if aid in self.wells
+                    for rec in self._1ft_records(aid, lo, hi)]
+        store = self.by_dataset.get(dataset, {})
+        return [rec for aid in asset_ids for rec in store.get(aid, [])]
+
+    def assets(self):
+        """v2 asset dicts (id, name, status, state, company_id)."""
+        return [{
+            "id": str(w["asset_id"]),
+            "type": "asset",
+            "attributes": {
+                "name": w["name"], "asset_type": "well",
+                "status": "active" if w["active"] else "complete",
+                "state": "drilling" if w["active"] else "complete",
+                "company_id": w["company_id"],
+            },
+        } for w in self.wells.values()]
+
+
+# ---------------------------------------------------------------------------
+#  Recorded data
+# ---------------------------------------------------------------------------
+
+class RecordedCorva:
+    """Replays responses captured by corva_client's cache or <dataset>.json files."""
+
+    def __init__(self, path):
+        self.by_dataset = defaultdict(lambda: defaultdict(dict))
+        self._assets = {}
+        for file in glob.glob(os.path.join(path, "**", "*.json.gz"), recursive=True):
+            try:
+                with gzip.open(file, "rt", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self._add(entry.get("endpoint"), entry.get("body"))
+        for file in glob.glob(os.path.join(path, "*.json")):
+            with open(file, encoding="utf-8") as f:
+                self._add(os.path.basename(file)[:-len(".json")], json.load(f))
+
+    def _add(self, endpoint, body):
+        if endpoint == "v2/assets":
+            items = body.get("data", []) if isinstance(body, dict) and "data" in body else [body]
+            for a in items:
+                if isinstance(a, dict) and "id" in a:
+                    attrs = a.get("attributes") or {k: v for k, v in a.items() if k != "id"}
+                    self._assets[str(a["id"])] = {"id": str(a["id"]), "type": "asset",
+                                                  "attributes": attrs}
+            return
+        if not isinstance(body, list):
+            return
+        store = self.by_dataset[endpoint]
+        for rec in body:
+            key = rec.get("_id") or json.dumps(rec, sort_keys=True)
+            aid = rec.get("asset_id")
+            store[aid if aid is None else int(aid)][key] = rec
+
+    def candidates(self, dataset, query):
+        store = self.by_dataset.get(dataset, {})
+        asset_ids = _asset_ids_in(query)
+        if asset_ids is None:
+            asset_ids = list(store)
+        return [rec for aid in asset_ids for rec in store.get(aid, {}).values()]
+
+    def assets(self):
+        return list(self._assets.values())
+
+
+# ---------------------------------------------------------------------------
+#  HTTP server
+# ---------------------------------------------------------------------------
+
+class MockCorvaServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer carrying the data provider and fault-injection settings."""
+
+    daemon_threads = True
+
+    def __init__(self, address, provider, latency_ms=0, jitter_ms=0, ms_per_1k=0,
+                 throttle_rate=0.0, error_rate=0.0, max_concurrent=None, seed=0):
+        super().__init__(address, MockCorvaHandler)
+        self.provider = provider
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_1k = ms_per_1k
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.max_concurrent = max_concurrent
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.stats = Counter()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, endpoint, status):
+        with self.lock:
+            self.stats[f"{endpoint} {status}"] += 1
+
+
+class MockCorvaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        extra = dict(headers or {})
+        if "gzip" in (self.headers.get("Accept-Encoding") or "") and len(body) > 512:
+            body = gzip.compress(body, compresslevel=1)
+            extra["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in extra.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.rstrip("/") == "/_stats":
+            self._send(*self._route(url.path, params))
+            return
+        endpoint = endpoint_label(url.path)
+
+        with server.lock:
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            over_cap = (server.max_concurrent is not None
+                        and server.in_flight > server.max_concurrent)
+            roll = server.rng.random()
+            delay = (server.latency_ms + server.rng.uniform(0, server.jitter_ms)) / 1000
+        try:
+            if over_cap or roll < server.throttle_rate:
+                server.count(endpoint, 429)
+                self._send(429, {"message": "Too Many Requests"}, {"Retry-After": "1"})
+                return
+            if roll < server.throttle_rate + server.error_rate:
+                status = server.rng.choice([500, 502, 503])
+                server.count(endpoint, status)
+                self._send(status, {"message": "Injected server error"})
+                return
+            status, payload = self._route(url.path, params)
+            n = len(payload) if isinstance(payload, list) else 1
+            time.sleep(delay + server.ms_per_1k * n / 1e6)
+            server.count(endpoint, status)
+            self._send(status, payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _route(self, path, params):
+        path = path.rstrip("/")
+        if path == "/_stats":
+            s = self.server
+            return 200, {"requests": dict(s.stats), "peak_in_flight": s.peak_in_flight}
+        if path.startswith("/api/v1/data/"):
+            dataset = path.rsplit("/", 1)[-1]
+            if dataset not in DATASETS:
+                return 404, {"message": f"Unknown dataset {dataset}"}
+            try:
+                return 200, self._query(dataset, params)
+            except (UnsupportedQuery, ValueError) as e:
+                return 400, {"message": str(e)}
+        if path == "/v2/assets":
+            return 200, self._assets_page(params)
+        if path.startswith("/v2/assets/"):
+            asset_id = path.rsplit("/", 1)[-1]
+            for a in self.server.provider.assets():
+                if a["id"] == asset_id:
+                    return 200, {"id": a["id"], **a["attributes"]}
+            return 404, {"message": f"Asset {asset_id} not found"}
+        return 404, {"message": f"Unknown path {path}"}
+
+    def _query(self, dataset, params):
+        query = json.loads(params.get("query", "{}"))
+        sort = json.loads(params.get("sort", "{}"))
+        fields = [f for f in params.get("fields", "").split(",") if f]
+        skip = int(params.get("skip", 0))
+        limit = int(params.get("limit", 10))
+
+        records = [r for r in self.server.provider.candidates(dataset, query)
+                   if matches(r, query)]
+        if sort:
+            records = sort_records(records, sort)
+        records = records[skip:skip + limit]
+        if fields:
+            records = [project(r, fields) for r in records]
+        return records
+
+    def _assets_page(self, params):
+        page = int(params.get("page", 1))
+        limit = int(params.get("limit", 100))
+        assets = self.server.provider.assets()
+        if params.get("company_id"):
+            company = int(params["company_id"])
+            assets = [a for a in assets if a["attributes"].get("company_id") == company]
+        start = (page - 1) * limit
+        return {"data": assets[start:start + limit]}
+
+
+def start_server(port=0, host="127.0.0.1", wells=DEFAULT_WELLS, seed=0,
+                 recorded=None, **fault_options):
+    """Start a mock server on a background thread; returns the server.
+
+    fault_options: latency_ms, jitter_ms, ms_per_1k, throttle_rate,
+    error_rate, max_concurrent. Stop with server.shutdown().
+    """
+    provider = RecordedCorva(recorded) if recorded else SyntheticCorva(wells, seed=seed)
+    server = MockCorvaServer((host, port), provider, seed=seed, **fault_options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+#  Main
+# ---------------------------------------------------------------------------
+
+def main():
+    args = sys.argv[1:]
+    opts = {"port": DEFAULT_PORT, "wells": DEFAULT_WELLS, "seed": 0}
+    int_flags = {"--port": "port", "--wells": "wells", "--seed": "seed",
+                 "--max-concurrent": "max_concurrent"}
+    float_flags = {"--latency-ms": "latency_ms", "--jitter-ms": "jitter_ms",
+                   "--ms-per-1k": "ms_per_1k", "--throttle-rate": "throttle_rate",
+                   "--error-rate": "error_rate"}
+    i = 0
+    while i < len(args):
+        flag = args[i]
+        if flag in int_flags and i + 1 < len(args):
+            opts[int_flags[flag]] = int(args[i + 1])
+            i += 2
+        elif flag in float_flags and i + 1 < len(args):
+            opts[float_flags[flag]] = float(args[i + 1])
+            i += 2
+        elif flag == "--recorded" and i + 1 < len(args):
+            path = args[i + 1]
+            opts["recorded"] = path if os.path.isabs(path) else os.path.join(SCRIPT_DIR, path)
+            i += 2
+        else:
+            print(f"  Unknown argument: {flag}")
+            sys.exit(1)
+
+    server = start_server(**opts)
+    provider = server.provider
+    print(f"\n{'=' * 70}")
+    print(f"  MOCK CORVA API")
+    print(f"  URL:       {server.url}")
+    if opts.get("recorded"):
+        n = sum(len(v) for store in provider.by_dataset.values() for v in store.values())
+        print(f"  Recorded:  {opts['recorded']} ({n} records, {len(provider.assets())} assets)")
+    else:
+        active = sum(w["active"] for w in provider.wells.values())
+        print(f"  Synthetic: {len(provider.wells)} wells ({active} drilling), seed {opts['seed']}")
+        print(f"  Asset IDs: {min(provider.wells)}..{max(provider.wells)}")
+    print(f"  Latency:   {server.latency_ms:.0f} ms + up to {server.jitter_ms:.0f} ms jitter, "
+          f"{server.ms_per_1k:.0f} ms per 1k records")
+    print(f"  Faults:    429 rate {server.throttle_rate:.1%}, 5xx rate {server.error_rate:.1%}, "
+          f"max concurrent {server.max_concurrent or 'unlimited'}")
+    print(f"{'=' * 70}\n")
+    print(f"  set CORVA_DATA_API={server.url}")
+    print(f"  set CORVA_PLATFORM_API={server.url}")
+    print(f"\n  Ctrl-C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    print(f"\n  Requests served (peak {server.peak_in_flight} in flight):")
+    for key, n in sorted(server.stats.items()):
+        print(f"    {key:<32} {n:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,35 +17,57 @@ Performance optimizations (v2):
   - Well-level batching: one API call per well, not per BHA run
   - 10K batch size: 20x fewer HTTP round trips than 500
   - Per-run caching: re-runs skip wells already in the output CSV
-  - 20 parallel workers with shared session (connection pooling)
+  - Shared corva_client session (connection pooling); concurrency starts at 20 and is
+    tuned at runtime by an AIMD limiter (adaptive_limiter.py) that ramps up
+    while the API is healthy and backs off on 429/5xx
+  - Columnar Phase 2 (default): each well's records are converted to
+    NumPy/pandas columns once and every run on the well is sliced from
+    them; --engine rows keeps the original per-foot dict path for diffing
+  - Vertical formation mapping uses per-well boundary arrays
+    (formation_index.py) and one searchsorted pass per run
+  - Persistent per-asset 1ft store (db wits_1ft_*): depth intervals already
+    fetched by any section are reused and only missing gaps are requested,
+    so Surface/Intermediate/Lateral runs on the same offsets share pulls
+  - --fetch async (fetch_1ft_async.py): depth-windowed pages for all wells
+    in flight at once under one global semaphore; each well is processed
+    as soon as its pages land instead of after the whole pull
+  - --output parquet: each well's rows are appended to the section's
+    Parquet file as one row group (float32 / dictionary-encoded columns)
+    as soon as they are processed; the CSV is only written with --csv
+  - Resumable: each completed well is journalled in the db
+    (pull_1ft_checkpoints); rerunning an interrupted job reloads finished
+    wells and only fetches the rest. With the 1ft store the journal row is
+    all that is written (records are resumed from the store); --no-store
+    also spools the well's records to a checkpoint Parquet
 
 Usage:
     python pull_1ft_for_runs.py [bha_csv]                          # lateral (default)
     python pull_1ft_for_runs.py [bha_csv] --mode vertical          # vertical/intermediate
     python pull_1ft_for_runs.py intermediate_bhas.csv --mode vertical
+    python pull_1ft_for_runs.py [bha_csv] --engine rows            # legacy dict-per-foot processing
+    python pull_1ft_for_runs.py [bha_csv] --refresh-store          # refetch wells, replace stored 1ft
+    python pull_1ft_for_runs.py [bha_csv] --no-store               # bypass the local 1ft store
+    python pull_1ft_for_runs.py [bha_csv] --fetch async            # asyncio/httpx page fetching
+    python pull_1ft_for_runs.py [bha_csv] --output parquet [--csv] # stream per-well Parquet, CSV optional
+    python pull_1ft_for_runs.py [bha_csv] --no-resume              # ignore checkpoints of an interrupted run
 """
 import csv
-import json
+import hashlib
 import os
 import subprocess
 import sys
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dotenv import load_dotenv
 
+import numpy as np
 import pandas as pd
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
+import corva_client
 import db
-
-load_dotenv()
-
-API_KEY = os.getenv("CORVA_API_KEY")
-DATA_API = "https://data.corva.ai"
-HEADERS = {"Authorization": f"API {API_KEY}"}
+from adaptive_limiter import AdaptiveLimiter
+from formation_index import build_formation_index, build_formation_indexes, map_tvds_to_formations
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -64,28 +86,26 @@ FORMATION_SEGMENT_PCT = 10
 
 # --- Performance tuning ---
 BATCH_SIZE = 10000       # records per API call (was 500)
-MAX_WORKERS = 20         # parallel well-fetch workers (was 8)
-
-# Shared session with connection pooling and retry
-_session = None
-
-
-def _get_session():
-    """Return a shared requests.Session with connection pooling and retry."""
-    global _session
-    if _session is None:
-        _session = requests.Session()
-        _session.headers.update(HEADERS)
-        retry = Retry(total=3, backoff_factor=1,
-                      status_forcelist=[429, 500, 502, 503, 504])
-        adapter = HTTPAdapter(
-            max_retries=retry,
-            pool_connections=MAX_WORKERS,
-            pool_maxsize=MAX_WORKERS,
-        )
-        _session.mount("https://", adapter)
-        _session.mount("http://", adapter)
-    return _session
+MAX_WORKERS = 20         # starting concurrency; adapts between 1 and MAX_WORKERS_CEILING
+MAX_WORKERS_CEILING = 48 # thread pool size for the adaptive limiter (<= corva_client.POOL_SIZE)
+
+FIELDS_1FT = (
+    "data.hole_depth,data.state_max,"
+    "data.timestamp_max,data.timestamp_min,"
+    "data.true_vertical_depth_mean,"
+    "metadata.drillstring"
+)
+
+# Shared AIMD limiter gating in-flight 1ft page requests
+_limiter = None
+
+
+def _get_limiter():
+    """Return the shared adaptive concurrency limiter for 1ft page requests."""
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveLimiter(initial=MAX_WORKERS, max_limit=MAX_WORKERS_CEILING)
+    return _limiter
 
 
 def load_formation_tops(csv_path):
@@ -182,23 +202,17 @@ def estimate_lateral_starts(runs):
     """
     def fetch_lateral_start_from_sections(asset_id):
         """Fetch lateral section top depth from well-sections API for one asset."""
-        session = _get_session()
         query = {"asset_id": int(asset_id)}
         skip = 0
         batch = 100
         tops = []
         while True:
             try:
-                r = session.get(
-                    f"{DATA_API}/api/v1/data/corva/data.well-sections/",
-                    params={
-                        "limit": batch,
-                        "skip": skip,
-                        "sort": json.dumps({"data.top_depth": 1}),
-                        "query": json.dumps(query),
-                        "fields": "data.name,data.top_depth",
-                    },
-                    timeout=30,
+                r = corva_client.get_data(
+                    "data.well-sections", query,
+                    sort={"data.top_depth": 1},
+                    fields="data.name,data.top_depth",
+                    limit=batch, skip=skip,
                 )
                 r.raise_for_status()
             except requests.exceptions.RequestException:
@@ -271,10 +285,20 @@ def estimate_lateral_starts(runs):
 def fetch_well_1ft(asset_id, min_depth, max_depth):
     """Fetch all wits.summary-1ft records for a well's full depth range.
 
-    Uses batch_size=10000 and a shared session with connection pooling.
+    Uses batch_size=10000 and the shared corva_client session (connection pooling).
     Returns list of raw API records.
     """
-    session = _get_session()
+    records, _ = _fetch_1ft_range(asset_id, min_depth, max_depth)
+    return records
+
+
+def _fetch_1ft_range(asset_id, min_depth, max_depth):
+    """Fetch wits.summary-1ft records in [min_depth, max_depth].
+
+    Returns (records, complete); complete is False when a request failed
+    part-way, so the range must not be marked as fetched in the store.
+    """
+    limiter = _get_limiter()
     all_records = []
     skip = 0
 
@@ -282,29 +306,17 @@ def fetch_well_1ft(asset_id, min_depth, max_depth):
         "asset_id": int(asset_id),
         "data.hole_depth": {"$gte": min_depth, "$lte": max_depth},
     }
-    fields = (
-        "data.hole_depth,data.state_max,"
-        "data.timestamp_max,data.timestamp_min,"
-        "data.true_vertical_depth_mean,"
-        "metadata.drillstring"
-    )
 
     while True:
         try:
-            r = session.get(
-                f"{DATA_API}/api/v1/data/corva/wits.summary-1ft/",
-                params={
-                    "limit": BATCH_SIZE,
-                    "skip": skip,
-                    "sort": json.dumps({"data.hole_depth": 1}),
-                    "query": json.dumps(query),
-                    "fields": fields,
-                },
-                timeout=90,
+            r = corva_client.get_data(
+                "wits.summary-1ft", query,
+                sort={"data.hole_depth": 1}, fields=FIELDS_1FT,
+                limit=BATCH_SIZE, skip=skip, timeout=90, limiter=limiter,
             )
             r.raise_for_status()
         except requests.exceptions.RequestException:
-            break
+            return all_records, False
 
         records = r.json()
         if not records:
@@ -314,7 +326,87 @@ def fetch_well_1ft(asset_id, min_depth, max_depth):
             break
         skip += BATCH_SIZE
 
-    return all_records
+    return all_records, True
+
+
+def flatten_1ft_records(records):
+    """Flatten raw API records into the db.WITS_1FT_COLUMNS layout.
+
+    TVD follows the processing rule (falsy -> missing), so a stored frame
+    behaves exactly like the raw records it came from.
+    """
+    cols = {c: [] for c in db.WITS_1FT_COLUMNS}
+    for rec in records:
+        data = rec.get("data", {})
+        cols["hole_depth"].append(data.get("hole_depth"))
+        cols["state_max"].append(data.get("state_max", ""))
+        cols["timestamp_max"].append(data.get("timestamp_max"))
+        cols["timestamp_min"].append(data.get("timestamp_min"))
+        tvd_raw = data.get("true_vertical_depth_mean", "")
+        cols["true_vertical_depth_mean"].append(float(tvd_raw) if tvd_raw else None)
+        cols["drillstring"].append((rec.get("metadata") or {}).get("drillstring", ""))
+    df = pd.DataFrame(cols)
+    for c in ("hole_depth", "timestamp_max", "timestamp_min", "true_vertical_depth_mean"):
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype(float)
+    return df
+
+
+def frame_to_1ft_records(df):
+    """Rebuild raw-API-shaped records from a flat 1ft frame (for --engine rows)."""
+    def _num(v):
+        return None if pd.isna(v) else v
+
+    out = []
+    for row in df.itertuples(index=False):
+        out.append({
+            "data": {
+                "hole_depth": _num(row.hole_depth),
+                "state_max": row.state_max,
+                "timestamp_max": _num(row.timestamp_max),
+                "timestamp_min": _num(row.timestamp_min),
+                "true_vertical_depth_mean": _num(row.true_vertical_depth_mean),
+            },
+            "metadata": {"drillstring": row.drillstring},
+        })
+    return out
+
+
+def fetch_well_1ft_stored(asset_id, min_depth, max_depth):
+    """Return a well's 1ft records from the local store, fetching only gaps.
+
+    Depth intervals already fetched for the asset (by any section pipeline)
+    are read from db's wits_1ft store; only the missing sub-ranges hit the
+    API. Returns (flat DataFrame, number of gap requests made, complete).
+    """
+    gaps = db.get_1ft_missing_intervals(asset_id, min_depth, max_depth)
+    results = []
+    for lo, hi in gaps:
+        records, complete = _fetch_1ft_range(asset_id, lo, hi)
+        results.append((lo, hi, flatten_1ft_records(records), complete))
+    df = assemble_stored_well(asset_id, min_depth, max_depth, results)
+    return df, len(gaps), all(r[3] for r in results)
+
+
+def assemble_stored_well(asset_id, min_depth, max_depth, gap_results):
+    """Save completed gap fetches to the 1ft store and return the well frame.
+
+    gap_results is a list of (lo, hi, flat DataFrame, complete). Incomplete
+    gaps are merged into the returned frame but not marked as fetched.
+    """
+    partial = []
+    for lo, hi, flat, complete in gap_results:
+        if complete:
+            db.save_1ft_records(asset_id, flat, lo, hi)
+        else:
+            partial.append(flat)
+
+    df = db.load_1ft_records(asset_id, min_depth, max_depth)
+    if partial:
+        df = (pd.concat([df] + partial, ignore_index=True)
+                .drop_duplicates(subset=["hole_depth", "timestamp_min", "timestamp_max"])
+                .sort_values("hole_depth", kind="mergesort")
+                .reset_index(drop=True))
+    return df
 
 
 # ---------------------------------------------------------------------------
@@ -415,6 +507,186 @@ def process_run_from_cache(run, records, lateral_starts, mode="lateral",
     return rows_out
 
 
+# ---------------------------------------------------------------------------
+#  Phase 2 (columnar): Vectorized processing per well
+# ---------------------------------------------------------------------------
+
+# Per-run metadata copied onto every output row: (output column, run key, default)
+_RUN_META_COLUMNS = [
+    ("asset_id", "asset_id", ""),
+    ("well_name", "well_name", ""),
+    ("operator", "operator", ""),
+    ("bha_number", "bha_number", ""),
+    ("equiv_bha_key", "_equiv_key", ""),
+    ("has_agitator", "has_agitator", "False"),
+    ("bit_manufacturer", "bit_manufacturer", ""),
+    ("bit_model", "bit_model", ""),
+    ("motor_od", "motor_od", ""),
+    ("motor_model", "motor_model", ""),
+    ("motor_stages", "motor_stages", ""),
+    ("motor_lobe_config", "motor_lobe_config", ""),
+]
+
+
+def prepare_well_frame(records):
+    """Convert a well's 1ft records into a columnar DataFrame.
+
+    Accepts raw API records or a flat frame from flatten_1ft_records() /
+    the db 1ft store. Done once per well. ROP, the DRILLING_STATES mask and
+    the ROP_MIN / ROP_MAX bounds are applied here so every run on the well
+    only has to slice by depth. Returns columns hole_depth, state, rop,
+    tvd, drillstring_id (only on-bottom drilling feet with a sane ROP).
+    """
+    flat = records if isinstance(records, pd.DataFrame) else flatten_1ft_records(records)
+    hole_depth = flat["hole_depth"].to_numpy(dtype=float)
+    tvd = flat["true_vertical_depth_mean"].to_numpy(dtype=float)
+    state = flat["state_max"].to_numpy(dtype=object)
+    ds_ids = flat["drillstring"].to_numpy(dtype=object)
+
+    dt = (flat["timestamp_max"].to_numpy(dtype=float)
+          - flat["timestamp_min"].to_numpy(dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rop = np.where(dt > 0, 3600.0 / dt, np.nan)
+
+    keep = (
+        flat["state_max"].isin(DRILLING_STATES).to_numpy()
+        & ~np.isnan(hole_depth)
+        & (rop >= ROP_MIN)
+        & (rop <= ROP_MAX)
+    )
+    return pd.DataFrame({
+        "hole_depth": hole_depth[keep],
+        "state": state[keep],
+        "rop": rop[keep],
+        "tvd": tvd[keep],
+        "drillstring_id": ds_ids[keep],
+    })
+
+
+def _round1(values):
+    """Round to 0.1 with Python's round(), as the dict path does.
+
+    np.round() scales by 10 first, so it rounds some .x5 values the other
+    way (round(0.15, 1) == 0.1, np.round(0.15, 1) == 0.2).
+    """
+    return np.array([round(v, 1) for v in values.tolist()], dtype=float)
+
+
+def process_run_columnar(run, well_df, lateral_starts, mode="lateral",
+                         formation_tops_by_asset=None, formation_indexes=None):
+    """Columnar equivalent of process_run_from_cache().
+
+    Takes the well frame from prepare_well_frame() and returns a DataFrame
+    with the same columns, in the same order, as the dict-based path.
+    Vertical mode maps TVDs with formation_indexes (from
+    build_formation_indexes) when given, else indexes the well's tops here.
+    """
+    asset_id = run["asset_id"]
+    start_depth = float(run["start_depth"])
+    end_depth = float(run["end_depth"])
+    lateral_start = lateral_starts.get(asset_id, start_depth)
+    effective_run_start = max(start_depth, lateral_start) if mode == "lateral" else start_depth
+
+    hd = well_df["hole_depth"].to_numpy()
+    mask = (hd >= start_depth) & (hd <= end_depth)
+    if mode == "lateral":
+        mask &= hd >= effective_run_start
+    sub = well_df[mask]
+    hd = sub["hole_depth"].to_numpy()
+    n = len(sub)
+
+    out = {}
+    for col, key, default in _RUN_META_COLUMNS:
+        out[col] = np.full(n, run.get(key, default), dtype=object)
+
+    out["hole_depth"] = _round1(hd)
+    if mode == "lateral":
+        out["distance_from_run_start"] = _round1(hd - lateral_start)
+    else:
+        out["distance_from_run_start"] = _round1(hd - effective_run_start)
+    out["state"] = sub["state"].to_numpy()
+    out["rop_ft_hr"] = _round1(sub["rop"].to_numpy())
+    out["tvd"] = _round1(sub["tvd"].to_numpy())
+    out["drillstring_id"] = sub["drillstring_id"].to_numpy()
+
+    if mode == "lateral":
+        out["distance_from_lateral_start"] = out["distance_from_run_start"].copy()
+    elif mode == "vertical":
+        if formation_indexes is not None:
+            fm_index = formation_indexes.get(asset_id)
+        else:
+            fm_index = build_formation_index(
+                (formation_tops_by_asset or {}).get(asset_id, []))
+        fm_names, fm_pcts, fm_segments = map_tvds_to_formations(
+            fm_index, sub["tvd"].to_numpy(), FORMATION_SEGMENT_PCT)
+        fm_names[pd.isna(fm_names)] = ""
+        out["formation_name"] = fm_names
+        out["formation_pct"] = fm_pcts
+        out["formation_segment"] = pd.array(fm_segments, dtype="Int64")
+
+    return pd.DataFrame(out)
+
+
+# ---------------------------------------------------------------------------
+#  Output summary (works on whole frames or per-well chunks when streaming)
+# ---------------------------------------------------------------------------
+
+def new_1ft_summary():
+    """Empty running summary for merge_1ft_summary()."""
+    return {"rows": 0, "states": Counter(), "formations": Counter(),
+            "unmapped": 0, "equiv_keys": Counter()}
+
+
+def summarize_1ft(df):
+    """Count states, formations and equivalent-BHA keys in processed 1ft rows."""
+    summary = new_1ft_summary()
+    summary["rows"] = len(df)
+    summary["states"].update(df["state"].value_counts(sort=False).to_dict())
+    if "formation_name" in df.columns:
+        fm_names = df["formation_name"].fillna("").astype(str)
+        summary["formations"].update(
+            fm_names[fm_names != ""].value_counts(sort=False).to_dict())
+        summary["unmapped"] = int((fm_names == "").sum())
+    summary["equiv_keys"].update(
+        df["equiv_bha_key"].fillna("?").value_counts(sort=False).to_dict())
+    return summary
+
+
+def merge_1ft_summary(total, part):
+    """Add a chunk's summary into the running total (in place)."""
+    total["rows"] += part["rows"]
+    total["unmapped"] += part["unmapped"]
+    for key in ("states", "formations", "equiv_keys"):
+        total[key].update(part[key])
+
+
+def print_1ft_summary(summary, mode):
+    """Print the feet-by-state / formation / equivalent-BHA breakdown."""
+    rotary_count = summary["states"].get("Rotary Drilling", 0)
+    slide_count = summary["states"].get("Slide Drilling", 0)
+    print(f"  Rotary feet: {rotary_count:,}")
+    print(f"  Slide feet:  {slide_count:,}")
+    if rotary_count + slide_count:
+        print(f"  Slide %:     {100 * slide_count / (rotary_count + slide_count):.1f}%")
+
+    # Formation mapping stats (vertical mode)
+    if mode == "vertical":
+        mapped = summary["rows"] - summary["unmapped"]
+        print(f"  Mapped to formation: {mapped:,}")
+        if summary["unmapped"]:
+            print(f"  Unmapped (no formation data): {summary['unmapped']:,}")
+
+        if summary["formations"]:
+            print(f"\n  Feet by formation:")
+            for fm, cnt in sorted(summary["formations"].items(), key=lambda x: -x[1]):
+                print(f"    {fm:<30} {cnt:>7,} feet")
+
+    # Group key summary
+    print(f"\n  Records by Equivalent BHA:")
+    for key, cnt in sorted(summary["equiv_keys"].items(), key=lambda x: -x[1]):
+        print(f"    {key:<30} {cnt:>7,} feet")
+
+
 # ---------------------------------------------------------------------------
 #  Caching: load previously-fetched run data from existing CSV
 # ---------------------------------------------------------------------------
@@ -486,6 +758,20 @@ def build_equiv_keys(runs):
         r["_equiv_key"] = f"{bit_key} | {motor_key}"
 
 
+def checkpoint_job_key(mode, output_dir, runs):
+    """Stable key for a pull job: same runs + mode + output dir -> same key.
+
+    A restart with unchanged inputs resumes from the checkpoint journal; any
+    change to the run set starts a fresh job.
+    """
+    h = hashlib.sha1()
+    h.update(f"{mode}|{os.path.abspath(output_dir)}".encode())
+    for r in sorted(runs, key=lambda r: (r["asset_id"], r.get("bha_number", ""))):
+        h.update(f"|{r['asset_id']}:{r.get('bha_number', '')}:"
+                 f"{r['start_depth']}:{r['end_depth']}".encode())
+    return h.hexdigest()[:16]
+
+
 def main():
     # Parse arguments
     csv_path = None
@@ -493,6 +779,13 @@ def main():
     formations_csv = None
     output_dir = None
     export_csv = False
+    engine = "columnar"
+    use_store = True
+    refresh_store = False
+    fetch_backend = "threads"
+    output_format = "csv"
+    write_csv = False
+    resume = True
 
     args = sys.argv[1:]
     i = 0
@@ -509,6 +802,27 @@ def main():
         elif args[i] == "--export-csv":
             export_csv = True
             i += 1
+        elif args[i] == "--no-store":
+            use_store = False
+            i += 1
+        elif args[i] == "--refresh-store":
+            refresh_store = True
+            i += 1
+        elif args[i] == "--output" and i + 1 < len(args):
+            output_format = args[i + 1].lower()
+            i += 2
+        elif args[i] == "--csv":
+            write_csv = True
+            i += 1
+        elif args[i] == "--no-resume":
+            resume = False
+            i += 1
+        elif args[i] == "--fetch" and i + 1 < len(args):
+            fetch_backend = args[i + 1].lower()
+            i += 2
+        elif args[i] == "--engine" and i + 1 < len(args):
+            engine = args[i + 1].lower()
+            i += 2
         elif not args[i].startswith("--"):
             csv_path = args[i]
             i += 1
@@ -530,6 +844,16 @@ def main():
         print(f"ERROR: {csv_path} not found")
         sys.exit(1)
 
+    if engine not in ("columnar", "rows"):
+        print(f"ERROR: Unknown --engine '{engine}' (expected columnar or rows)")
+        sys.exit(1)
+    if output_format not in ("csv", "parquet"):
+        print(f"ERROR: Unknown --output '{output_format}' (expected csv or parquet)")
+        sys.exit(1)
+    if fetch_backend not in ("threads", "async"):
+        print(f"ERROR: Unknown --fetch '{fetch_backend}' (expected threads or async)")
+        sys.exit(1)
+
     # Load formation tops if in vertical mode
     formation_tops_by_asset = None
     if mode == "vertical":
@@ -607,7 +931,9 @@ def main():
     if mode == "vertical" and formation_tops_by_asset:
         matched = sum(1 for r in valid_runs if r["asset_id"] in formation_tops_by_asset)
         print(f"  Runs with formation data: {matched}/{len(valid_runs)}")
-    print(f"  Batch size: {BATCH_SIZE} | Workers: {MAX_WORKERS}")
+    print(f"  Batch size: {BATCH_SIZE} | Workers: {MAX_WORKERS} "
+          f"(adaptive, max {MAX_WORKERS_CEILING}) | "
+          f"Fetch: {fetch_backend} | Engine: {engine}")
     print(f"{'=' * 80}\n")
 
     t0 = time.time()
@@ -646,11 +972,59 @@ def main():
     else:
         print(f"  No cached data found, fetching all {len(valid_runs)} runs")
 
+    cached_df = pd.DataFrame(cached_rows)
+
+    suffix = "vertical" if mode == "vertical" else ""
+    out_name = f"rop_1ft_data{'_' + suffix if suffix else ''}.csv"
+    out_path = os.path.join(output_dir, out_name)
+    section_name = os.path.basename(output_dir) if output_dir != "." else "default"
+    latest = db.get_latest_run()
+    rid = latest["id"] if latest else None
+
+    # Streaming output: each well's rows go straight to Parquet (and the
+    # optional CSV) as soon as they are processed; nothing is accumulated.
+    writer = None
+    csv_file = None
+    summary = new_1ft_summary()
+    if output_format == "parquet":
+        writer = db.open_1ft_writer(section_name, mode=mode, run_id=rid)
+        if write_csv:
+            try:
+                csv_file = open(out_path, "w", newline="", encoding="utf-8")
+            except PermissionError:
+                out_path = out_path.replace(".csv", f"_{int(time.time())}.csv")
+                print(f"  WARNING: File locked. Writing CSV to: {out_path}")
+                csv_file = open(out_path, "w", newline="", encoding="utf-8")
+
+    def _emit(df):
+        """Write one well's (or the cache's) processed rows in streaming mode."""
+        if df.empty:
+            return
+        writer.write(df)
+        if csv_file is not None:
+            df.to_csv(csv_file, index=False, header=csv_file.tell() == 0)
+        merge_1ft_summary(summary, summarize_1ft(df))
+
+    if writer is not None:
+        _emit(cached_df)
+
+    formation_indexes = (build_formation_indexes(formation_tops_by_asset)
+                         if mode == "vertical" else None)
+
+    # Checkpoint journal (db pull_1ft_checkpoints): wells fetched by an
+    # interrupted earlier attempt at this same job are reloaded, not refetched.
+    job_key = checkpoint_job_key(mode, output_dir, fresh_runs) if fresh_runs else None
+    checkpoints = {}
+    if job_key:
+        if not resume:
+            db.clear_1ft_checkpoints(job_key)
+        checkpoints = db.get_1ft_checkpoints(job_key)
+
     if not fresh_runs:
         # All data is cached -- skip API entirely
         elapsed = time.time() - t0
-        all_1ft_rows = cached_rows
-        print(f"\n  All data from cache! {len(all_1ft_rows):,} rows in {elapsed:.1f}s")
+        all_1ft_df = cached_df
+        print(f"\n  All data from cache! {len(all_1ft_df):,} rows in {elapsed:.1f}s")
     else:
         # ── Phase 1: Fetch raw data per WELL (parallel, 20 workers) ──
         # Group fresh runs by asset_id to fetch once per well
@@ -666,124 +1040,272 @@ def main():
             well_ranges[asset_id] = (min_d, max_d)
 
         well_ids = list(wells.keys())
-        print(f"\n  Phase 1: Fetching {len(well_ids)} wells "
-              f"({len(fresh_runs)} runs) with {MAX_WORKERS} workers...")
 
-        well_data = {}  # asset_id -> list of raw API records
+        # Journalled wells resume from the 1ft store if it still covers
+        # their range, else from their spool; anything else is refetched.
+        resume_from = {}
+        for aid in well_ids:
+            if aid not in checkpoints:
+                continue
+            min_d, max_d = well_ranges[aid]
+            if use_store and not db.get_1ft_missing_intervals(aid, min_d, max_d):
+                resume_from[aid] = "store"
+            elif checkpoints[aid]["spooled"]:
+                resume_from[aid] = "spool"
+        resumed_ids = [aid for aid in well_ids if aid in resume_from]
+        fetch_ids = [aid for aid in well_ids if aid not in resume_from]
+        if resumed_ids:
+            resumed_recs = sum(checkpoints[aid]["record_count"] or 0 for aid in resumed_ids)
+            print(f"\n  Resuming job {job_key}: {len(resumed_ids)}/{len(well_ids)} wells "
+                  f"already fetched ({resumed_recs:,} records checkpointed)")
+        print(f"\n  Phase 1: Fetching {len(fetch_ids)} wells "
+              f"({len(fresh_runs)} runs), adaptive concurrency starting at "
+              f"{MAX_WORKERS} (max {MAX_WORKERS_CEILING})...")
+        if fetch_backend == "async":
+            from adaptive_limiter import AsyncAdaptiveLimiter
+            limiter = AsyncAdaptiveLimiter(initial=MAX_WORKERS,
+                                           max_limit=MAX_WORKERS_CEILING)
+        else:
+            limiter = _get_limiter()
+        if use_store and refresh_store:
+            for aid in fetch_ids:
+                db.clear_1ft_store(aid)
+            print(f"  1ft store: cleared {len(fetch_ids)} wells (--refresh-store)")
+
+        # asset_id -> prepared well frame (columnar) or flat 1ft frame (rows).
+        # Each well is handed to processing as soon as its fetch completes.
+        well_frames = {}
         completed_wells = 0
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {}
-            for aid in well_ids:
+        total_recs = 0
+        store_hits = 0
+        gap_requests = 0
+
+        def _process_well(aid, frame):
+            """Process every fresh run on one well (in fresh_runs order)."""
+            if engine == "columnar":
+                return pd.concat([
+                    process_run_columnar(
+                        run, frame, lateral_starts,
+                        mode=mode,
+                        formation_tops_by_asset=formation_tops_by_asset,
+                        formation_indexes=formation_indexes,
+                    )
+                    for run in wells[aid]
+                ], ignore_index=True)
+            records = frame_to_1ft_records(frame)
+            rows = []
+            for run in wells[aid]:
+                rows.extend(process_run_from_cache(
+                    run, records, lateral_starts,
+                    mode=mode,
+                    formation_tops_by_asset=formation_tops_by_asset,
+                ))
+            return pd.DataFrame(rows)
+
+        streamed_rows = 0
+
+        def _on_well_done(aid, flat, n_gaps, complete=True, resumed=False):
+            nonlocal completed_wells, total_recs, store_hits, gap_requests, streamed_rows
+            if complete and not resumed:
+                min_d, max_d = well_ranges[aid]
+                db.save_1ft_checkpoint(job_key, aid, flat, min_d, max_d,
+                                       spool=not use_store)
+            frame = prepare_well_frame(flat) if engine == "columnar" else flat
+            if writer is not None:
+                out = _process_well(aid, frame)
+                _emit(out)
+                streamed_rows += len(out)
+            else:
+                well_frames[aid] = frame
+            total_recs += len(flat)
+            if not resumed:
+                gap_requests += n_gaps
+                if n_gaps == 0:
+                    store_hits += 1
+            completed_wells += 1
+            if completed_wells % 10 == 0 or completed_wells == len(well_ids):
+                elapsed = time.time() - t0
+                print(f"  {completed_wells}/{len(well_ids)} wells fetched, "
+                      f"{total_recs:,} raw records, {elapsed:.0f}s | {limiter.status()}")
+
+        for aid in resumed_ids:
+            if resume_from[aid] == "store":
+                flat = db.load_1ft_records(aid, *well_ranges[aid])
+            else:
+                flat = db.load_1ft_checkpoint(job_key, aid)
+            _on_well_done(aid, flat, 0, resumed=True)
+
+        if fetch_backend == "async":
+            from fetch_1ft_async import fetch_1ft_ranges
+
+            ranges_by_well = {}
+            for aid in fetch_ids:
                 min_d, max_d = well_ranges[aid]
-                future = executor.submit(fetch_well_1ft, aid, min_d, max_d)
-                futures[future] = aid
+                ranges_by_well[aid] = (
+                    db.get_1ft_missing_intervals(aid, min_d, max_d)
+                    if use_store else [(min_d, max_d)]
+                )
 
-            for future in as_completed(futures):
-                aid = futures[future]
+            def _on_async_well(aid, results):
+                complete = all(r[3] for r in results)
                 try:
-                    records = future.result()
-                    well_data[aid] = records
+                    gap_results = [
+                        (lo, hi,
+                         pd.concat(chunks, ignore_index=True) if chunks
+                         else flatten_1ft_records([]),
+                         complete)
+                        for lo, hi, chunks, complete in results
+                    ]
+                    if use_store:
+                        min_d, max_d = well_ranges[aid]
+                        flat = assemble_stored_well(aid, min_d, max_d, gap_results)
+                    else:
+                        flat = gap_results[0][2]
+                        if not gap_results[0][3]:
+                            print(f"  WARNING: incomplete 1ft fetch for well {aid}")
                 except Exception as e:
                     print(f"  ERROR fetching well {aid}: {e}")
-                    well_data[aid] = []
-
-                completed_wells += 1
-                if completed_wells % 10 == 0 or completed_wells == len(well_ids):
-                    elapsed = time.time() - t0
-                    total_recs = sum(len(v) for v in well_data.values())
-                    print(f"  {completed_wells}/{len(well_ids)} wells fetched, "
-                          f"{total_recs:,} raw records, {elapsed:.0f}s")
+                    flat, complete = flatten_1ft_records([]), False
+                try:
+                    _on_well_done(aid, flat, len(results), complete)
+                except Exception as e:
+                    print(f"  ERROR processing well {aid}: {e}")
+
+            for aid, ranges in ranges_by_well.items():
+                if not ranges:
+                    _on_async_well(aid, [])
+            stats = fetch_1ft_ranges(
+                {aid: r for aid, r in ranges_by_well.items() if r},
+                FIELDS_1FT, flatten_1ft_records, _on_async_well,
+                page_size=BATCH_SIZE, limiter=limiter,
+            )
+            print(f"  Async fetch: {stats['requests']:,} requests, "
+                  f"{stats['retries']} retries, {stats['failed']} failed pages")
+        else:
+            def _fetch(aid, min_d, max_d):
+                if use_store:
+                    return fetch_well_1ft_stored(aid, min_d, max_d)
+                records, complete = _fetch_1ft_range(aid, min_d, max_d)
+                return flatten_1ft_records(records), 1, complete
+
+            # Pool sized to the ceiling; the limiter decides how many
+            # requests are actually in flight.
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS_CEILING) as executor:
+                futures = {}
+                for aid in fetch_ids:
+                    min_d, max_d = well_ranges[aid]
+                    future = executor.submit(_fetch, aid, min_d, max_d)
+                    futures[future] = aid
+
+                for future in as_completed(futures):
+                    aid = futures[future]
+                    try:
+                        flat, n_gaps, complete = future.result()
+                    except Exception as e:
+                        print(f"  ERROR fetching well {aid}: {e}")
+                        flat, n_gaps, complete = flatten_1ft_records([]), 1, False
+                    try:
+                        _on_well_done(aid, flat, n_gaps, complete)
+                    except Exception as e:
+                        print(f"  ERROR processing well {aid}: {e}")
 
         fetch_elapsed = time.time() - t0
-        total_recs = sum(len(v) for v in well_data.values())
         print(f"\n  Phase 1 complete: {total_recs:,} raw records "
-              f"from {len(well_data)} wells in {fetch_elapsed:.1f}s")
+              f"from {completed_wells} wells in {fetch_elapsed:.1f}s")
+        if use_store:
+            print(f"  1ft store: {store_hits} wells served entirely from store, "
+                  f"{gap_requests} depth gaps fetched from API")
 
         # ── Phase 2: Process per run from in-memory data (CPU only) ──
-        print(f"\n  Phase 2: Processing {len(fresh_runs)} runs...")
         t1 = time.time()
-
-        fresh_rows = []
-        for run in fresh_runs:
-            asset_id = run["asset_id"]
-            records = well_data.get(asset_id, [])
-            rows = process_run_from_cache(
-                run, records, lateral_starts,
-                mode=mode,
-                formation_tops_by_asset=formation_tops_by_asset,
-            )
-            fresh_rows.extend(rows)
-
-        proc_elapsed = time.time() - t1
-        print(f"  Phase 2 complete: {len(fresh_rows):,} processed rows "
-              f"in {proc_elapsed:.1f}s")
-
-        # Combine cached + fresh
-        all_1ft_rows = cached_rows + fresh_rows
+        if writer is not None:
+            print(f"\n  Phase 2: {streamed_rows:,} processed rows streamed "
+                  f"during Phase 1")
+            fresh_df = None
+        elif engine == "columnar":
+            print(f"\n  Phase 2: Processing {len(fresh_runs)} runs...")
+            # Well frames were prepared once per well in Phase 1; runs are slices
+            run_frames = [
+                process_run_columnar(
+                    run, well_frames.get(run["asset_id"], prepare_well_frame([])),
+                    lateral_starts,
+                    mode=mode,
+                    formation_tops_by_asset=formation_tops_by_asset,
+                    formation_indexes=formation_indexes,
+                )
+                for run in fresh_runs
+            ]
+            fresh_df = pd.concat(run_frames, ignore_index=True)
+        else:
+            print(f"\n  Phase 2: Processing {len(fresh_runs)} runs...")
+            well_records = {aid: frame_to_1ft_records(flat)
+                            for aid, flat in well_frames.items()}
+            fresh_rows = []
+            for run in fresh_runs:
+                asset_id = run["asset_id"]
+                records = well_records.get(asset_id, [])
+                rows = process_run_from_cache(
+                    run, records, lateral_starts,
+                    mode=mode,
+                    formation_tops_by_asset=formation_tops_by_asset,
+                )
+                fresh_rows.extend(rows)
+            fresh_df = pd.DataFrame(fresh_rows)
+
+        if fresh_df is not None:
+            proc_elapsed = time.time() - t1
+            print(f"  Phase 2 complete: {len(fresh_df):,} processed rows "
+                  f"in {proc_elapsed:.1f}s")
+
+            # Combine cached + fresh
+            if len(cached_df):
+                all_1ft_df = pd.concat([cached_df, fresh_df], ignore_index=True)
+            else:
+                all_1ft_df = fresh_df
+
+    if writer is not None:
+        if csv_file is not None:
+            csv_file.close()
+        elapsed = time.time() - t0
+        print(f"\n  Done: {summary['rows']:,} total 1ft drilling records in {elapsed:.1f}s")
+        corva_client.print_metrics()
+        if not summary["rows"]:
+            writer.abort()
+            print("\nNo 1ft data retrieved.")
+            return
+        print_1ft_summary(summary, mode)
+        writer.close()
+        if job_key:
+            db.clear_1ft_checkpoints(job_key)
+        if csv_file is not None:
+            print(f"\n  Saved to: {out_path}")
+        if export_csv:
+            db.export_csv(db.load_1ft_data(section_name, mode=mode, run_id=rid),
+                          f"rop_1ft_data{'_' + suffix if suffix else ''}")
+        return
 
     elapsed = time.time() - t0
-    print(f"\n  Done: {len(all_1ft_rows):,} total 1ft drilling records in {elapsed:.1f}s")
-
-    # Stats
-    rotary_count = sum(1 for r in all_1ft_rows if r.get("state") == "Rotary Drilling")
-    slide_count = sum(1 for r in all_1ft_rows if r.get("state") == "Slide Drilling")
-    print(f"  Rotary feet: {rotary_count:,}")
-    print(f"  Slide feet:  {slide_count:,}")
-    if rotary_count + slide_count:
-        print(f"  Slide %:     {100 * slide_count / (rotary_count + slide_count):.1f}%")
+    print(f"\n  Done: {len(all_1ft_df):,} total 1ft drilling records in {elapsed:.1f}s")
+    corva_client.print_metrics()
 
-    # Formation mapping stats (vertical mode)
-    if mode == "vertical":
-        mapped = sum(1 for r in all_1ft_rows if r.get("formation_name"))
-        unmapped = len(all_1ft_rows) - mapped
-        print(f"  Mapped to formation: {mapped:,}")
-        if unmapped:
-            print(f"  Unmapped (no formation data): {unmapped:,}")
-
-        fm_counts = defaultdict(int)
-        for r in all_1ft_rows:
-            if r.get("formation_name"):
-                fm_counts[r["formation_name"]] += 1
-        if fm_counts:
-            print(f"\n  Feet by formation:")
-            for fm, cnt in sorted(fm_counts.items(), key=lambda x: -x[1]):
-                print(f"    {fm:<30} {cnt:>7,} feet")
-
-    # Group key summary
-    key_counts = defaultdict(int)
-    for r in all_1ft_rows:
-        key_counts[r.get("equiv_bha_key", "?")] += 1
-    print(f"\n  Records by Equivalent BHA:")
-    for key, cnt in sorted(key_counts.items(), key=lambda x: -x[1]):
-        print(f"    {key:<30} {cnt:>7,} feet")
-
-    # Save
-    if not all_1ft_rows:
+    if all_1ft_df.empty:
         print("\nNo 1ft data retrieved.")
         return
 
-    suffix = "vertical" if mode == "vertical" else ""
-    out_name = f"rop_1ft_data{'_' + suffix if suffix else ''}.csv"
-    out_path = os.path.join(output_dir, out_name)
-    fieldnames = list(all_1ft_rows[0].keys())
+    print_1ft_summary(summarize_1ft(all_1ft_df), mode)
+
+    # Save
     try:
-        with open(out_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(all_1ft_rows)
+        all_1ft_df.to_csv(out_path, index=False)
         print(f"\n  Saved to: {out_path}")
     except PermissionError:
         backup = out_path.replace(".csv", f"_{int(time.time())}.csv")
-        with open(backup, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(all_1ft_rows)
+        all_1ft_df.to_csv(backup, index=False)
         print(f"\n  WARNING: File locked. Saved to: {backup}")
 
     # Save as Parquet for faster subsequent reads (scoped by run_id)
     try:
-        df = pd.DataFrame(all_1ft_rows)
+        df = all_1ft_df.copy()
         # Normalize numeric columns (cached rows from CSV are strings)
         numeric_cols = ["hole_depth", "distance_from_run_start", "rop_ft_hr",
                         "tvd", "distance_from_lateral_start",
@@ -791,16 +1313,16 @@ def main():
         for col in numeric_cols:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors="coerce")
-        section_name = os.path.basename(output_dir) if output_dir != "." else "default"
-        latest = db.get_latest_run()
-        rid = latest["id"] if latest else None
         db.save_1ft_data(section_name, df, mode=mode, run_id=rid)
     except Exception as e:
         print(f"  Parquet save warning: {e}")
 
+    # Output is on disk -- the checkpoint journal for this job is done
+    if job_key:
+        db.clear_1ft_checkpoints(job_key)
+
     if export_csv:
-        suffix = "_vertical" if mode == "vertical" else ""
-        db.export_csv(all_1ft_rows, f"rop_1ft_data{suffix}")
+        db.export_csv(all_1ft_df, f"rop_1ft_data{'_' + suffix if suffix else ''}")
 
 
 if __name__ == "__main__":
@@ -9,82 +9,36 @@ each drilled foot to a formation position (% through the formation).
 
 Usage:
     python pull_formation_tops.py [wells_csv_or_bha_csv]
+    python pull_formation_tops.py [wells_csv_or_bha_csv] --offline        # cached API responses only
+    python pull_formation_tops.py [wells_csv_or_bha_csv] --refresh-cache  # re-download, update cache
 """
 import csv
-import json
 import os
 import sys
 import time
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dotenv import load_dotenv
 
 import requests
 
+import corva_client
 import db
 
-load_dotenv()
-
-API_KEY = os.getenv("CORVA_API_KEY")
-DATA_API = "https://data.corva.ai"
-HEADERS = {"Authorization": f"API {API_KEY}"}
-
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
-def fetch_formations(asset_id, max_retries=3):
-    """Fetch formation tops for a single well from corva#data.formations."""
-    all_records = []
-    skip = 0
-    batch = 100
-
-    query = {"asset_id": int(asset_id)}
-
-    for attempt in range(max_retries):
-        try:
-            r = requests.get(
-                f"{DATA_API}/api/v1/data/corva/data.formations/",
-                headers=HEADERS,
-                params={
-                    "limit": batch,
-                    "skip": skip,
-                    "sort": json.dumps({"data.md": 1}),
-                    "query": json.dumps(query),
-                    "fields": "data.formation_name,data.md,data.td,data.lithology",
-                },
-                timeout=30,
-            )
-            if r.status_code == 200:
-                records = r.json()
-                all_records.extend(records)
-                # Paginate if full batch
-                while len(records) == batch:
-                    skip += batch
-                    r = requests.get(
-                        f"{DATA_API}/api/v1/data/corva/data.formations/",
-                        headers=HEADERS,
-                        params={
-                            "limit": batch,
-                            "skip": skip,
-                            "sort": json.dumps({"data.md": 1}),
-                            "query": json.dumps(query),
-                            "fields": "data.formation_name,data.md,data.td,data.lithology",
-                        },
-                        timeout=30,
-                    )
-                    if r.status_code != 200:
-                        break
-                    records = r.json()
-                    all_records.extend(records)
-                break
-            if r.status_code == 429:
-                time.sleep(2 ** attempt)
-                continue
-            break
-        except requests.exceptions.RequestException:
-            time.sleep(2 ** attempt)
-
-    return all_records
+def fetch_formations(asset_id, completed=False):
+    """Fetch formation tops for a single well from corva#data.formations.
+
+    Retries on 429/5xx are handled by the shared corva_client session.
+    """
+    return corva_client.fetch_all(
+        "data.formations", {"asset_id": int(asset_id)},
+        sort={"data.md": 1},
+        fields="data.formation_name,data.md,data.td,data.lithology",
+        page_size=100,
+        cache=True, completed=completed,
+    )
 
 
 def parse_formation_tops(records):
@@ -145,9 +99,9 @@ def compute_thicknesses(tops, section_end_md=None):
     return tops
 
 
-def process_well(asset_id, well_name=""):
+def process_well(asset_id, well_name="", completed=False):
     """Fetch and parse formation tops for a single well."""
-    records = fetch_formations(asset_id)
+    records = fetch_formations(asset_id, completed)
     if not records:
         return []
 
@@ -163,20 +117,27 @@ def process_well(asset_id, well_name=""):
 
 
 def load_wells_from_csv(csv_path):
-    """Load unique (asset_id, well_name) pairs from any CSV with those columns."""
+    """Load unique (asset_id, well_name) pairs from any CSV with those columns.
+
+    Also returns the set of asset_ids whose well_state column (offset well
+    CSVs) marks them completed, for the longer response cache TTL.
+    """
     wells = {}
+    completed_ids = set()
     with open(csv_path, encoding="utf-8") as f:
         for row in csv.DictReader(f):
             aid = row.get("asset_id", "").strip()
             name = row.get("well_name", "").strip()
             if aid and aid not in wells:
                 wells[aid] = name
-    return wells
+                if corva_client.is_completed(row.get("well_state")):
+                    completed_ids.add(aid)
+    return wells, completed_ids
 
 
 def main():
     export_csv_flag = "--export-csv" in sys.argv
-    sys.argv = [a for a in sys.argv if a != "--export-csv"]
+    sys.argv = corva_client.apply_cache_flags([a for a in sys.argv if a != "--export-csv"])
 
     if len(sys.argv) > 1:
         csv_path = sys.argv[1]
@@ -189,7 +150,7 @@ def main():
         print(f"ERROR: {csv_path} not found")
         sys.exit(1)
 
-    wells = load_wells_from_csv(csv_path)
+    wells, completed_ids = load_wells_from_csv(csv_path)
     print(f"\n{'=' * 70}")
     print(f"  PULL FORMATION TOPS")
     print(f"  Input: {os.path.basename(csv_path)}")
@@ -200,6 +161,7 @@ def main():
     t0 = time.time()
     completed = 0
     wells_with_data = 0
+    failed_wells = []
 
     max_workers = 10
     print(f"  Fetching formation data with {max_workers} parallel workers...")
@@ -207,7 +169,7 @@ def main():
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {}
         for aid, wname in wells.items():
-            future = executor.submit(process_well, aid, wname)
+            future = executor.submit(process_well, aid, wname, aid in completed_ids)
             futures[future] = (aid, wname)
 
         for future in as_completed(futures):
@@ -217,6 +179,14 @@ def main():
                 if tops:
                     all_tops.extend(tops)
                     wells_with_data += 1
+            except corva_client.OfflineCacheMiss as e:
+                print(f"  ERROR: offline cache miss for {wname} ({aid}): {e}")
+                executor.shutdown(cancel_futures=True)
+                sys.exit(1)
+            except requests.exceptions.RequestException as e:
+                # Skip the well rather than save its tops from a partial fetch
+                print(f"  ERROR: formation fetch failed for {wname} ({aid}): {e}")
+                failed_wells.append(aid)
             except Exception as e:
                 print(f"  ERROR on {wname} ({aid}): {e}")
 
@@ -229,6 +199,7 @@ def main():
     elapsed = time.time() - t0
     print(f"\n  Done: {len(all_tops)} formation tops from "
           f"{wells_with_data}/{len(wells)} wells in {elapsed:.1f}s")
+    corva_client.print_metrics()
 
     # Summary: most common formations
     fm_counts = defaultdict(int)
@@ -241,6 +212,9 @@ def main():
     wells_missing = len(wells) - wells_with_data
     if wells_missing > 0:
         print(f"\n  WARNING: {wells_missing} wells had no formation data")
+    if failed_wells:
+        print(f"  WARNING: {len(failed_wells)} wells skipped after failed API requests: "
+              f"{', '.join(sorted(failed_wells))}")
 
     # Save
     if not all_tops:
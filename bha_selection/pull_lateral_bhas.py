@@ -11,26 +11,21 @@ Usage:
     python pull_lateral_bhas.py [wells_csv] --section-type intermediate
     python pull_lateral_bhas.py [wells_csv] --all-runs              # no section filter
     python pull_lateral_bhas.py [wells_csv] --export-csv            # also export to exports/
+    python pull_lateral_bhas.py [wells_csv] --offline               # cached API responses only
+    python pull_lateral_bhas.py [wells_csv] --refresh-cache         # re-download, update cache
 """
 import csv
-import json
 import os
 import sys
 import time
 from datetime import datetime, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dotenv import load_dotenv
 
 import requests
 
+import corva_client
 import db
 
-load_dotenv()
-
-API_KEY = os.getenv("CORVA_API_KEY")
-DATA_API = "https://data.corva.ai"
-HEADERS = {"Authorization": f"API {API_KEY}"}
-
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Patterns used to match section names from corva#data.well-sections.
@@ -76,47 +71,18 @@ def load_offset_wells(csv_path):
     return wells
 
 
-def fetch_drillstrings(asset_id):
+def fetch_drillstrings(asset_id, completed=False):
     """Fetch ALL drillstring records for an asset."""
-    all_records = []
-    skip = 0
-    batch = 100
-    while True:
-        r = requests.get(
-            f"{DATA_API}/api/v1/data/corva/data.drillstring/",
-            headers=HEADERS,
-            params={
-                "limit": batch,
-                "skip": skip,
-                "sort": json.dumps({"timestamp": 1}),
-                "query": json.dumps({"asset_id": int(asset_id)}),
-            },
-            timeout=30,
-        )
-        if r.status_code != 200:
-            break
-        records = r.json()
-        if not records:
-            break
-        all_records.extend(records)
-        if len(records) < batch:
-            break
-        skip += batch
-    return all_records
-
-
-def fetch_well_sections(asset_id):
+    return corva_client.fetch_all("data.drillstring", {"asset_id": int(asset_id)},
+                                  sort={"timestamp": 1}, page_size=100,
+                                  cache=True, completed=completed)
+
+
+def fetch_well_sections(asset_id, completed=False):
     """Fetch well sections to identify lateral intervals."""
-    r = requests.get(
-        f"{DATA_API}/api/v1/data/corva/data.well-sections/",
-        headers=HEADERS,
-        params={
-            "limit": 20,
-            "sort": json.dumps({"timestamp": 1}),
-            "query": json.dumps({"asset_id": int(asset_id)}),
-        },
-        timeout=30,
-    )
+    r = corva_client.get_data("data.well-sections", {"asset_id": int(asset_id)},
+                              sort={"timestamp": 1}, limit=20,
+                              cache=True, completed=completed)
     if r.status_code == 200:
         return r.json()
     return []
@@ -256,10 +222,11 @@ def process_well(well_row, section_type="lateral", all_runs=False):
     """
     asset_id = well_row["asset_id"]
     well_name = well_row.get("well_name", "N/A")
+    completed = corva_client.is_completed(well_row.get("well_state"))
 
     # Fetch drillstrings and sections
-    drillstrings = fetch_drillstrings(asset_id)
-    sections = fetch_well_sections(asset_id)
+    drillstrings = fetch_drillstrings(asset_id, completed)
+    sections = fetch_well_sections(asset_id, completed)
 
     if all_runs:
         target_sections = []
@@ -337,7 +304,7 @@ def main():
     all_runs = False
     run_id_override = None
     export_csv_flag = "--export-csv" in sys.argv[1:]
-    args = [a for a in sys.argv[1:] if a != "--export-csv"]
+    args = corva_client.apply_cache_flags([a for a in sys.argv[1:] if a != "--export-csv"])
     i = 0
     while i < len(args):
         if args[i] == "--section-type" and i + 1 < len(args):
@@ -387,10 +354,21 @@ def main():
     # Process all wells
     print(f"Processing {len(wells)} wells...")
     all_bhas = []
+    failed_wells = []
     t0 = time.time()
 
     for idx, well in enumerate(wells):
-        bhas = process_well(well, section_type=section_type, all_runs=all_runs)
+        try:
+            bhas = process_well(well, section_type=section_type, all_runs=all_runs)
+        except corva_client.OfflineCacheMiss as e:
+            print(f"ERROR: offline cache miss for asset {well['asset_id']}: {e}")
+            sys.exit(1)
+        except requests.exceptions.RequestException as e:
+            # Skip the well rather than save BHAs from a partial drillstring list
+            print(f"  ERROR: drillstring fetch failed for {well.get('well_name', 'N/A')} "
+                  f"({well['asset_id']}): {e}")
+            failed_wells.append(well["asset_id"])
+            bhas = []
         all_bhas.extend(bhas)
         if (idx + 1) % 10 == 0 or idx == len(wells) - 1:
             label = "all" if all_runs else section_type
@@ -399,6 +377,10 @@ def main():
 
     elapsed = time.time() - t0
     print(f"  Done in {elapsed:.1f}s")
+    if failed_wells:
+        print(f"  WARNING: {len(failed_wells)} wells skipped after failed API requests: "
+              f"{', '.join(failed_wells)}")
+    corva_client.print_metrics()
 
     # Print summary
     print(f"\n{'=' * 70}")
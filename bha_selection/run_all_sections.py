@@ -10,12 +10,16 @@ Steps:
        a. group_equivalent_bhas
        b. pull_1ft_for_runs
        c. normalize_formations (vertical only)
-       d. build_rop_curves
-       e. plot_type_curves
+  6. build_rop_curves for all sections in one process pool (build_all_sections)
+  7. plot_type_curves for each section that built successfully
+  8. Compact the Parquet dataset; with --keep-runs N, also prune runs that
+     no analysis_runs record references
 
 Usage:
     python run_all_sections.py --asset 82512872
     python run_all_sections.py --asset 82512872 --wells offset_wells_15mi.csv --skip-pull
+    python run_all_sections.py --asset 82512872 --skip-pull --skip-1ft --curve-workers 4
+    python run_all_sections.py --asset 82512872 --bootstrap 0     # rankings without CIs
 """
 
 import argparse
@@ -25,6 +29,9 @@ import subprocess
 import sys
 import time
 
+import build_all_sections
+import db
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PYTHON = sys.executable
 
@@ -67,6 +74,16 @@ def main():
                         help="Path to formation_tops_canonical.csv")
     parser.add_argument("--export-csv", action="store_true",
                         help="Pass --export-csv to all subprocess scripts")
+    parser.add_argument("--curve-workers", type=int, default=None,
+                        help="Processes for building section curves "
+                             "(default: one per section up to the CPU count)")
+    parser.add_argument("--bootstrap", type=int, default=1000,
+                        help="Bootstrap iterations for TTD confidence intervals "
+                             "(default: 1000, as the backend pipeline; 0 = off)")
+    parser.add_argument("--keep-runs", type=int, default=0,
+                        help="Prune Parquet data of runs with no analysis_runs "
+                             "record, keeping the newest N of those "
+                             "(default: 0 = no pruning)")
     args = parser.parse_args()
 
     csv_flag = ["--export-csv"] if args.export_csv else []
@@ -159,12 +176,12 @@ def main():
         [PYTHON, os.path.join(SCRIPT_DIR, "parse_bit_motors.py")] + csv_flag,
     )
 
-    # ── Step 5: Per-section pipeline ──
+    # ── Step 5: Per-section prerequisites ──
+    curve_sections = []  # (section, chart label, output dir) with BHA runs
     for section in sections:
         sec_name = section["name"]
         hole_size = section.get("hole_size")
         mode = section.get("mode", "vertical")
-        sec_length = int(section.get("section_length_md", 5000))
         hs_str = f"{hole_size}in" if hole_size else "unknown"
         safe_name = sec_name.replace(" ", "_").replace("/", "-")
 
@@ -208,29 +225,28 @@ def main():
                 pull_cmd,
             )
 
-        # 5c. Build ROP curves
-        if mode == "vertical":
-            onefoot_csv = os.path.join(sec_out_dir, "rop_1ft_data_vertical.csv")
-        else:
-            onefoot_csv = os.path.join(sec_out_dir, "rop_1ft_data.csv")
+        curve_sections.append((section, section_label, sec_out_dir))
 
-        if not os.path.exists(onefoot_csv):
-            print(f"  SKIP curves: {onefoot_csv} not found")
-            continue
+    # ── Step 6: Build ROP curves for all sections in one process pool ──
+    jobs = build_all_sections.section_jobs(
+        [section for section, _, _ in curve_sections],
+        max_missing_formations=args.max_missing_formations,
+        export_csv=args.export_csv,
+        bootstrap_iters=args.bootstrap,
+    )
+    print(f"\n{'=' * 70}")
+    print(f"  BUILD ROP CURVES: {len(jobs)} sections")
+    print(f"{'=' * 70}")
+    t0 = time.time()
+    statuses = build_all_sections.build_sections(jobs, args.curve_workers)
+    print(f"\n  Curves built in {time.time() - t0:.1f}s")
 
-        build_cmd = [
-            PYTHON, os.path.join(SCRIPT_DIR, "build_rop_curves.py"),
-            onefoot_csv,
-            "--mode", mode,
-            "--section-length", str(sec_length),
-            "--output-dir", sec_out_dir,
-        ] + csv_flag
-        if mode == "vertical":
-            build_cmd += ["--max-missing-formations",
-                          str(args.max_missing_formations)]
-        run_step(f"Build ROP curves: {sec_name}", build_cmd)
-
-        # 5d. Plot charts
+    # ── Step 7: Plot charts ──
+    for section, section_label, sec_out_dir in curve_sections:
+        sec_name = section["name"]
+        mode = section.get("mode", "vertical")
+        if statuses.get(sec_name) in ("skipped", "failed"):
+            continue
         chart_out = os.path.join(sec_out_dir, "charts")
         os.makedirs(chart_out, exist_ok=True)
         run_step(
@@ -242,6 +258,9 @@ def main():
              "--section-label", section_label] + csv_flag,
         )
 
+    # ── Step 8: Compact the Parquet dataset (prune only with --keep-runs) ──
+    db.maintain_dataset(args.keep_runs)
+
     # ── Summary ──
     total_time = time.time() - t_start
     print(f"\n{'=' * 70}")
@@ -0,0 +1,201 @@
+"""Compact, array-backed per-run lateral curves.
+
+The per-run step used to produce one nested dict per run:
+
+    {..metadata.., "rotary_curve": {bin: {"median_rop", "count"}},
+     "slide_curve": {...}, "slide_pct_curve": {bin: pct}}
+
+RunCurves keeps a whole section instead as
+
+  - meta:   DataFrame, one row per run (the run_info metadata fields,
+            total / rotary / slide feet), in first-appearance order
+  - grids:  per curve, the sorted bin starts shared by all runs
+  - values: per curve, a (runs x bins) float64 array, NaN = no data
+  - counts: per ROP curve, the matching (runs x bins) int32 foot counts
+
+Group aggregation and the per-run savers read these arrays directly
+(table() yields the long (run, bin, value) form in one step).
+Code that still expects run_info dicts gets RunView objects: read-only
+mappings with the same keys and values, whose curve dicts are built from
+the arrays on access and never stored.
+
+Usage:
+    rc = build_run_curves(df, rotary_bin, slide_bin)   # build_rop_curves.py
+    per_run = rc.as_per_run()                          # {(asset_id, bha_number): RunView}
+    rc = RunCurves.from_runs(per_run.values())         # back to arrays (no copy for one section)
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+ROP_CURVES = ("rotary_curve", "slide_curve")
+CURVES = ROP_CURVES + ("slide_pct_curve",)
+
+
+class RunCurves:
+    """Per-run curves of one section as dense arrays plus a metadata table."""
+
+    def __init__(self, meta, grids, values, counts):
+        self.meta = meta
+        self.grids = grids
+        self.values = values
+        self.counts = counts
+        # Column lists hold plain Python scalars, as run_info dicts did
+        self._cols = {c: meta[c].tolist() for c in meta.columns}
+
+    def __len__(self):
+        return len(self.meta)
+
+    def keys(self):
+        return list(zip(self._cols.get("asset_id", []), self._cols.get("bha_number", [])))
+
+    def field(self, i, name):
+        return self._cols[name][i]
+
+    def curve(self, i, name):
+        """run_info-style curve dict of run i (bins in ascending order)."""
+        row = self.values[name][i]
+        cols = np.flatnonzero(~np.isnan(row))
+        bins = self.grids[name][cols].tolist()
+        vals = row[cols].tolist()
+        if name not in ROP_CURVES:
+            return dict(zip(bins, vals))
+        counts = self.counts[name][i, cols].tolist()
+        return {b: {"median_rop": v, "count": n} for b, v, n in zip(bins, vals, counts)}
+
+    def run_info(self, i):
+        """Full run_info dict of run i."""
+        info = {c: col[i] for c, col in self._cols.items()}
+        for name in CURVES:
+            info[name] = self.curve(i, name)
+        return info
+
+    def views(self):
+        return [RunView(self, i) for i in range(len(self))]
+
+    def as_per_run(self):
+        """{(asset_id, bha_number): RunView} in run order."""
+        return dict(zip(self.keys(), self.views()))
+
+    def table(self, name):
+        """Long form of one curve, ordered by run then bin.
+
+        Returns (run index, bin, value, count) arrays; count is None for
+        slide_pct_curve.
+        """
+        values = self.values[name]
+        runs, cols = np.nonzero(~np.isnan(values))
+        counts = self.counts[name][runs, cols] if name in ROP_CURVES else None
+        return runs, self.grids[name][cols], values[runs, cols], counts
+
+    def take(self, idx):
+        """RunCurves of the runs at positions idx (in that order)."""
+        idx = np.asarray(idx, dtype=np.int64)
+        return RunCurves(
+            self.meta.iloc[idx].reset_index(drop=True),
+            self.grids,
+            {name: v[idx] for name, v in self.values.items()},
+            {name: c[idx] for name, c in self.counts.items()},
+        )
+
+    @classmethod
+    def from_runs(cls, runs):
+        """RunCurves from run_info dicts and/or RunViews, in the given order.
+
+        Views are copied out of their parents' arrays block by block (a
+        single parent is a plain take()); only plain dicts are read through
+        the run_info mapping interface.
+        """
+        runs = list(runs)
+        blocks = {}  # id(parent) -> (parent, positions, row indices)
+        loose = []
+        for pos, r in enumerate(runs):
+            if isinstance(r, RunView):
+                parent, positions, rows = blocks.setdefault(id(r.parent), (r.parent, [], []))
+                positions.append(pos)
+                rows.append(r.index)
+            else:
+                loose.append(pos)
+        if len(blocks) == 1 and not loose:
+            parent, _, rows = next(iter(blocks.values()))
+            return parent.take(rows)
+        if not blocks:
+            return cls._from_dicts(runs)
+
+        parts = list(blocks.values())
+        if loose:
+            parts.append((cls._from_dicts([runs[p] for p in loose]), loose, range(len(loose))))
+        return cls._merge(len(runs), parts)
+
+    @classmethod
+    def _from_dicts(cls, runs):
+        meta = pd.DataFrame([{k: r[k] for k in r if k not in CURVES} for r in runs], dtype=object)
+        grids, values, counts = {}, {}, {}
+        for name in CURVES:
+            curves = [r[name] for r in runs]
+            grid = np.array(sorted({b for c in curves for b in c}), dtype=np.int64)
+            col = {b: j for j, b in enumerate(grid.tolist())}
+            v = np.full((len(runs), len(grid)), np.nan)
+            n = np.zeros((len(runs), len(grid)), dtype=np.int32)
+            for i, c in enumerate(curves):
+                for b, data in c.items():
+                    if name in ROP_CURVES:
+                        v[i, col[b]] = data["median_rop"]
+                        n[i, col[b]] = data["count"]
+                    else:
+                        v[i, col[b]] = data
+            grids[name] = grid
+            values[name] = v
+            if name in ROP_CURVES:
+                counts[name] = n
+        return cls(meta, grids, values, counts)
+
+    @classmethod
+    def _merge(cls, n_runs, parts):
+        """Combine (RunCurves, target positions, row indices) blocks over a union grid."""
+        records = [None] * n_runs
+        for rc, positions, rows in parts:
+            for pos, rec in zip(positions, rc.meta.iloc[list(rows)].to_dict("records")):
+                records[pos] = rec
+        grids, values, counts = {}, {}, {}
+        for name in CURVES:
+            grid = np.unique(np.concatenate([rc.grids[name] for rc, _, _ in parts]))
+            v = np.full((n_runs, len(grid)), np.nan)
+            n = np.zeros((n_runs, len(grid)), dtype=np.int32)
+            for rc, positions, rows in parts:
+                block = np.ix_(positions, np.searchsorted(grid, rc.grids[name]))
+                v[block] = rc.values[name][list(rows)]
+                if name in ROP_CURVES:
+                    n[block] = rc.counts[name][list(rows)]
+            grids[name] = grid
+            values[name] = v
+            if name in ROP_CURVES:
+                counts[name] = n
+        return cls(pd.DataFrame(records, dtype=object), grids, values, counts)
+
+
+class RunView(Mapping):
+    """Read-only run_info mapping backed by one row of a RunCurves."""
+
+    __slots__ = ("parent", "index")
+
+    def __init__(self, parent, index):
+        self.parent = parent
+        self.index = index
+
+    def __getitem__(self, key):
+        if key in CURVES:
+            return self.parent.curve(self.index, key)
+        return self.parent.field(self.index, key)
+
+    def __iter__(self):
+        yield from self.parent.meta.columns
+        yield from CURVES
+
+    def __len__(self):
+        return len(self.parent.meta.columns) + len(CURVES)
+
+    def __repr__(self):
+        return f"RunView({self.get('asset_id')!r}, {self.get('bha_number')!r})"
@@ -0,0 +1,231 @@
+"""Bootstrap confidence intervals for Time-to-TD rankings.
+
+A TTD ranking is one number per equivalent BHA group, computed from the
+group's P50 curves. bootstrap_ttd() measures how much that number (and the
+ranking) depends on which runs happened to be in the group: every
+iteration resamples each group's runs with replacement and redoes the
+steps that turn runs into a TTD, with NumPy over a batch of iterations at
+once instead of re-invoking the dict-based builders:
+
+  1. per bin, P50 of the resampled runs' median ROPs (rounded to 0.1) and
+     the run count, confident at >= min_runs_for_confidence runs
+  2. rolling median smoothing over the bins present in that iteration, in
+     curve order (sliding_median semantics: clipped window at the edges)
+  3. group fallback ROP = median of the confident smoothed P50s
+  4. group slide % from the resampled runs' rotary / slide feet (RSS: 0)
+  5. TTD = sum over steps of length x ((1 - slide %) / rotary ROP +
+     slide % / slide ROP), steps without a rotary ROP contribute nothing
+
+which is what calculate_ttd / calculate_ttd_vertical do for one sample.
+Resampled P50 tables are (iterations, runs, bins); batches are sized to
+keep them around BATCH_ELEMENTS values.
+
+Usage:
+    steps = lateral_steps(10000, rotary_bin, slide_bin)
+    stats = bootstrap_ttd(group_curves, ttd_results, steps, n_iter=1000)
+    stats[group_key]  # {ttd_p10_hours, ttd_p50_hours, ttd_p90_hours, prob_fastest, prob_top3}
+"""
+
+import numpy as np
+
+BATCH_ELEMENTS = 4_000_000  # resampled values per batch (~32 MB of float64)
+
+
+def lateral_steps(target_lateral_length, rotary_bin, slide_bin):
+    """(rotary bin, slide bin, length) of every calculate_ttd step."""
+    step = min(rotary_bin, slide_bin)
+    steps = []
+    for pos in range(0, target_lateral_length, step):
+        steps.append((
+            int(pos // rotary_bin) * rotary_bin,
+            int(pos // slide_bin) * slide_bin,
+            min(step, target_lateral_length - pos),
+        ))
+    return steps
+
+
+def vertical_steps(roadmap, fm_order, section_length_ft, segment_pct):
+    """(rotary key, slide key, length) of every calculate_ttd_vertical segment.
+
+    Section length is split equally across formations, as main_vertical does.
+    """
+    fm_length = section_length_ft / (len(fm_order) if fm_order else 1)
+    seg_len = fm_length / (100 / segment_pct)
+    return [(key, key, seg_len) for key in roadmap]
+
+
+def _nanmedian(a, axis):
+    """Median along axis ignoring NaN (NaN where a slice is all NaN).
+
+    Sorting puts NaN last, so the median of the c valid values is read at
+    positions (c - 1) // 2 and c // 2 -- no masked arrays, no warnings.
+    """
+    s = np.sort(a, axis=axis)
+    count = np.sum(~np.isnan(a), axis=axis, keepdims=True)
+    lo = np.take_along_axis(s, np.maximum(count - 1, 0) // 2, axis=axis)
+    hi = np.take_along_axis(s, count // 2 - (count == 0), axis=axis)
+    med = np.where(count > 0, (lo + hi) / 2, np.nan)
+    return np.squeeze(med, axis=axis)
+
+
+def _run_matrix(run_list, curve_name, bins):
+    """runs x bins array of per-run median ROPs (NaN where a run has no bin)."""
+    col = {b: j for j, b in enumerate(bins)}
+    m = np.full((len(run_list), len(bins)), np.nan)
+    for i, ri in enumerate(run_list):
+        for b, data in ri[curve_name].items():
+            j = col.get(b)
+            if j is not None:
+                m[i, j] = data["median_rop"]
+    return m
+
+
+def _smooth(values, window):
+    """Rolling median of each row over its non-NaN entries, in order.
+
+    Present entries are packed to the front of each row (stable sort on
+    the missing mask), smoothed with a NaN-padded window -- the padding
+    reproduces sliding_median's clipped edges -- and scattered back.
+    """
+    present = ~np.isnan(values)
+    order = np.argsort(~present, axis=1, kind="stable")
+    packed = np.take_along_axis(values, order, axis=1)
+    half = window // 2
+    padded = np.pad(packed, ((0, 0), (half, half)), constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+    smoothed_packed = np.round(_nanmedian(windows, axis=2), 1)
+    out = np.full_like(values, np.nan)
+    np.put_along_axis(out, order, smoothed_packed, axis=1)
+    return np.where(present, out, np.nan)
+
+
+def _step_rops(matrix, idx, step_cols, min_runs, window):
+    """Per-step ROPs (iterations x steps) for one curve type.
+
+    Mirrors ttd_engine.LateralTTDModel / calculate_ttd_vertical: a step
+    uses its bin's smoothed P50 when the bin is confident and the P50 > 0,
+    else the group fallback (NaN when there is none).
+    """
+    n_iter = idx.shape[0]
+    n_steps = len(step_cols)
+    if matrix.shape[1] == 0:
+        return np.full((n_iter, n_steps), np.nan)
+
+    sample = matrix[idx]                                   # iterations x runs x bins
+    p50 = np.round(_nanmedian(sample, axis=1), 1)
+    confident = np.sum(~np.isnan(sample), axis=1) >= min_runs
+    smoothed = _smooth(p50, window)
+    usable = confident & (smoothed > 0)
+
+    fallback = _nanmedian(np.where(confident, smoothed, np.nan), axis=1)
+    fallback = np.where(fallback > 0, fallback, np.nan)
+
+    cols = np.asarray(step_cols)
+    on_curve = cols >= 0
+    safe_cols = np.where(on_curve, cols, 0)
+    rops = np.where(on_curve & usable[:, safe_cols], smoothed[:, safe_cols], np.nan)
+    return np.where(np.isnan(rops), fallback[:, None], rops)
+
+
+def _group_ttd(gc, steps, n_iter, rng, min_runs, window, order_bins):
+    """Bootstrap TTD samples (hours, NaN = no rotary ROP anywhere) for one group."""
+    run_list = gc["run_list"]
+    n_runs = len(run_list)
+    rot_bins = order_bins({b for ri in run_list for b in ri["rotary_curve"]})
+    sli_bins = order_bins({b for ri in run_list for b in ri["slide_curve"]})
+    rot_m = _run_matrix(run_list, "rotary_curve", rot_bins)
+    sli_m = _run_matrix(run_list, "slide_curve", sli_bins)
+    rot_col = {b: j for j, b in enumerate(rot_bins)}
+    sli_col = {b: j for j, b in enumerate(sli_bins)}
+    rot_steps = [rot_col.get(s[0], -1) for s in steps]
+    sli_steps = [sli_col.get(s[1], -1) for s in steps]
+    lengths = np.array([s[2] for s in steps], dtype=float)
+
+    rot_ft = np.array([ri.get("rotary_feet", 0) for ri in run_list], dtype=float)
+    sli_ft = np.array([ri.get("slide_feet", 0) for ri in run_list], dtype=float)
+    is_rss = gc.get("is_rss", False)
+
+    width = max(rot_m.shape[1], sli_m.shape[1], 1)
+    batch = max(1, min(n_iter, BATCH_ELEMENTS // (n_runs * width)))
+    out = np.empty(n_iter)
+    for start in range(0, n_iter, batch):
+        b = min(batch, n_iter - start)
+        idx = rng.integers(0, n_runs, size=(b, n_runs))
+
+        if is_rss:
+            slide_pct = np.zeros(b)
+        else:
+            rot_sum = rot_ft[idx].sum(axis=1)
+            sli_sum = sli_ft[idx].sum(axis=1)
+            total = rot_sum + sli_sum
+            slide_pct = np.round(np.divide(sli_sum, total, out=np.zeros(b), where=total > 0), 4)
+        slide_pct = slide_pct[:, None]
+
+        rot = _step_rops(rot_m, idx, rot_steps, min_runs, window)
+        sli = _step_rops(sli_m, idx, sli_steps, min_runs, window)
+        covered = rot > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step_hrs = lengths * ((1 - slide_pct) / rot
+                                  + np.where(sli > 0, slide_pct / sli, 0.0))
+        hours = np.where(covered, step_hrs, 0.0).sum(axis=1)
+        out[start:start + b] = np.where(covered.any(axis=1), hours, np.nan)
+    return out
+
+
+def bootstrap_ttd(group_curves, ttd_results, steps, n_iter=1000, seed=None,
+                  min_runs_for_confidence=3, window=5, roadmap=None):
+    """Bootstrap TTD distribution and rank stability for the ranked groups.
+
+    Args:
+        group_curves: build_group_curves*() output (needs run_list)
+        ttd_results: calculate_ttd*() output; only these groups are resampled
+            and ranked against each other
+        steps: lateral_steps() / vertical_steps() output
+        n_iter: Bootstrap iterations
+        seed: RNG seed for reproducible intervals
+        min_runs_for_confidence: Same threshold the group builder used
+        window: Rolling median window (ROLLING_WINDOW / ROLLING_WINDOW_VERT)
+        roadmap: Formation roadmap for vertical curves (bin order); lateral
+            bins are ordered numerically
+
+    Returns {group_key: {ttd_p10_hours, ttd_p50_hours, ttd_p90_hours,
+    prob_fastest, prob_top3}}. Percentiles are of the bootstrap TTD in
+    hours; probabilities are the share of iterations in which the group
+    ranked first / in the top three.
+    """
+    if roadmap is not None:
+        position = {k: i for i, k in enumerate(roadmap)}
+
+        def order_bins(bins):
+            return sorted((b for b in bins if b in position), key=position.get)
+    else:
+        order_bins = sorted
+
+    rng = np.random.default_rng(seed)
+    keys = [r["group_key"] for r in ttd_results if group_curves.get(r["group_key"], {}).get("run_list")]
+    if not keys or n_iter <= 0:
+        return {}
+    samples = np.vstack([
+        _group_ttd(group_curves[gk], steps, n_iter, rng, min_runs_for_confidence,
+                   window, order_bins)
+        for gk in keys
+    ])                                                      # groups x iterations
+
+    # Rank per iteration; groups without a TTD rank last
+    ranks = np.argsort(np.argsort(np.where(np.isnan(samples), np.inf, samples),
+                                  axis=0, kind="stable"), axis=0)
+    stats = {}
+    for i, gk in enumerate(keys):
+        row = samples[i][~np.isnan(samples[i])]
+        if row.size:
+            p10, p50, p90 = np.percentile(row, (10, 50, 90))
+        else:
+            p10 = p50 = p90 = 0.0
+        stats[gk] = {
+            "ttd_p10_hours": round(float(p10), 1),
+            "ttd_p50_hours": round(float(p50), 1),
+            "ttd_p90_hours": round(float(p90), 1),
+            "prob_fastest": round(float(np.mean(ranks[i] == 0)), 3),
+            "prob_top3": round(float(np.mean(ranks[i] < 3)), 3),
+        }
+    return stats
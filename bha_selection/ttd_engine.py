@@ -0,0 +1,205 @@
+"""Prefix-sum Time-to-TD engine for lateral group curves.
+
+calculate_ttd() used to walk the target lateral in 100 ft steps for every
+group and, whenever a step had no confident bin, recompute the median of
+all confident P50s inside the loop. LateralTTDModel does that work once
+per group:
+
+  - rotary and slide ROP are resolved for every step of the group's curve
+    grid (confident bin P50, else the group fallback median, exactly as
+    calculate_ttd picks them)
+  - fallback medians are computed once, and they are also the ROPs of every
+    step past the end of the curves, so the grid never has to grow
+  - 1/ROP and ROP are accumulated into prefix sums
+
+A query for any target length and slide % is then a handful of prefix-sum
+lookups (O(1)); the 1000 ft breakdown sums the bucket's steps (O(steps))
+so its rounded values match the old loop exactly.
+
+Usage:
+    model = LateralTTDModel(group_curves[group_key], rotary_bin, slide_bin)
+    hours, steps_covered, steps_missing = model.ttd(10000, 0.12)
+    buckets = model.buckets(10000, 0.12, bucket_size=1000)
+"""
+
+import statistics
+from itertools import accumulate
+
+
+def fallback_p50(curve):
+    """Median P50 over a group curve's confident bins (None if there are none)."""
+    p50s = [v["p50"] for v in curve.values() if v.get("confident", False)]
+    return statistics.median(p50s) if p50s else None
+
+
+def _prefix(values):
+    return [0.0] + list(accumulate(values))
+
+
+class LateralTTDModel:
+    """Precomputed step grid and prefix sums for one group's lateral curves.
+
+    Args:
+        group_curve: One entry of build_group_curves() output (needs the
+            smoothed "rotary" / "slide" curves and group_slide_pct)
+        rotary_bin: Rotary curve bin size (ft)
+        slide_bin: Slide curve bin size (ft)
+    """
+
+    def __init__(self, group_curve, rotary_bin, slide_bin):
+        self.rotary_bin = rotary_bin
+        self.slide_bin = slide_bin
+        self.step = min(rotary_bin, slide_bin)  # iterate at the finer resolution
+        self.group_slide_pct = group_curve.get("group_slide_pct")
+
+        rotary = {b: v["p50"] for b, v in group_curve["rotary"].items()
+                  if v.get("confident", False)}
+        slide = {b: v["p50"] for b, v in group_curve["slide"].items()
+                 if v.get("confident", False)}
+        self.rotary_coverage_ft = max(rotary) + rotary_bin if rotary else 0
+        self.slide_coverage_ft = max(slide) + slide_bin if slide else 0
+
+        fb_rot = fallback_p50(group_curve["rotary"])
+        fb_sli = fallback_p50(group_curve["slide"])
+        # ROP used where no confident bin applies; None / 0 = no usable data
+        self.rotary_fallback = fb_rot if fb_rot and fb_rot > 0 else None
+        self.slide_fallback = fb_sli if fb_sli and fb_sli > 0 else 0
+
+        # Every step at or past n_grid sees no confident bin -> fallbacks
+        horizon = max(self.rotary_coverage_ft, self.slide_coverage_ft)
+        self.n_grid = -(-horizon // self.step)
+        self._rotary = rotary
+        self._slide = slide
+        self._cum = None  # step grid is built on the first query
+
+    def _build_grid(self):
+        rot_rops = []
+        sli_rops = []
+        for i in range(self.n_grid):
+            pos = i * self.step
+            rop = self._rotary.get(int(pos // self.rotary_bin) * self.rotary_bin)
+            rot_rops.append(rop if rop and rop > 0 else self.rotary_fallback)
+            rop = self._slide.get(int(pos // self.slide_bin) * self.slide_bin)
+            sli_rops.append(rop if rop and rop > 0 else self.slide_fallback)
+
+        # Per-step values; steps without rotary ROP are skipped entirely
+        self._tail = self._step_values(self.rotary_fallback, self.slide_fallback)
+        steps = [self._step_values(r, s) for r, s in zip(rot_rops, sli_rops)]
+        self._per_step = [list(col) for col in zip(*steps)] if steps else [[] for _ in self._tail]
+        self._cum = [_prefix(col) for col in self._per_step]
+
+    # Indices into _step_values / _tail / _cum
+    _COVERED, _INV_ROT, _INV_SLI, _ROT_ROP, _SLI_ROP, _SLI_OK = range(6)
+
+    @staticmethod
+    def _step_values(rot_rop, sli_rop):
+        """(covered, 1/rotary, 1/slide, rotary ROP, slide ROP, slide ROP > 0)."""
+        if not rot_rop:
+            return (0, 0.0, 0.0, 0.0, 0.0, 0)
+        if sli_rop and sli_rop > 0:
+            return (1, 1.0 / rot_rop, 1.0 / sli_rop, rot_rop, sli_rop, 1)
+        return (1, 1.0 / rot_rop, 0.0, rot_rop, 0.0, 0)
+
+    def _sum(self, col, i0, i1):
+        """Sum of per-step column col over steps [i0, i1), tail included."""
+        if i1 <= i0:
+            return 0.0
+        n = self.n_grid
+        cum = self._cum[col]
+        total = cum[min(i1, n)] - cum[min(i0, n)]
+        tail_steps = i1 - max(i0, n)
+        if tail_steps > 0:
+            total += tail_steps * self._tail[col]
+        return total
+
+    def _at(self, col, i):
+        return self._per_step[col][i] if i < self.n_grid else self._tail[col]
+
+    def _weighted(self, col, i0, i1, target_length):
+        """Sum over steps [i0, i1) of step length x column value."""
+        full_end = min(i1, target_length // self.step)
+        total = self.step * self._sum(col, i0, full_end)
+        if i1 > full_end >= i0:  # last, partial step
+            total += (target_length - full_end * self.step) * self._at(col, full_end)
+        return total
+
+    def n_steps(self, target_length):
+        return -(-target_length // self.step)
+
+    def slide_pct(self, default):
+        """The group's own slide % (calculate_ttd semantics), else default."""
+        return self.group_slide_pct if self.group_slide_pct is not None else default
+
+    def coverage_ft(self, slide_pct):
+        """Lateral length covered by confident bins of every curve in use."""
+        if slide_pct > 0:
+            return min(self.rotary_coverage_ft, self.slide_coverage_ft)
+        return self.rotary_coverage_ft
+
+    def ttd(self, target_length, slide_pct):
+        """Time to TD in hours for target_length ft at slide_pct.
+
+        Returns (hours, steps_with_data, steps_missing).
+        """
+        if self._cum is None:
+            self._build_grid()
+        n = self.n_steps(target_length)
+        rot = self._weighted(self._INV_ROT, 0, n, target_length)
+        sli = self._weighted(self._INV_SLI, 0, n, target_length)
+        covered = int(self._sum(self._COVERED, 0, n))
+        return (1 - slide_pct) * rot + slide_pct * sli, covered, n - covered
+
+    def buckets(self, target_length, slide_pct, bucket_size=1000):
+        """calculate_ttd breakdown rows for bucket_size-ft buckets.
+
+        Sums the bucket's steps one by one, in the order the old per-step
+        loop did, rather than differencing prefix sums: the rounded times
+        and average ROPs often sit on a .x5 tie, where a last-ulp
+        difference would flip the printed value.
+        """
+        if self._cum is None:
+            self._build_grid()
+        detail = {}  # {bucket_start: {rot_ft, rot_time, sli_ft, sli_time, rot_rops, sli_rops}}
+        for i in range(self.n_steps(target_length)):
+            if not self._at(self._COVERED, i):
+                continue
+            pos = i * self.step
+            seg_length = min(self.step, target_length - pos)
+            rot_rop = self._at(self._ROT_ROP, i)
+            sli_rop = self._at(self._SLI_ROP, i)
+            rot_ft = seg_length * (1 - slide_pct)
+            sli_ft = seg_length * slide_pct
+            bk = int(pos // bucket_size) * bucket_size
+            bd = detail.setdefault(bk, {"rot_ft": 0, "rot_time": 0, "sli_ft": 0, "sli_time": 0,
+                                        "rot_rops": [], "sli_rops": []})
+            bd["rot_ft"] += rot_ft
+            bd["rot_time"] += rot_ft / rot_rop
+            bd["sli_ft"] += sli_ft
+            bd["rot_rops"].append((rot_ft, rot_rop))
+            if sli_rop:
+                bd["sli_time"] += sli_ft / sli_rop
+                bd["sli_rops"].append((sli_ft, sli_rop))
+
+        rows = []
+        for bk in sorted(detail):
+            bd = detail[bk]
+            bk_end = min(bk + bucket_size, target_length)
+            # Length-weighted average ROP over the steps that used one
+            rot_rop_avg = 0
+            total_w = sum(w for w, _ in bd["rot_rops"])
+            if total_w:
+                rot_rop_avg = round(sum(w * r for w, r in bd["rot_rops"]) / total_w, 1)
+            sli_rop_avg = 0
+            total_w = sum(w for w, _ in bd["sli_rops"])
+            if total_w:
+                sli_rop_avg = round(sum(w * r for w, r in bd["sli_rops"]) / total_w, 1)
+            rows.append({
+                "label": f"{bk}-{bk_end}'",
+                "length_ft": round(bk_end - bk, 1),
+                "rotary_rop": rot_rop_avg,
+                "rotary_time": round(bd["rot_time"], 3),
+                "slide_rop": sli_rop_avg,
+                "slide_time": round(bd["sli_time"], 3),
+                "total_time": round(bd["rot_time"] + bd["sli_time"], 3),
+            })
+        return rows